@@ -0,0 +1,93 @@
+from ..interfaces.BatchClient import BatchClient
+from ..utils import DType, Compression
+
+import gymnasium as gym
+from pettingzoo import ParallelEnv
+import numpy as np
+
+class ICCEParallelEnv(ParallelEnv):
+    """ PettingZoo `ParallelEnv` over the agents of a remote `EnvironmentInterface`.
+
+    Agents are named `agent_<id>` after the Simulation Agent they are mapped to. A step sends the actions of all agents
+    with one batched RPC, then waits for the environment's next tick and receives the data of all agents with one batched
+    RPC. The remote environment runs in real time and owns its episodes: when it ends an episode, every agent is
+    terminated (or truncated, if the episode was cut short for it), and `reset()` waits for the next episode to start.
+
+    Args:
+        n_agents : The number of agents to drive.
+        n_observations : The observation size of an agent.
+        n_actions : The action size of an agent.
+        ip_addr : The IP address of the environment.
+        port : The port of the environment.
+        observation_dtype : The requested wire dtype of observations.
+        action_dtype : The requested wire dtype of actions.
+        observation_codec : The requested codec of observations.
+        action_space : The action space of an agent. Defaults to an unbounded Box of the negotiated action shape.
+        timeout : The maximum time to wait for the environment to tick.
+    """
+    metadata = {'name': 'icce_parallel_v0'}
+
+    def __init__(self, n_agents: int, n_observations: int, n_actions: int, ip_addr = 'localhost', port = 50051,
+                 observation_dtype: DType = DType.FLOAT32, action_dtype: DType = DType.FLOAT32,
+                 observation_codec: Compression = Compression.NONE, action_space: gym.Space | None = None, timeout: float = 10.0):
+        self.timeout = timeout
+        self.client = BatchClient(n_agents=n_agents, n_observations=n_observations, n_actions=n_actions, observation_dtype=observation_dtype,
+                                  action_dtype=action_dtype, observation_codec=observation_codec, ip_addr=ip_addr, port=port)
+        self.client.connect()
+
+        self.possible_agents = [f'agent_{agent_id}' for agent_id in self.client.agent_ids]
+        self.agents = []
+        self._observation_space = gym.spaces.Box(low=-np.inf, high=np.inf, shape=self.client.observation_shape, dtype=self.client.observations.dtype)
+        self._action_space = action_space if action_space is not None else gym.spaces.Box(low=-np.inf, high=np.inf, shape=self.client.action_shape, dtype=np.float32)
+
+        # Actions of every agent, held by agents which are not given one
+        self._actions = np.zeros(shape=(n_agents, *self.client.action_shape), dtype=np.float32)
+
+    def observation_space(self, agent):
+        return self._observation_space
+
+    def action_space(self, agent):
+        return self._action_space
+
+    def reset(self, seed=None, options=None):
+        # Remote environments own their episodes, and cannot be seeded
+        self.client.sample(wait=False)
+        self.client.wait_for_episode(timeout=self.timeout)
+        self.agents = self.possible_agents[:]
+        return self._observations(), {agent: self._info(i) for i, agent in enumerate(self.possible_agents)}
+
+    def step(self, actions):
+        for i, agent in enumerate(self.possible_agents):
+            if agent in actions:
+                self._actions[i] = actions[agent]
+        self.client.act(self._actions)
+        self.client.sample(wait=True, timeout=self.timeout)
+
+        client = self.client
+        observations = self._observations()
+        rewards = {agent: float(client.rewards[i]) for i, agent in enumerate(self.possible_agents)}
+        infos = {agent: self._info(i) for i, agent in enumerate(self.possible_agents)}
+        if client.done:
+            # The episode ended for every agent
+            terminations = {agent: bool(client.terminated[i]) for i, agent in enumerate(self.possible_agents)}
+            truncations = {agent: not terminations[agent] for agent in self.possible_agents}
+            self.agents = []
+        else:
+            terminations = {agent: False for agent in self.possible_agents}
+            truncations = {agent: False for agent in self.possible_agents}
+        return observations, rewards, terminations, truncations, infos
+
+    def close(self):
+        self.client.close()
+
+
+    ########## HELPERS ##########
+    def _observations(self) -> dict[str, np.ndarray]:
+        return {agent: self.client.observations[i].copy() for i, agent in enumerate(self.possible_agents)}
+
+    def _info(self, i: int) -> dict:
+        """ The info record of an agent as a dict, if the environment declared an info schema. """
+        if self.client.info is None:
+            return {}
+        record = self.client.info[i]
+        return {name: record[name].item() for name in self.client.info_dtype.names}
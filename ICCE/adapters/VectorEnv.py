@@ -0,0 +1,109 @@
+from ..interfaces.BatchClient import BatchClient
+from ..utils import DType, Compression
+
+import gymnasium as gym
+from gymnasium.vector import VectorEnv
+import numpy as np
+
+class ICCEVectorEnv(VectorEnv):
+    """ Gymnasium `VectorEnv` over the agents of one or more remote `EnvironmentInterface`s.
+
+    Each sub-environment of the vector is an agent of a remote environment, so that standard vectorized trainers can
+    drive many agents from a single process. A step sends the actions of all agents of an environment with one batched
+    RPC, then waits for the environment's next tick and receives the data of all its agents with one batched RPC.
+    Environments are stepped concurrently: `step_async()` only sends the actions.
+
+    Remote environments run in real time and own their episodes. When an environment ends an episode, its agents are
+    terminated (or truncated, if the episode was cut short for them) and automatically reset as in Gymnasium: the final
+    observations are returned in `infos['final_observation']`, and the observations of the environment's next episode
+    are returned. `reset()` joins the current episode of each environment, waiting for one to start if needed.
+
+    Args:
+        n_observations : The observation size of an agent.
+        n_actions : The action size of an agent.
+        environments : The environments as (ip_addr, port, n_agents).
+        observation_dtype : The requested wire dtype of observations.
+        action_dtype : The requested wire dtype of actions.
+        observation_codec : The requested codec of observations.
+        action_space : The action space of an agent. Defaults to an unbounded Box of the negotiated action shape.
+        timeout : The maximum time to wait for an environment to tick.
+    """
+    def __init__(self, n_observations: int, n_actions: int, environments: list[tuple[str, int, int]] = (('localhost', 50051, 1),),
+                 observation_dtype: DType = DType.FLOAT32, action_dtype: DType = DType.FLOAT32,
+                 observation_codec: Compression = Compression.NONE, action_space: gym.Space | None = None, timeout: float = 10.0):
+        self.timeout = timeout
+        self.clients = [BatchClient(n_agents=n_agents, n_observations=n_observations, n_actions=n_actions, observation_dtype=observation_dtype,
+                                    action_dtype=action_dtype, observation_codec=observation_codec, ip_addr=ip_addr, port=port)
+                        for ip_addr, port, n_agents in environments]
+        for client in self.clients:
+            client.connect()
+
+        # Slices of the vector, per environment
+        self._slices = []
+        start = 0
+        for client in self.clients:
+            self._slices.append(slice(start, start + client.n_agents))
+            start += client.n_agents
+
+        client = self.clients[0]
+        observation_space = gym.spaces.Box(low=-np.inf, high=np.inf, shape=client.observation_shape, dtype=client.observations.dtype)
+        if action_space is None:
+            action_space = gym.spaces.Box(low=-np.inf, high=np.inf, shape=client.action_shape, dtype=np.float32)
+        super().__init__(num_envs=start, observation_space=observation_space, action_space=action_space)
+
+        # Batched environment data, gathered from every environment
+        self._observations = np.zeros(shape=(self.num_envs, *client.observation_shape), dtype=client.observations.dtype)
+        self._rewards = np.zeros(shape=self.num_envs, dtype=np.float32)
+        self._terminated = np.zeros(shape=self.num_envs, dtype=bool)
+        self._truncated = np.zeros(shape=self.num_envs, dtype=bool)
+        self._act_futures = None
+
+    def reset_async(self, seed=None, options=None):
+        # Remote environments own their episodes, and cannot be seeded
+        pass
+
+    def reset_wait(self, seed=None, options=None):
+        for client, agents in zip(self.clients, self._slices):
+            client.sample(wait=False)
+            client.wait_for_episode(timeout=self.timeout)
+            self._observations[agents] = client.observations
+        return self._observations.copy(), {}
+
+    def step_async(self, actions):
+        self._act_futures = [client.act_async(actions[agents]) for client, agents in zip(self.clients, self._slices)]
+
+    def step_wait(self):
+        # Sample every environment once its actions are received
+        sample_futures = []
+        for client, act_future in zip(self.clients, self._act_futures):
+            act_future.result()
+            sample_futures.append(client.sample_async(wait=True, timeout=self.timeout))
+        self._act_futures = None
+
+        infos = {}
+        for client, agents, sample_future in zip(self.clients, self._slices, sample_futures):
+            client.update(sample_future.result())
+            self._rewards[agents] = client.rewards
+            self._observations[agents] = client.observations
+
+            if not client.done:
+                self._terminated[agents] = False
+                self._truncated[agents] = False
+                continue
+
+            # The episode of the environment ended for all its agents, reset them to its next episode
+            self._terminated[agents] = client.terminated
+            self._truncated[agents] = ~client.terminated
+            if 'final_observation' not in infos:
+                infos['final_observation'] = np.full(shape=self.num_envs, fill_value=None, dtype=object)
+                infos['_final_observation'] = np.zeros(shape=self.num_envs, dtype=bool)
+            infos['final_observation'][agents] = list(client.observations.copy())
+            infos['_final_observation'][agents] = True
+            client.wait_for_episode(timeout=self.timeout)
+            self._observations[agents] = client.observations
+
+        return self._observations.copy(), self._rewards.copy(), self._terminated.copy(), self._truncated.copy(), infos
+
+    def close_extras(self, **kwargs):
+        for client in self.clients:
+            client.close()
@@ -0,0 +1,11 @@
+# Adapters are imported on first use, so that gymnasium and pettingzoo are only required by the adapter in use
+def __getattr__(name):
+    if name == 'ICCEVectorEnv':
+        from .VectorEnv import ICCEVectorEnv
+        return ICCEVectorEnv
+    if name == 'ICCEParallelEnv':
+        from .ParallelEnv import ICCEParallelEnv
+        return ICCEParallelEnv
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+__all__ = ['ICCEVectorEnv', 'ICCEParallelEnv']
\ No newline at end of file
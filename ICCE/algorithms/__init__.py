@@ -0,0 +1,2 @@
+from .returns import discounted_returns, gae, n_step_targets, normalize
+from .losses import actor_critic_loss, td_loss
\ No newline at end of file
@@ -0,0 +1,65 @@
+def actor_critic_loss(log_probs, values, returns, normalize: bool = True, eps: float = 1e-8, reduction: str = 'sum'):
+    """ Computes the actor-critic loss of a trajectory in one batched pass. Requires PyTorch, imported on first use.
+
+    The advantage of every step is its return minus the (detached) value predicted by the critic. The actor loss is
+    `-log_prob * advantage`, and the critic loss is the smooth L1 loss between the values and the returns.
+
+    Args:
+        log_probs : The log-probabilities of the taken actions, a tensor shaped (T,) or a list of T scalar tensors.
+        values : The values predicted by the critic, a tensor shaped (T,) or (T, 1), or a list of T tensors.
+        returns : The returns of the trajectory, e.g. from `discounted_returns()`, shaped (T,).
+        normalize : Whether the returns are standardized to zero mean and unit variance.
+        eps : Added to the standard deviation for numerical stability when normalizing.
+        reduction : 'sum' or 'mean' over the steps.
+
+    Returns:
+        The total loss, the actor loss and the critic loss.
+    """
+    import torch
+    import torch.nn.functional as F
+
+    if isinstance(log_probs, (list, tuple)):
+        log_probs = torch.stack(list(log_probs))
+    if isinstance(values, (list, tuple)):
+        values = torch.stack(list(values))
+    log_probs = log_probs.reshape(-1)
+    values = values.reshape(-1)
+    returns = torch.as_tensor(returns, dtype=values.dtype, device=values.device).reshape(-1)
+
+    if normalize:
+        returns = (returns - returns.mean()) / (returns.std() + eps)
+    advantages = returns - values.detach()
+
+    actor_loss = -(log_probs * advantages)
+    actor_loss = actor_loss.sum() if reduction == 'sum' else actor_loss.mean()
+    critic_loss = F.smooth_l1_loss(values, returns, reduction=reduction)
+    return actor_loss + critic_loss, actor_loss, critic_loss
+
+def td_loss(predicted_values, rewards, next_values, dones, gamma: float, loss: str = 'mse'):
+    """ Computes the one-step temporal difference loss of a batch of transitions. Requires PyTorch, imported on first use.
+
+    The target `r + gamma * (1 - done) * V'(s')` is detached, so that only the critic predicting `predicted_values`
+    is optimized.
+
+    Args:
+        predicted_values : The values of the states, predicted by the critic, shaped (B,) or (B, 1).
+        rewards : The rewards of the transitions, shaped (B,).
+        next_values : The values of the next states, e.g. predicted by a target critic, shaped (B,) or (B, 1).
+        dones : Whether each transition ended an episode, shaped (B,).
+        gamma : The discount factor.
+        loss : 'mse' or 'smooth_l1'.
+
+    Returns:
+        The mean loss over the batch.
+    """
+    import torch
+    import torch.nn.functional as F
+
+    predicted_values = predicted_values.reshape(-1)
+    rewards = torch.as_tensor(rewards, dtype=predicted_values.dtype, device=predicted_values.device).reshape(-1)
+    dones = torch.as_tensor(dones, dtype=predicted_values.dtype, device=predicted_values.device).reshape(-1)
+    targets = (rewards + gamma * (1.0 - dones) * next_values.reshape(-1)).detach()
+
+    if loss == 'smooth_l1':
+        return F.smooth_l1_loss(predicted_values, targets)
+    return F.mse_loss(predicted_values, targets)
@@ -0,0 +1,126 @@
+import numpy as np
+
+# Smallest power of the discount within a chunk of _discounted_cumsum(), bounding the dynamic range of the rescaled sums
+_MIN_DISCOUNT_POWER = 1e-100
+
+def discounted_returns(rewards: np.ndarray, gamma: float, dones: np.ndarray | None = None, last_value: float = 0.0) -> np.ndarray:
+    """ Computes the discounted return of every step of a trajectory.
+
+    `R_t = r_t + gamma * (1 - done_t) * R_{t+1}`, bootstrapped from `last_value` after the last step.
+
+    Args:
+        rewards : The rewards of the trajectory, shaped (T,).
+        gamma : The discount factor.
+        dones : Whether each step ended an episode, shaped (T,). The trajectory is a single episode if None.
+        last_value : The value of the state following the last step, e.g. 0.0 if the episode terminated.
+
+    Returns:
+        The discounted returns, shaped (T,).
+    """
+    return _discounted_cumsum(np.asarray(rewards, dtype=np.float64), gamma, dones, last_value)
+
+def gae(rewards: np.ndarray, values: np.ndarray, gamma: float, lmbda: float = 0.95, dones: np.ndarray | None = None,
+        last_value: float = 0.0) -> tuple[np.ndarray, np.ndarray]:
+    """ Computes the generalized advantage estimates (GAE) and returns of every step of a trajectory.
+
+    Args:
+        rewards : The rewards of the trajectory, shaped (T,).
+        values : The values of the states of the trajectory, shaped (T,).
+        gamma : The discount factor.
+        lmbda : The GAE smoothing factor, trading off bias (0.0, one-step TD) and variance (1.0, Monte Carlo).
+        dones : Whether each step ended an episode, shaped (T,). The trajectory is a single episode if None.
+        last_value : The value of the state following the last step, e.g. 0.0 if the episode terminated.
+
+    Returns:
+        The advantages and the returns (advantages + values), each shaped (T,).
+    """
+    rewards = np.asarray(rewards, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64).reshape(-1)
+    not_done = 1.0 - np.asarray(dones, dtype=np.float64) if dones is not None else 1.0
+
+    # TD residuals
+    next_values = np.append(values[1:], last_value)
+    deltas = rewards + gamma * not_done * next_values - values
+
+    advantages = _discounted_cumsum(deltas, gamma * lmbda, dones, 0.0)
+    return advantages, advantages + values
+
+def n_step_targets(rewards: np.ndarray, values: np.ndarray, gamma: float, n: int, dones: np.ndarray | None = None,
+                   last_value: float = 0.0) -> np.ndarray:
+    """ Computes the n-step bootstrapped targets of every step of a trajectory.
+
+    `G_t = r_t + ... + gamma^(n-1) * r_{t+n-1} + gamma^n * V_{t+n}`, truncated at the end of episodes.
+
+    Args:
+        rewards : The rewards of the trajectory, shaped (T,).
+        values : The values of the states of the trajectory, shaped (T,).
+        gamma : The discount factor.
+        n : The number of steps.
+        dones : Whether each step ended an episode, shaped (T,). The trajectory is a single episode if None.
+        last_value : The value of the state following the last step, e.g. 0.0 if the episode terminated.
+
+    Returns:
+        The n-step targets, shaped (T,).
+    """
+    rewards = np.asarray(rewards, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64).reshape(-1)
+    dones = np.asarray(dones, dtype=bool) if dones is not None else np.zeros(len(rewards), dtype=bool)
+    T = len(rewards)
+
+    # Accumulate discounted rewards, until the end of the episode
+    targets = np.zeros(T, dtype=np.float64)
+    alive = np.ones(T, dtype=bool)
+    for k in range(min(n, T)):
+        targets[:T-k] += gamma**k * alive[:T-k] * rewards[k:]
+        alive[:T-k] &= ~dones[k:]
+
+    # Bootstrap from V_{t+n}, or from last_value if the trajectory ends first
+    if n < T:
+        targets[:T-n] += gamma**n * alive[:T-n] * values[n:]
+    tail = np.arange(max(T - n, 0), T)
+    targets[tail] += gamma**(T - tail) * alive[tail] * last_value
+    return targets
+
+def normalize(x: np.ndarray, eps: float = 1e-8) -> np.ndarray:
+    """ Standardizes an array to zero mean and unit variance. """
+    x = np.asarray(x, dtype=np.float64)
+    return (x - x.mean()) / (x.std() + eps)
+
+def _discounted_cumsum(x: np.ndarray, discount: float, dones: np.ndarray | None, last: float) -> np.ndarray:
+    """ Helper func to compute `y_t = x_t + discount * (1 - done_t) * y_{t+1}`, bootstrapped from `last`.
+
+    Within an episode, `y_t = discount^-t * sum_{k>=t} discount^k * x_k` is computed by a reverse cumulative sum. Episodes
+    are processed in chunks short enough for the powers of the discount not to underflow, carrying `y` across chunks.
+    """
+    out = np.empty_like(x)
+    T = len(x)
+    if T == 0:
+        return out
+
+    # Episode segments, ending at dones (inclusive)
+    ends = (np.flatnonzero(dones) + 1).tolist() if dones is not None else []
+    if not ends or ends[-1] != T:
+        ends.append(T)
+    starts = [0] + ends[:-1]
+
+    chunk = T
+    if 0.0 < discount < 1.0:
+        chunk = max(1, int(np.log(_MIN_DISCOUNT_POWER) / np.log(discount)))
+    powers = discount ** np.arange(min(chunk, T) + 1, dtype=np.float64)
+
+    carry = last if dones is None or not dones[-1] else 0.0
+    for start, end in zip(reversed(starts), reversed(ends)):
+        for b in range(end, start, -chunk):
+            a = max(start, b - chunk)
+            n = b - a
+            w = powers[:n]
+            y = np.cumsum((x[a:b] * w)[::-1])[::-1]
+            if discount != 0.0:
+                y /= w
+            else:
+                y = x[a:b].copy()
+            y += carry * powers[n:0:-1]
+            out[a:b] = y
+            carry = y[0]
+        carry = 0.0
+    return out
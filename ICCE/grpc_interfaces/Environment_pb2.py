@@ -14,25 +14,45 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11\x45nvironment.proto\x12\x0b\x45nvironment\"Q\n\x10HandshakeRequest\x12\x16\n\x0en_observations\x18\x01 \x01(\x05\x12\x11\n\tn_actions\x18\x02 \x01(\x05\x12\x12\n\nagent_hint\x18\x03 \x01(\x05\"/\n\x11HandshakeResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\x05\"\x1b\n\rSampleRequest\x12\n\n\x02id\x18\x01 \x01(\x05\"}\n\x0eSampleResponse\x12\x13\n\x0bobservation\x18\x01 \x01(\x0c\x12\x0e\n\x06reward\x18\x02 \x01(\x02\x12\x12\n\nterminated\x18\x03 \x01(\x08\x12\x11\n\ttruncated\x18\x04 \x01(\x08\x12\x0f\n\x07\x65pisode\x18\x05 \x01(\x05\x12\x0e\n\x06status\x18\x06 \x01(\x05\"+\n\rActionRequest\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0e\n\x06\x61\x63tion\x18\x02 \x01(\x0c\" \n\x0e\x41\x63tionResponse\x12\x0e\n\x06status\x18\x01 \x01(\x05\x32\xef\x01\n\x0b\x45nvironment\x12Y\n\x16handshake_and_validate\x12\x1d.Environment.HandshakeRequest\x1a\x1e.Environment.HandshakeResponse\"\x00\x12\x43\n\x06sample\x12\x1a.Environment.SampleRequest\x1a\x1b.Environment.SampleResponse\"\x00\x12@\n\x03\x61\x63t\x12\x1a.Environment.ActionRequest\x1a\x1b.Environment.ActionResponse\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11\x45nvironment.proto\x12\x0b\x45nvironment\"\xde\x01\n\x10HandshakeRequest\x12\x16\n\x0en_observations\x18\x01 \x01(\x05\x12\x11\n\tn_actions\x18\x02 \x01(\x05\x12\x12\n\nagent_hint\x18\x03 \x01(\x05\x12\x19\n\x11observation_dtype\x18\x04 \x01(\x05\x12\x14\n\x0c\x61\x63tion_dtype\x18\x05 \x01(\x05\x12\x19\n\x11observation_shape\x18\x06 \x03(\x05\x12\x14\n\x0c\x61\x63tion_shape\x18\x07 \x03(\x05\x12\x19\n\x11observation_codec\x18\x08 \x01(\x05\x12\x0e\n\x06resume\x18\t \x01(\x08\"\xf5\x01\n\x11HandshakeResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\x05\x12\x19\n\x11observation_dtype\x18\x03 \x01(\x05\x12\x14\n\x0c\x61\x63tion_dtype\x18\x04 \x01(\x05\x12\x19\n\x11observation_shape\x18\x05 \x03(\x05\x12\x14\n\x0c\x61\x63tion_shape\x18\x06 \x03(\x05\x12\x19\n\x11observation_codec\x18\x07 \x01(\x05\x12\x0f\n\x07\x63hunked\x18\x08 \x01(\x08\x12\x13\n\x0binfo_schema\x18\t \x01(\t\x12\x10\n\x08\x61gent_id\x18\n \x01(\x05\x12\x0f\n\x07session\x18\x0b \x01(\x04\"?\n\rSampleRequest\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x11\n\tbase_tick\x18\x02 \x01(\x04\x12\x0f\n\x07session\x18\x03 \x01(\x04\"\xf0\x01\n\x0eSampleResponse\x12\x13\n\x0bobservation\x18\x01 \x01(\x0c\x12\x0e\n\x06reward\x18\x02 \x01(\x02\x12\x12\n\nterminated\x18\x03 \x01(\x08\x12\x11\n\ttruncated\x18\x04 \x01(\x08\x12\x0f\n\x07\x65pisode\x18\x05 \x01(\x05\x12\x0e\n\x06status\x18\x06 \x01(\x05\x12\x19\n\x11observation_scale\x18\x07 \x01(\x02\x12\x0f\n\x07partial\x18\x08 \x01(\x08\x12\x0c\n\x04info\x18\t \x01(\x0c\x12\x0c\n\x04tick\x18\n \x01(\x04\x12\x11\n\tbase_tick\x18\x0b \x01(\x04\x12\x16\n\x0e\x65pisode_return\x18\x0c \x01(\x01\"`\n\rActionRequest\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0e\n\x06\x61\x63tion\x18\x02 \x01(\x0c\x12\x14\n\x0c\x61\x63tion_scale\x18\x03 \x01(\x02\x12\x0c\n\x04tick\x18\x04 \x01(\x04\x12\x0f\n\x07session\x18\x05 \x01(\x04\" \n\x0e\x41\x63tionResponse\x12\x0e\n\x06status\x18\x01 \x01(\x05\"J\n\x0eProfileRequest\x12\x0f\n\x07seconds\x18\x01 \x01(\x02\x12\x18\n\x10interval_seconds\x18\x02 \x01(\x02\x12\r\n\x05token\x18\x03 \x01(\t\"0\n\x0fProfileResponse\x12\x0e\n\x06status\x18\x01 \x01(\x05\x12\r\n\x05stats\x18\x02 \x01(\x0c\"/\n\x10HeartbeatRequest\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0f\n\x07session\x18\x02 \x01(\x04\"#\n\x11HeartbeatResponse\x12\x0e\n\x06status\x18\x01 \x01(\x05\"w\n\x12SampleBatchRequest\x12\x0b\n\x03ids\x18\x01 \x03(\x05\x12\x0c\n\x04wait\x18\x02 \x01(\x08\x12\x0f\n\x07version\x18\x03 \x01(\x04\x12\x0f\n\x07timeout\x18\x04 \x01(\x02\x12\x12\n\nbase_ticks\x18\x05 \x03(\x04\x12\x10\n\x08sessions\x18\x06 \x03(\x04\"T\n\x13SampleBatchResponse\x12,\n\x07samples\x18\x01 \x03(\x0b\x32\x1b.Environment.SampleResponse\x12\x0f\n\x07version\x18\x02 \x01(\x04\"A\n\x12\x41\x63tionBatchRequest\x12+\n\x07\x61\x63tions\x18\x01 \x03(\x0b\x32\x1a.Environment.ActionRequest\"%\n\x13\x41\x63tionBatchResponse\x12\x0e\n\x06status\x18\x01 \x03(\x05\"\x0f\n\rHealthRequest\"Z\n\x0eHealthResponse\x12\x0e\n\x06status\x18\x01 \x01(\x05\x12\r\n\x05ready\x18\x02 \x01(\x08\x12\x13\n\x0b\x66ree_agents\x18\x03 \x01(\x05\x12\x14\n\x0ctotal_agents\x18\x04 \x01(\x05\x32\x8b\x06\n\x0b\x45nvironment\x12Y\n\x16handshake_and_validate\x12\x1d.Environment.HandshakeRequest\x1a\x1e.Environment.HandshakeResponse\"\x00\x12\x43\n\x06sample\x12\x1a.Environment.SampleRequest\x1a\x1b.Environment.SampleResponse\"\x00\x12L\n\rsample_stream\x12\x1a.Environment.SampleRequest\x1a\x1b.Environment.SampleResponse\"\x00\x30\x01\x12J\n\tsubscribe\x12\x1a.Environment.SampleRequest\x1a\x1b.Environment.SampleResponse\"\x00(\x01\x30\x01\x12@\n\x03\x61\x63t\x12\x1a.Environment.ActionRequest\x1a\x1b.Environment.ActionResponse\"\x00\x12\x46\n\x07profile\x12\x1b.Environment.ProfileRequest\x1a\x1c.Environment.ProfileResponse\"\x00\x12L\n\theartbeat\x12\x1d.Environment.HeartbeatRequest\x1a\x1e.Environment.HeartbeatResponse\"\x00\x12S\n\x0csample_batch\x12\x1f.Environment.SampleBatchRequest\x1a .Environment.SampleBatchResponse\"\x00\x12P\n\tact_batch\x12\x1f.Environment.ActionBatchRequest\x1a .Environment.ActionBatchResponse\"\x00\x12\x43\n\x06health\x12\x1a.Environment.HealthRequest\x1a\x1b.Environment.HealthResponse\"\x00\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'Environment_pb2', _globals)
 if _descriptor._USE_C_DESCRIPTORS == False:
   DESCRIPTOR._options = None
-  _globals['_HANDSHAKEREQUEST']._serialized_start=34
-  _globals['_HANDSHAKEREQUEST']._serialized_end=115
-  _globals['_HANDSHAKERESPONSE']._serialized_start=117
-  _globals['_HANDSHAKERESPONSE']._serialized_end=164
-  _globals['_SAMPLEREQUEST']._serialized_start=166
-  _globals['_SAMPLEREQUEST']._serialized_end=193
-  _globals['_SAMPLERESPONSE']._serialized_start=195
-  _globals['_SAMPLERESPONSE']._serialized_end=320
-  _globals['_ACTIONREQUEST']._serialized_start=322
-  _globals['_ACTIONREQUEST']._serialized_end=365
-  _globals['_ACTIONRESPONSE']._serialized_start=367
-  _globals['_ACTIONRESPONSE']._serialized_end=399
-  _globals['_ENVIRONMENT']._serialized_start=402
-  _globals['_ENVIRONMENT']._serialized_end=641
+  _globals['_HANDSHAKEREQUEST']._serialized_start=35
+  _globals['_HANDSHAKEREQUEST']._serialized_end=257
+  _globals['_HANDSHAKERESPONSE']._serialized_start=260
+  _globals['_HANDSHAKERESPONSE']._serialized_end=505
+  _globals['_SAMPLEREQUEST']._serialized_start=507
+  _globals['_SAMPLEREQUEST']._serialized_end=570
+  _globals['_SAMPLERESPONSE']._serialized_start=573
+  _globals['_SAMPLERESPONSE']._serialized_end=813
+  _globals['_ACTIONREQUEST']._serialized_start=815
+  _globals['_ACTIONREQUEST']._serialized_end=911
+  _globals['_ACTIONRESPONSE']._serialized_start=913
+  _globals['_ACTIONRESPONSE']._serialized_end=945
+  _globals['_PROFILEREQUEST']._serialized_start=947
+  _globals['_PROFILEREQUEST']._serialized_end=1021
+  _globals['_PROFILERESPONSE']._serialized_start=1023
+  _globals['_PROFILERESPONSE']._serialized_end=1071
+  _globals['_HEARTBEATREQUEST']._serialized_start=1073
+  _globals['_HEARTBEATREQUEST']._serialized_end=1120
+  _globals['_HEARTBEATRESPONSE']._serialized_start=1122
+  _globals['_HEARTBEATRESPONSE']._serialized_end=1157
+  _globals['_SAMPLEBATCHREQUEST']._serialized_start=1159
+  _globals['_SAMPLEBATCHREQUEST']._serialized_end=1278
+  _globals['_SAMPLEBATCHRESPONSE']._serialized_start=1280
+  _globals['_SAMPLEBATCHRESPONSE']._serialized_end=1364
+  _globals['_ACTIONBATCHREQUEST']._serialized_start=1366
+  _globals['_ACTIONBATCHREQUEST']._serialized_end=1431
+  _globals['_ACTIONBATCHRESPONSE']._serialized_start=1433
+  _globals['_ACTIONBATCHRESPONSE']._serialized_end=1470
+  _globals['_HEALTHREQUEST']._serialized_start=1472
+  _globals['_HEALTHREQUEST']._serialized_end=1487
+  _globals['_HEALTHRESPONSE']._serialized_start=1489
+  _globals['_HEALTHRESPONSE']._serialized_end=1579
+  _globals['_ENVIRONMENT']._serialized_start=1582
+  _globals['_ENVIRONMENT']._serialized_end=2361
 # @@protoc_insertion_point(module_scope)
@@ -1,59 +1,196 @@
+from google.protobuf.internal import containers as _containers
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
-from typing import ClassVar as _ClassVar, Optional as _Optional
+from typing import ClassVar as _ClassVar, Iterable as _Iterable, Mapping as _Mapping, Optional as _Optional, Union as _Union
 
 DESCRIPTOR: _descriptor.FileDescriptor
 
 class HandshakeRequest(_message.Message):
-    __slots__ = ("n_observations", "n_actions", "agent_hint")
+    __slots__ = ("n_observations", "n_actions", "agent_hint", "observation_dtype", "action_dtype", "observation_shape", "action_shape", "observation_codec", "resume")
     N_OBSERVATIONS_FIELD_NUMBER: _ClassVar[int]
     N_ACTIONS_FIELD_NUMBER: _ClassVar[int]
     AGENT_HINT_FIELD_NUMBER: _ClassVar[int]
+    OBSERVATION_DTYPE_FIELD_NUMBER: _ClassVar[int]
+    ACTION_DTYPE_FIELD_NUMBER: _ClassVar[int]
+    OBSERVATION_SHAPE_FIELD_NUMBER: _ClassVar[int]
+    ACTION_SHAPE_FIELD_NUMBER: _ClassVar[int]
+    OBSERVATION_CODEC_FIELD_NUMBER: _ClassVar[int]
+    RESUME_FIELD_NUMBER: _ClassVar[int]
     n_observations: int
     n_actions: int
     agent_hint: int
-    def __init__(self, n_observations: _Optional[int] = ..., n_actions: _Optional[int] = ..., agent_hint: _Optional[int] = ...) -> None: ...
+    observation_dtype: int
+    action_dtype: int
+    observation_shape: _containers.RepeatedScalarFieldContainer[int]
+    action_shape: _containers.RepeatedScalarFieldContainer[int]
+    observation_codec: int
+    resume: bool
+    def __init__(self, n_observations: _Optional[int] = ..., n_actions: _Optional[int] = ..., agent_hint: _Optional[int] = ..., observation_dtype: _Optional[int] = ..., action_dtype: _Optional[int] = ..., observation_shape: _Optional[_Iterable[int]] = ..., action_shape: _Optional[_Iterable[int]] = ..., observation_codec: _Optional[int] = ..., resume: bool = ...) -> None: ...
 
 class HandshakeResponse(_message.Message):
-    __slots__ = ("id", "status")
+    __slots__ = ("id", "status", "observation_dtype", "action_dtype", "observation_shape", "action_shape", "observation_codec", "chunked", "info_schema", "agent_id", "session")
     ID_FIELD_NUMBER: _ClassVar[int]
     STATUS_FIELD_NUMBER: _ClassVar[int]
+    OBSERVATION_DTYPE_FIELD_NUMBER: _ClassVar[int]
+    ACTION_DTYPE_FIELD_NUMBER: _ClassVar[int]
+    OBSERVATION_SHAPE_FIELD_NUMBER: _ClassVar[int]
+    ACTION_SHAPE_FIELD_NUMBER: _ClassVar[int]
+    OBSERVATION_CODEC_FIELD_NUMBER: _ClassVar[int]
+    CHUNKED_FIELD_NUMBER: _ClassVar[int]
+    INFO_SCHEMA_FIELD_NUMBER: _ClassVar[int]
+    AGENT_ID_FIELD_NUMBER: _ClassVar[int]
+    SESSION_FIELD_NUMBER: _ClassVar[int]
     id: int
     status: int
-    def __init__(self, id: _Optional[int] = ..., status: _Optional[int] = ...) -> None: ...
+    observation_dtype: int
+    action_dtype: int
+    observation_shape: _containers.RepeatedScalarFieldContainer[int]
+    action_shape: _containers.RepeatedScalarFieldContainer[int]
+    observation_codec: int
+    chunked: bool
+    info_schema: str
+    agent_id: int
+    session: int
+    def __init__(self, id: _Optional[int] = ..., status: _Optional[int] = ..., observation_dtype: _Optional[int] = ..., action_dtype: _Optional[int] = ..., observation_shape: _Optional[_Iterable[int]] = ..., action_shape: _Optional[_Iterable[int]] = ..., observation_codec: _Optional[int] = ..., chunked: bool = ..., info_schema: _Optional[str] = ..., agent_id: _Optional[int] = ..., session: _Optional[int] = ...) -> None: ...
 
 class SampleRequest(_message.Message):
-    __slots__ = ("id",)
+    __slots__ = ("id", "base_tick", "session")
     ID_FIELD_NUMBER: _ClassVar[int]
+    BASE_TICK_FIELD_NUMBER: _ClassVar[int]
+    SESSION_FIELD_NUMBER: _ClassVar[int]
     id: int
-    def __init__(self, id: _Optional[int] = ...) -> None: ...
+    base_tick: int
+    session: int
+    def __init__(self, id: _Optional[int] = ..., base_tick: _Optional[int] = ..., session: _Optional[int] = ...) -> None: ...
 
 class SampleResponse(_message.Message):
-    __slots__ = ("observation", "reward", "terminated", "truncated", "episode", "status")
+    __slots__ = ("observation", "reward", "terminated", "truncated", "episode", "status", "observation_scale", "partial", "info", "tick", "base_tick", "episode_return")
     OBSERVATION_FIELD_NUMBER: _ClassVar[int]
     REWARD_FIELD_NUMBER: _ClassVar[int]
     TERMINATED_FIELD_NUMBER: _ClassVar[int]
     TRUNCATED_FIELD_NUMBER: _ClassVar[int]
     EPISODE_FIELD_NUMBER: _ClassVar[int]
     STATUS_FIELD_NUMBER: _ClassVar[int]
+    OBSERVATION_SCALE_FIELD_NUMBER: _ClassVar[int]
+    PARTIAL_FIELD_NUMBER: _ClassVar[int]
+    INFO_FIELD_NUMBER: _ClassVar[int]
+    TICK_FIELD_NUMBER: _ClassVar[int]
+    BASE_TICK_FIELD_NUMBER: _ClassVar[int]
+    EPISODE_RETURN_FIELD_NUMBER: _ClassVar[int]
     observation: bytes
     reward: float
     terminated: bool
     truncated: bool
     episode: int
     status: int
-    def __init__(self, observation: _Optional[bytes] = ..., reward: _Optional[float] = ..., terminated: bool = ..., truncated: bool = ..., episode: _Optional[int] = ..., status: _Optional[int] = ...) -> None: ...
+    observation_scale: float
+    partial: bool
+    info: bytes
+    tick: int
+    base_tick: int
+    episode_return: float
+    def __init__(self, observation: _Optional[bytes] = ..., reward: _Optional[float] = ..., terminated: bool = ..., truncated: bool = ..., episode: _Optional[int] = ..., status: _Optional[int] = ..., observation_scale: _Optional[float] = ..., partial: bool = ..., info: _Optional[bytes] = ..., tick: _Optional[int] = ..., base_tick: _Optional[int] = ..., episode_return: _Optional[float] = ...) -> None: ...
 
 class ActionRequest(_message.Message):
-    __slots__ = ("id", "action")
+    __slots__ = ("id", "action", "action_scale", "tick", "session")
     ID_FIELD_NUMBER: _ClassVar[int]
     ACTION_FIELD_NUMBER: _ClassVar[int]
+    ACTION_SCALE_FIELD_NUMBER: _ClassVar[int]
+    TICK_FIELD_NUMBER: _ClassVar[int]
+    SESSION_FIELD_NUMBER: _ClassVar[int]
     id: int
     action: bytes
-    def __init__(self, id: _Optional[int] = ..., action: _Optional[bytes] = ...) -> None: ...
+    action_scale: float
+    tick: int
+    session: int
+    def __init__(self, id: _Optional[int] = ..., action: _Optional[bytes] = ..., action_scale: _Optional[float] = ..., tick: _Optional[int] = ..., session: _Optional[int] = ...) -> None: ...
 
 class ActionResponse(_message.Message):
     __slots__ = ("status",)
     STATUS_FIELD_NUMBER: _ClassVar[int]
     status: int
     def __init__(self, status: _Optional[int] = ...) -> None: ...
+
+class ProfileRequest(_message.Message):
+    __slots__ = ("seconds", "interval_seconds", "token")
+    SECONDS_FIELD_NUMBER: _ClassVar[int]
+    INTERVAL_SECONDS_FIELD_NUMBER: _ClassVar[int]
+    TOKEN_FIELD_NUMBER: _ClassVar[int]
+    seconds: float
+    interval_seconds: float
+    token: str
+    def __init__(self, seconds: _Optional[float] = ..., interval_seconds: _Optional[float] = ..., token: _Optional[str] = ...) -> None: ...
+
+class ProfileResponse(_message.Message):
+    __slots__ = ("status", "stats")
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    STATS_FIELD_NUMBER: _ClassVar[int]
+    status: int
+    stats: bytes
+    def __init__(self, status: _Optional[int] = ..., stats: _Optional[bytes] = ...) -> None: ...
+
+class HeartbeatRequest(_message.Message):
+    __slots__ = ("id", "session")
+    ID_FIELD_NUMBER: _ClassVar[int]
+    SESSION_FIELD_NUMBER: _ClassVar[int]
+    id: int
+    session: int
+    def __init__(self, id: _Optional[int] = ..., session: _Optional[int] = ...) -> None: ...
+
+class HeartbeatResponse(_message.Message):
+    __slots__ = ("status",)
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    status: int
+    def __init__(self, status: _Optional[int] = ...) -> None: ...
+
+class SampleBatchRequest(_message.Message):
+    __slots__ = ("ids", "wait", "version", "timeout", "base_ticks", "sessions")
+    IDS_FIELD_NUMBER: _ClassVar[int]
+    WAIT_FIELD_NUMBER: _ClassVar[int]
+    VERSION_FIELD_NUMBER: _ClassVar[int]
+    TIMEOUT_FIELD_NUMBER: _ClassVar[int]
+    BASE_TICKS_FIELD_NUMBER: _ClassVar[int]
+    SESSIONS_FIELD_NUMBER: _ClassVar[int]
+    ids: _containers.RepeatedScalarFieldContainer[int]
+    wait: bool
+    version: int
+    timeout: float
+    base_ticks: _containers.RepeatedScalarFieldContainer[int]
+    sessions: _containers.RepeatedScalarFieldContainer[int]
+    def __init__(self, ids: _Optional[_Iterable[int]] = ..., wait: bool = ..., version: _Optional[int] = ..., timeout: _Optional[float] = ..., base_ticks: _Optional[_Iterable[int]] = ..., sessions: _Optional[_Iterable[int]] = ...) -> None: ...
+
+class SampleBatchResponse(_message.Message):
+    __slots__ = ("samples", "version")
+    SAMPLES_FIELD_NUMBER: _ClassVar[int]
+    VERSION_FIELD_NUMBER: _ClassVar[int]
+    samples: _containers.RepeatedCompositeFieldContainer[SampleResponse]
+    version: int
+    def __init__(self, samples: _Optional[_Iterable[_Union[SampleResponse, _Mapping]]] = ..., version: _Optional[int] = ...) -> None: ...
+
+class ActionBatchRequest(_message.Message):
+    __slots__ = ("actions",)
+    ACTIONS_FIELD_NUMBER: _ClassVar[int]
+    actions: _containers.RepeatedCompositeFieldContainer[ActionRequest]
+    def __init__(self, actions: _Optional[_Iterable[_Union[ActionRequest, _Mapping]]] = ...) -> None: ...
+
+class ActionBatchResponse(_message.Message):
+    __slots__ = ("status",)
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    status: _containers.RepeatedScalarFieldContainer[int]
+    def __init__(self, status: _Optional[_Iterable[int]] = ...) -> None: ...
+
+class HealthRequest(_message.Message):
+    __slots__ = ()
+    def __init__(self) -> None: ...
+
+class HealthResponse(_message.Message):
+    __slots__ = ("status", "ready", "free_agents", "total_agents")
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    READY_FIELD_NUMBER: _ClassVar[int]
+    FREE_AGENTS_FIELD_NUMBER: _ClassVar[int]
+    TOTAL_AGENTS_FIELD_NUMBER: _ClassVar[int]
+    status: int
+    ready: bool
+    free_agents: int
+    total_agents: int
+    def __init__(self, status: _Optional[int] = ..., ready: bool = ..., free_agents: _Optional[int] = ..., total_agents: _Optional[int] = ...) -> None: ...
@@ -24,11 +24,46 @@ class EnvironmentStub(object):
                 request_serializer=Environment__pb2.SampleRequest.SerializeToString,
                 response_deserializer=Environment__pb2.SampleResponse.FromString,
                 )
+        self.sample_stream = channel.unary_stream(
+                '/Environment.Environment/sample_stream',
+                request_serializer=Environment__pb2.SampleRequest.SerializeToString,
+                response_deserializer=Environment__pb2.SampleResponse.FromString,
+                )
+        self.subscribe = channel.stream_stream(
+                '/Environment.Environment/subscribe',
+                request_serializer=Environment__pb2.SampleRequest.SerializeToString,
+                response_deserializer=Environment__pb2.SampleResponse.FromString,
+                )
         self.act = channel.unary_unary(
                 '/Environment.Environment/act',
                 request_serializer=Environment__pb2.ActionRequest.SerializeToString,
                 response_deserializer=Environment__pb2.ActionResponse.FromString,
                 )
+        self.profile = channel.unary_unary(
+                '/Environment.Environment/profile',
+                request_serializer=Environment__pb2.ProfileRequest.SerializeToString,
+                response_deserializer=Environment__pb2.ProfileResponse.FromString,
+                )
+        self.heartbeat = channel.unary_unary(
+                '/Environment.Environment/heartbeat',
+                request_serializer=Environment__pb2.HeartbeatRequest.SerializeToString,
+                response_deserializer=Environment__pb2.HeartbeatResponse.FromString,
+                )
+        self.sample_batch = channel.unary_unary(
+                '/Environment.Environment/sample_batch',
+                request_serializer=Environment__pb2.SampleBatchRequest.SerializeToString,
+                response_deserializer=Environment__pb2.SampleBatchResponse.FromString,
+                )
+        self.act_batch = channel.unary_unary(
+                '/Environment.Environment/act_batch',
+                request_serializer=Environment__pb2.ActionBatchRequest.SerializeToString,
+                response_deserializer=Environment__pb2.ActionBatchResponse.FromString,
+                )
+        self.health = channel.unary_unary(
+                '/Environment.Environment/health',
+                request_serializer=Environment__pb2.HealthRequest.SerializeToString,
+                response_deserializer=Environment__pb2.HealthResponse.FromString,
+                )
 
 
 class EnvironmentServicer(object):
@@ -46,12 +81,54 @@ class EnvironmentServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def sample_stream(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def subscribe(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def act(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def profile(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def heartbeat(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def sample_batch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def act_batch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def health(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_EnvironmentServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -65,11 +142,46 @@ def add_EnvironmentServicer_to_server(servicer, server):
                     request_deserializer=Environment__pb2.SampleRequest.FromString,
                     response_serializer=Environment__pb2.SampleResponse.SerializeToString,
             ),
+            'sample_stream': grpc.unary_stream_rpc_method_handler(
+                    servicer.sample_stream,
+                    request_deserializer=Environment__pb2.SampleRequest.FromString,
+                    response_serializer=Environment__pb2.SampleResponse.SerializeToString,
+            ),
+            'subscribe': grpc.stream_stream_rpc_method_handler(
+                    servicer.subscribe,
+                    request_deserializer=Environment__pb2.SampleRequest.FromString,
+                    response_serializer=Environment__pb2.SampleResponse.SerializeToString,
+            ),
             'act': grpc.unary_unary_rpc_method_handler(
                     servicer.act,
                     request_deserializer=Environment__pb2.ActionRequest.FromString,
                     response_serializer=Environment__pb2.ActionResponse.SerializeToString,
             ),
+            'profile': grpc.unary_unary_rpc_method_handler(
+                    servicer.profile,
+                    request_deserializer=Environment__pb2.ProfileRequest.FromString,
+                    response_serializer=Environment__pb2.ProfileResponse.SerializeToString,
+            ),
+            'heartbeat': grpc.unary_unary_rpc_method_handler(
+                    servicer.heartbeat,
+                    request_deserializer=Environment__pb2.HeartbeatRequest.FromString,
+                    response_serializer=Environment__pb2.HeartbeatResponse.SerializeToString,
+            ),
+            'sample_batch': grpc.unary_unary_rpc_method_handler(
+                    servicer.sample_batch,
+                    request_deserializer=Environment__pb2.SampleBatchRequest.FromString,
+                    response_serializer=Environment__pb2.SampleBatchResponse.SerializeToString,
+            ),
+            'act_batch': grpc.unary_unary_rpc_method_handler(
+                    servicer.act_batch,
+                    request_deserializer=Environment__pb2.ActionBatchRequest.FromString,
+                    response_serializer=Environment__pb2.ActionBatchResponse.SerializeToString,
+            ),
+            'health': grpc.unary_unary_rpc_method_handler(
+                    servicer.health,
+                    request_deserializer=Environment__pb2.HealthRequest.FromString,
+                    response_serializer=Environment__pb2.HealthResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'Environment.Environment', rpc_method_handlers)
@@ -114,6 +226,40 @@ class Environment(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def sample_stream(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/Environment.Environment/sample_stream',
+            Environment__pb2.SampleRequest.SerializeToString,
+            Environment__pb2.SampleResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def subscribe(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/Environment.Environment/subscribe',
+            Environment__pb2.SampleRequest.SerializeToString,
+            Environment__pb2.SampleResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def act(request,
             target,
@@ -130,3 +276,88 @@ class Environment(object):
             Environment__pb2.ActionResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def profile(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Environment.Environment/profile',
+            Environment__pb2.ProfileRequest.SerializeToString,
+            Environment__pb2.ProfileResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def heartbeat(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Environment.Environment/heartbeat',
+            Environment__pb2.HeartbeatRequest.SerializeToString,
+            Environment__pb2.HeartbeatResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def sample_batch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Environment.Environment/sample_batch',
+            Environment__pb2.SampleBatchRequest.SerializeToString,
+            Environment__pb2.SampleBatchResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def act_batch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Environment.Environment/act_batch',
+            Environment__pb2.ActionBatchRequest.SerializeToString,
+            Environment__pb2.ActionBatchResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def health(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Environment.Environment/health',
+            Environment__pb2.HealthRequest.SerializeToString,
+            Environment__pb2.HealthResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
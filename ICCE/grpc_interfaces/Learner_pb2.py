@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: Learner.proto
+# Protobuf Python Version: 4.25.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rLearner.proto\x12\x07Learner\"B\n\x06Tensor\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05\x64type\x18\x02 \x01(\t\x12\r\n\x05shape\x18\x03 \x03(\x05\x12\x0c\n\x04\x64\x61ta\x18\x04 \x01(\x0c\"Y\n\nTrajectory\x12\x10\n\x08\x61\x63tor_id\x18\x01 \x01(\x05\x12\x17\n\x0fweights_version\x18\x02 \x01(\x03\x12 \n\x07tensors\x18\x03 \x03(\x0b\x32\x0f.Learner.Tensor\"=\n\x12TrajectoryResponse\x12\x0e\n\x06status\x18\x01 \x01(\x05\x12\x17\n\x0fweights_version\x18\x02 \x01(\x03\"!\n\x0eWeightsRequest\x12\x0f\n\x07version\x18\x01 \x01(\x03\"<\n\x07Weights\x12\x0f\n\x07version\x18\x01 \x01(\x03\x12 \n\x07tensors\x18\x02 \x03(\x0b\x32\x0f.Learner.Tensor2\x8d\x01\n\x07Learner\x12\x45\n\x0fpush_trajectory\x12\x13.Learner.Trajectory\x1a\x1b.Learner.TrajectoryResponse\"\x00\x12;\n\x0cpull_weights\x12\x17.Learner.WeightsRequest\x1a\x10.Learner.Weights\"\x00\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'Learner_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+  DESCRIPTOR._options = None
+  _globals['_TENSOR']._serialized_start=26
+  _globals['_TENSOR']._serialized_end=92
+  _globals['_TRAJECTORY']._serialized_start=94
+  _globals['_TRAJECTORY']._serialized_end=183
+  _globals['_TRAJECTORYRESPONSE']._serialized_start=185
+  _globals['_TRAJECTORYRESPONSE']._serialized_end=246
+  _globals['_WEIGHTSREQUEST']._serialized_start=248
+  _globals['_WEIGHTSREQUEST']._serialized_end=281
+  _globals['_WEIGHTS']._serialized_start=283
+  _globals['_WEIGHTS']._serialized_end=343
+  _globals['_LEARNER']._serialized_start=346
+  _globals['_LEARNER']._serialized_end=487
+# @@protoc_insertion_point(module_scope)
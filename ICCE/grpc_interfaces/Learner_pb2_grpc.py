@@ -0,0 +1,99 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from . import Learner_pb2 as Learner__pb2
+
+
+class LearnerStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.push_trajectory = channel.unary_unary(
+                '/Learner.Learner/push_trajectory',
+                request_serializer=Learner__pb2.Trajectory.SerializeToString,
+                response_deserializer=Learner__pb2.TrajectoryResponse.FromString,
+                )
+        self.pull_weights = channel.unary_unary(
+                '/Learner.Learner/pull_weights',
+                request_serializer=Learner__pb2.WeightsRequest.SerializeToString,
+                response_deserializer=Learner__pb2.Weights.FromString,
+                )
+
+
+class LearnerServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def push_trajectory(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def pull_weights(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_LearnerServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'push_trajectory': grpc.unary_unary_rpc_method_handler(
+                    servicer.push_trajectory,
+                    request_deserializer=Learner__pb2.Trajectory.FromString,
+                    response_serializer=Learner__pb2.TrajectoryResponse.SerializeToString,
+            ),
+            'pull_weights': grpc.unary_unary_rpc_method_handler(
+                    servicer.pull_weights,
+                    request_deserializer=Learner__pb2.WeightsRequest.FromString,
+                    response_serializer=Learner__pb2.Weights.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'Learner.Learner', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Learner(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def push_trajectory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Learner.Learner/push_trajectory',
+            Learner__pb2.Trajectory.SerializeToString,
+            Learner__pb2.TrajectoryResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def pull_weights(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Learner.Learner/pull_weights',
+            Learner__pb2.WeightsRequest.SerializeToString,
+            Learner__pb2.Weights.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
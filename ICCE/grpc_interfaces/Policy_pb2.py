@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: Policy.proto
+# Protobuf Python Version: 4.25.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0cPolicy.proto\x12\x06Policy\"$\n\rPolicyRequest\x12\x13\n\x0bobservation\x18\x01 \x01(\x0c\"0\n\x0ePolicyResponse\x12\x0e\n\x06\x61\x63tion\x18\x01 \x01(\x0c\x12\x0e\n\x06status\x18\x02 \x01(\x05\x32@\n\x06Policy\x12\x36\n\x03\x61\x63t\x12\x15.Policy.PolicyRequest\x1a\x16.Policy.PolicyResponse\"\x00\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'Policy_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+  DESCRIPTOR._options = None
+  _globals['_POLICYREQUEST']._serialized_start=24
+  _globals['_POLICYREQUEST']._serialized_end=60
+  _globals['_POLICYRESPONSE']._serialized_start=62
+  _globals['_POLICYRESPONSE']._serialized_end=110
+  _globals['_POLICY']._serialized_start=112
+  _globals['_POLICY']._serialized_end=176
+# @@protoc_insertion_point(module_scope)
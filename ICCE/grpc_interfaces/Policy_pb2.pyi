@@ -0,0 +1,19 @@
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import message as _message
+from typing import ClassVar as _ClassVar, Optional as _Optional
+
+DESCRIPTOR: _descriptor.FileDescriptor
+
+class PolicyRequest(_message.Message):
+    __slots__ = ("observation",)
+    OBSERVATION_FIELD_NUMBER: _ClassVar[int]
+    observation: bytes
+    def __init__(self, observation: _Optional[bytes] = ...) -> None: ...
+
+class PolicyResponse(_message.Message):
+    __slots__ = ("action", "status")
+    ACTION_FIELD_NUMBER: _ClassVar[int]
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    action: bytes
+    status: int
+    def __init__(self, action: _Optional[bytes] = ..., status: _Optional[int] = ...) -> None: ...
@@ -0,0 +1,66 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from . import Policy_pb2 as Policy__pb2
+
+
+class PolicyStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.act = channel.unary_unary(
+                '/Policy.Policy/act',
+                request_serializer=Policy__pb2.PolicyRequest.SerializeToString,
+                response_deserializer=Policy__pb2.PolicyResponse.FromString,
+                )
+
+
+class PolicyServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def act(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_PolicyServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'act': grpc.unary_unary_rpc_method_handler(
+                    servicer.act,
+                    request_deserializer=Policy__pb2.PolicyRequest.FromString,
+                    response_serializer=Policy__pb2.PolicyResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'Policy.Policy', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Policy(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def act(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Policy.Policy/act',
+            Policy__pb2.PolicyRequest.SerializeToString,
+            Policy__pb2.PolicyResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
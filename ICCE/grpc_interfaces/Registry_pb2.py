@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: Registry.proto
+# Protobuf Python Version: 4.25.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0eRegistry.proto\x12\x08Registry\"\x94\x01\n\rAdvertisement\x12\x0f\n\x07ip_addr\x18\x01 \x01(\t\x12\x0c\n\x04port\x18\x02 \x01(\x05\x12\x12\n\nfree_slots\x18\x03 \x01(\x05\x12\x13\n\x0btotal_slots\x18\x04 \x01(\x05\x12\x16\n\x0en_observations\x18\x05 \x01(\x05\x12\x11\n\tn_actions\x18\x06 \x01(\x05\x12\x10\n\x08n_mapped\x18\x07 \x01(\x04\"#\n\x11\x41\x64vertiseResponse\x12\x0e\n\x06status\x18\x01 \x01(\x05\":\n\rAssignRequest\x12\x16\n\x0en_observations\x18\x01 \x01(\x05\x12\x11\n\tn_actions\x18\x02 \x01(\x05\";\n\nAssignment\x12\x0e\n\x06status\x18\x01 \x01(\x05\x12\x0f\n\x07ip_addr\x18\x02 \x01(\t\x12\x0c\n\x04port\x18\x03 \x01(\x05\x32\x8a\x01\n\x08Registry\x12\x43\n\tadvertise\x12\x17.Registry.Advertisement\x1a\x1b.Registry.AdvertiseResponse\"\x00\x12\x39\n\x06\x61ssign\x12\x17.Registry.AssignRequest\x1a\x14.Registry.Assignment\"\x00\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'Registry_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+  DESCRIPTOR._options = None
+  _globals['_ADVERTISEMENT']._serialized_start=29
+  _globals['_ADVERTISEMENT']._serialized_end=177
+  _globals['_ADVERTISERESPONSE']._serialized_start=179
+  _globals['_ADVERTISERESPONSE']._serialized_end=214
+  _globals['_ASSIGNREQUEST']._serialized_start=216
+  _globals['_ASSIGNREQUEST']._serialized_end=274
+  _globals['_ASSIGNMENT']._serialized_start=276
+  _globals['_ASSIGNMENT']._serialized_end=335
+  _globals['_REGISTRY']._serialized_start=338
+  _globals['_REGISTRY']._serialized_end=476
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,47 @@
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import message as _message
+from typing import ClassVar as _ClassVar, Optional as _Optional
+
+DESCRIPTOR: _descriptor.FileDescriptor
+
+class Advertisement(_message.Message):
+    __slots__ = ("ip_addr", "port", "free_slots", "total_slots", "n_observations", "n_actions", "n_mapped")
+    IP_ADDR_FIELD_NUMBER: _ClassVar[int]
+    PORT_FIELD_NUMBER: _ClassVar[int]
+    FREE_SLOTS_FIELD_NUMBER: _ClassVar[int]
+    TOTAL_SLOTS_FIELD_NUMBER: _ClassVar[int]
+    N_OBSERVATIONS_FIELD_NUMBER: _ClassVar[int]
+    N_ACTIONS_FIELD_NUMBER: _ClassVar[int]
+    N_MAPPED_FIELD_NUMBER: _ClassVar[int]
+    ip_addr: str
+    port: int
+    free_slots: int
+    total_slots: int
+    n_observations: int
+    n_actions: int
+    n_mapped: int
+    def __init__(self, ip_addr: _Optional[str] = ..., port: _Optional[int] = ..., free_slots: _Optional[int] = ..., total_slots: _Optional[int] = ..., n_observations: _Optional[int] = ..., n_actions: _Optional[int] = ..., n_mapped: _Optional[int] = ...) -> None: ...
+
+class AdvertiseResponse(_message.Message):
+    __slots__ = ("status",)
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    status: int
+    def __init__(self, status: _Optional[int] = ...) -> None: ...
+
+class AssignRequest(_message.Message):
+    __slots__ = ("n_observations", "n_actions")
+    N_OBSERVATIONS_FIELD_NUMBER: _ClassVar[int]
+    N_ACTIONS_FIELD_NUMBER: _ClassVar[int]
+    n_observations: int
+    n_actions: int
+    def __init__(self, n_observations: _Optional[int] = ..., n_actions: _Optional[int] = ...) -> None: ...
+
+class Assignment(_message.Message):
+    __slots__ = ("status", "ip_addr", "port")
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    IP_ADDR_FIELD_NUMBER: _ClassVar[int]
+    PORT_FIELD_NUMBER: _ClassVar[int]
+    status: int
+    ip_addr: str
+    port: int
+    def __init__(self, status: _Optional[int] = ..., ip_addr: _Optional[str] = ..., port: _Optional[int] = ...) -> None: ...
@@ -0,0 +1,99 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from . import Registry_pb2 as Registry__pb2
+
+
+class RegistryStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.advertise = channel.unary_unary(
+                '/Registry.Registry/advertise',
+                request_serializer=Registry__pb2.Advertisement.SerializeToString,
+                response_deserializer=Registry__pb2.AdvertiseResponse.FromString,
+                )
+        self.assign = channel.unary_unary(
+                '/Registry.Registry/assign',
+                request_serializer=Registry__pb2.AssignRequest.SerializeToString,
+                response_deserializer=Registry__pb2.Assignment.FromString,
+                )
+
+
+class RegistryServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def advertise(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def assign(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_RegistryServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'advertise': grpc.unary_unary_rpc_method_handler(
+                    servicer.advertise,
+                    request_deserializer=Registry__pb2.Advertisement.FromString,
+                    response_serializer=Registry__pb2.AdvertiseResponse.SerializeToString,
+            ),
+            'assign': grpc.unary_unary_rpc_method_handler(
+                    servicer.assign,
+                    request_deserializer=Registry__pb2.AssignRequest.FromString,
+                    response_serializer=Registry__pb2.Assignment.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'Registry.Registry', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Registry(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def advertise(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Registry.Registry/advertise',
+            Registry__pb2.Advertisement.SerializeToString,
+            Registry__pb2.AdvertiseResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def assign(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Registry.Registry/assign',
+            Registry__pb2.AssignRequest.SerializeToString,
+            Registry__pb2.Assignment.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
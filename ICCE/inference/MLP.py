@@ -0,0 +1,341 @@
+import importlib.util
+import json
+import os
+import struct
+
+import numpy as np
+
+# Weight file layout: magic, header length (uint64), JSON header padded to _ALIGNMENT, then the float32 parameters of every
+# layer in order, each as its row-major weight followed by its (n_out,) bias. Weights are stored as (n_out, n_in), or as
+# (n_in, n_out) if transposed, so that the inner loop of the compiled kernel runs over the longer, contiguous dimension
+_MAGIC = b'ICCEMLP1'
+_ALIGNMENT = 64
+_PREFIX = struct.Struct('<8sQ')
+_DTYPE = np.dtype('<f4')
+
+# Activation -> code of the compiled kernel
+_ACTIVATIONS = {'identity': 0, 'relu': 1, 'tanh': 2, 'sigmoid': 3, 'softmax': 4}
+
+# Layout columns of a layer, in float32 elements: weight offset, bias offset, input size, output size, input offset and
+# output offset in the activations buffer, activation code, whether the weight is transposed
+_W, _B, _N_IN, _N_OUT, _X, _Y, _ACTIVATION, _TRANSPOSED = range(8)
+
+def flatten_mlp(layers: list, heads: dict | None = None, activation: str = 'relu',
+                head_activations: dict[str, str] | None = None) -> tuple[dict, np.ndarray]:
+    """ Flattens a trained MLP into the header and parameters run by `MLP`, e.g. to publish them to a `WeightStore`.
+
+    The MLP is a trunk of linear layers, each followed by `activation`, feeding one or more linear heads, e.g. the actor
+    and critic of an actor-critic policy. Output layers are heads, so that they are not followed by the trunk's activation.
+
+    Args:
+        layers : The linear layers of the trunk, in order, as `torch.nn.Linear` or (weight, bias) arrays of shapes
+            (n_out, n_in) and (n_out,).
+        heads : The linear layers of the heads by name, fed by the last layer of the trunk. Outputs of `MLP` are ordered like
+            heads. The last layer of the trunk is the only output if None.
+        activation : The activation of the trunk's layers.
+        head_activations : The activation of each head by name. Heads are linear if not specified.
+
+    Returns:
+        The header describing the layers, and the flat float32 parameters of every layer.
+
+    Raises:
+        ValueError: If an activation is unknown, or the layer sizes do not chain.
+    """
+    head_activations = head_activations if head_activations is not None else {}
+    specs, parameters = [], []
+    def add(name: str, layer, input: str | None, layer_activation: str):
+        if layer_activation not in _ACTIVATIONS:
+            raise ValueError(f"Unknown activation '{layer_activation}', expected one of {list(_ACTIVATIONS)}")
+        weight, bias = _parameters(layer)
+        if input is not None and weight.shape[1] != next(spec['n_out'] for spec in specs if spec['name'] == input):
+            raise ValueError(f"Input size of layer '{name}' does not match the output size of layer '{input}'!")
+        n_out, n_in = weight.shape
+        specs.append({'name': name, 'input': input, 'n_in': n_in, 'n_out': n_out, 'activation': layer_activation, 'transposed': n_out > n_in})
+        parameters.extend([(weight.T if n_out > n_in else weight).ravel(), bias.ravel()])
+
+    for i, layer in enumerate(layers):
+        add(f'layer_{i}', layer, specs[-1]['name'] if specs else None, activation)
+    trunk = specs[-1]['name']
+    for name, layer in (heads or {}).items():
+        add(name, layer, trunk, head_activations.get(name, 'identity'))
+    outputs = list(heads) if heads else [trunk]
+    return {'dtype': _DTYPE.str, 'layers': specs, 'outputs': outputs}, np.concatenate(parameters).astype(_DTYPE)
+
+def export_mlp(path: str, layers: list, heads: dict | None = None, activation: str = 'relu', head_activations: dict[str, str] | None = None):
+    """ Exports a trained MLP to a compact weight file, loaded by `MLP.load()` without torch.
+
+    The file is written to a temporary file which is atomically renamed into place. Refer to `flatten_mlp()` for the
+    arguments.
+    """
+    header, parameters = flatten_mlp(layers, heads=heads, activation=activation, head_activations=head_activations)
+    header = json.dumps(header).encode()
+    header += b' ' * (-(_PREFIX.size + len(header)) % _ALIGNMENT)
+    tmp_path = path+'.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(_PREFIX.pack(_MAGIC, len(header)))
+        file.write(header)
+        file.write(parameters.tobytes())
+    os.replace(tmp_path, path)
+
+def read_mlp(path: str, mmap: bool = False) -> tuple[dict, np.ndarray]:
+    """ Reads the header and parameters of a weight file.
+
+    Args:
+        path : The path of the weight file.
+        mmap : Whether to map the parameters read-only instead of reading them into memory.
+
+    Returns:
+        The header and the flat float32 parameters.
+
+    Raises:
+        ValueError: If the file is not a weight file.
+    """
+    with open(path, 'rb') as file:
+        magic, header_length = _PREFIX.unpack(file.read(_PREFIX.size))
+        if magic != _MAGIC:
+            raise ValueError(f"'{path}' is not an MLP weight file!")
+        header = json.loads(file.read(header_length))
+        if mmap:
+            parameters = np.memmap(path, dtype=_DTYPE, mode='r', offset=_PREFIX.size + header_length)
+        else:
+            parameters = np.fromfile(file, dtype=_DTYPE)
+    return header, parameters
+
+
+class MLP:
+    """ Inference runtime of an MLP exported by `export_mlp()`, using NumPy or Numba instead of torch.
+
+    Outputs are computed into preallocated buffers, so that calling the MLP does not allocate: the returned arrays are
+    overwritten by the next call, and must be copied to be retained. With the 'numba' backend, a whole forward pass is a
+    single compiled call (cached on disk after the first compilation), which avoids the per-operation dispatch overhead of
+    NumPy and torch at batch size 1.
+
+    Args:
+        header : The header of the weight file, describing the layers.
+        parameters : The flat float32 parameters of every layer. Referenced, not copied, e.g. to run on mapped weights.
+        backend : 'numpy' or 'numba'.
+
+    Raises:
+        ValueError: If the backend is unknown, or the parameters do not match the layers.
+    """
+    def __init__(self, header: dict, parameters: np.ndarray, backend: str = 'numpy'):
+        if backend not in ('numpy', 'numba'):
+            raise ValueError(f"Unknown backend '{backend}', expected 'numpy' or 'numba'")
+        self.header = header
+        self.backend = backend
+        layers = header['layers']
+        self.n_inputs = layers[0]['n_in']
+        self.output_names: list[str] = header['outputs']
+
+        # Activations buffer, holding the input followed by the output of every layer
+        offsets = {None: 0}
+        self.layout = np.zeros(shape=(len(layers), 8), dtype=np.int64)
+        parameter_offset, value_offset = 0, self.n_inputs
+        for i, layer in enumerate(layers):
+            n_in, n_out = layer['n_in'], layer['n_out']
+            self.layout[i] = (parameter_offset, parameter_offset + n_in * n_out, n_in, n_out, offsets[layer['input']], value_offset,
+                              _ACTIVATIONS[layer['activation']], layer['transposed'])
+            offsets[layer['name']] = value_offset
+            parameter_offset += n_in * n_out + n_out
+            value_offset += n_out
+        if parameters.size != parameter_offset:
+            raise ValueError(f'Expected {parameter_offset} parameters, got {parameters.size}!')
+        self.n_parameters = parameter_offset
+        self._values = np.zeros(shape=value_offset, dtype=_DTYPE)
+        self._input = self._values[:self.n_inputs]
+        sizes = {layer['name']: layer['n_out'] for layer in layers}
+        self.outputs = tuple(self._values[offsets[name]:offsets[name] + sizes[name]] for name in self.output_names)
+
+        self._kernel = _numba_forward() if backend == 'numba' else None
+        self.store = None # WeightStore the parameters are mapped from, refreshed to its latest version every call
+        self._generation = 0 # Generation of the store's region
+        self.load_parameters(parameters)
+
+    @classmethod
+    def load(cls, path: str, backend: str = 'numpy', mmap: bool = False) -> 'MLP':
+        """ Loads an MLP from a weight file.
+
+        Args:
+            path : The path of the weight file.
+            backend : 'numpy' or 'numba'.
+            mmap : Whether to map the parameters read-only instead of reading them into memory.
+
+        Returns:
+            The MLP.
+        """
+        header, parameters = read_mlp(path, mmap=mmap)
+        return cls(header, parameters, backend=backend)
+
+    @classmethod
+    def attach(cls, name: str, backend: str = 'numpy', timeout_seconds: float = 30.0) -> 'MLP':
+        """ Attaches an MLP to the parameters published to a host-local `WeightStore`, mapped read-only.
+
+        Every call runs on the latest published version: refreshing to a new version only swaps the mapped parameters.
+
+        Args:
+            name : The name of the weight store.
+            backend : 'numpy' or 'numba'.
+            timeout_seconds : The maximum time to wait for the store to be published.
+
+        Returns:
+            The MLP.
+        """
+        from .WeightStore import WeightStore
+        store = WeightStore.attach(name, timeout_seconds=timeout_seconds)
+        mlp = cls(store.metadata, store.parameters, backend=backend)
+        mlp.store, mlp._generation = store, store.generation
+        return mlp
+
+    @property
+    def version(self) -> int:
+        """ The version of the parameters of the weight store the MLP runs on, 0 if not attached to a store. """
+        return self.store.version if self.store is not None else 0
+
+    def load_parameters(self, parameters: np.ndarray):
+        """ Swaps the parameters the MLP runs on, without copying them, e.g. to new weights of the same layers.
+
+        Args:
+            parameters : The flat float32 parameters of every layer.
+
+        Raises:
+            ValueError: If the parameters do not match the layers.
+        """
+        if parameters.size != self.n_parameters or parameters.dtype != _DTYPE:
+            raise ValueError(f'Expected {self.n_parameters} {_DTYPE} parameters, got {parameters.size} {parameters.dtype}!')
+        self.parameters = parameters
+        # Operands of each layer's product, as views of its weight and of its input in the activations buffer, followed by
+        # views of its bias and output
+        self._layers = []
+        for w, b, n_in, n_out, x, y, activation, transposed in self.layout.tolist():
+            inputs = self._values[x:x + n_in]
+            if transposed:
+                operands = (inputs, parameters[w:b].reshape(n_in, n_out))
+            else:
+                operands = (parameters[w:b].reshape(n_out, n_in), inputs)
+            self._layers.append((*operands, parameters[b:b + n_out], self._values[y:y + n_out], activation))
+
+    def __call__(self, observation: np.ndarray) -> tuple[np.ndarray, ...]:
+        """ Runs a forward pass.
+
+        Args:
+            observation : The input, of n_inputs elements.
+
+        Returns:
+            The output of each head, overwritten by the next call.
+
+        Raises:
+            ValueError: If the weight store the MLP is attached to was recreated with different layers.
+        """
+        np.copyto(self._input, observation.reshape(-1), casting='unsafe')
+        if self.store is None:
+            return self._forward()
+
+        while True:
+            if self.store.update():
+                # The writer may have recreated the store for a different model
+                if self.store.generation != self._generation:
+                    if self.store.metadata != self.header:
+                        raise ValueError('The weight store was recreated with different layers!')
+                    self._generation = self.store.generation
+                self.load_parameters(self.store.parameters)
+            self._forward()
+            # Rerun on the latest version if the writer overwrote the parameters during the pass
+            if self.store.valid():
+                return self.outputs
+
+
+    ########## HELPERS ##########
+    def _forward(self) -> tuple[np.ndarray, ...]:
+        """ Runs a forward pass on the input in the activations buffer. """
+        if self._kernel is not None:
+            self._kernel(self.parameters, self.layout, self._values)
+            return self.outputs
+
+        for left, right, bias, y, activation in self._layers:
+            np.matmul(left, right, out=y)
+            y += bias
+            match(activation):
+                case 1: # relu
+                    np.maximum(y, 0.0, out=y)
+                case 2: # tanh
+                    np.tanh(y, out=y)
+                case 3: # sigmoid
+                    np.negative(y, out=y)
+                    np.exp(y, out=y)
+                    y += 1.0
+                    np.reciprocal(y, out=y)
+                case 4: # softmax
+                    y -= y.max()
+                    np.exp(y, out=y)
+                    y /= y.sum()
+        return self.outputs
+
+
+########## HELPERS ##########
+def _parameters(layer) -> tuple[np.ndarray, np.ndarray]:
+    """ Helper func to retrieve the weight and bias of a linear layer as float32 arrays. """
+    if isinstance(layer, (tuple, list)):
+        weight, bias = layer
+    else:
+        weight, bias = layer.weight, layer.bias
+    weight = _to_numpy(weight)
+    bias = _to_numpy(bias) if bias is not None else np.zeros(shape=weight.shape[0], dtype=_DTYPE)
+    return weight.astype(_DTYPE), bias.astype(_DTYPE)
+
+def _to_numpy(array) -> np.ndarray:
+    # torch.Tensor, duck-typed so that torch is not imported
+    if hasattr(array, 'detach'):
+        return array.detach().cpu().numpy()
+    return np.asarray(array)
+
+_kernel = None
+
+def _numba_forward():
+    """ Helper func to compile the forward pass of the 'numba' backend once per process, on first use. """
+    global _kernel
+    if _kernel is not None:
+        return _kernel
+    if importlib.util.find_spec('numba') is None:
+        raise ImportError("The 'numba' backend requires numba to be installed")
+    import numba
+
+    @numba.njit(cache=True, fastmath=True)
+    def forward(parameters, layout, values):
+        zero, one = np.float32(0.0), np.float32(1.0)
+        for i in range(layout.shape[0]):
+            w, b, n_in, n_out = layout[i, _W], layout[i, _B], layout[i, _N_IN], layout[i, _N_OUT]
+            x, y, activation = layout[i, _X], layout[i, _Y], layout[i, _ACTIVATION]
+            inputs, outputs = values[x:x + n_in], values[y:y + n_out]
+            if layout[i, _TRANSPOSED]:
+                # Accumulate each input's column of the weight into the outputs
+                weight = parameters[w:b].reshape((n_in, n_out))
+                outputs[:] = parameters[b:b + n_out]
+                for k in range(n_in):
+                    value = inputs[k]
+                    for j in range(n_out):
+                        outputs[j] += weight[k, j] * value
+            else:
+                # Dot product of each output's row of the weight with the inputs
+                weight = parameters[w:b].reshape((n_out, n_in))
+                for j in range(n_out):
+                    acc = zero
+                    for k in range(n_in):
+                        acc += weight[j, k] * inputs[k]
+                    outputs[j] = acc + parameters[b + j]
+            for j in range(n_out):
+                if activation == 1:
+                    outputs[j] = max(outputs[j], zero)
+                elif activation == 2:
+                    outputs[j] = np.tanh(outputs[j])
+                elif activation == 3:
+                    outputs[j] = one / (one + np.exp(-outputs[j]))
+            if activation == 4:
+                peak = outputs.max()
+                total = zero
+                for j in range(n_out):
+                    outputs[j] = np.exp(outputs[j] - peak)
+                    total += outputs[j]
+                outputs /= total
+
+    _kernel = forward
+    return _kernel
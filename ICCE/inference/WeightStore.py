@@ -0,0 +1,280 @@
+from multiprocessing import shared_memory
+from ..simulation.StateTable import _attach, _align
+
+import json
+import numpy as np
+import secrets
+import time
+
+# Layout of the header, as int64 fields. Sizes and generation are immutable once the magic is set, and the magic is
+# cleared when the region is retired
+VERSION, ACTIVE, N_SLOTS, N_PARAMETERS, METADATA_LENGTH, GENERATION, MAGIC = range(7)
+_MAGIC = 0x49434357 # 'ICCW'
+
+# Slot sequence numbers are on their own cache line, followed by the metadata and the slots
+_HEADER_OFFSET = 0
+_SEQUENCES_OFFSET = 64
+_DTYPE = np.dtype('<f4')
+
+# Interval at which readers check that the region was not recreated, e.g. by a writer restarted after its region was
+# unlinked without being retired, in seconds
+_REATTACH_SECONDS = 1.0
+
+class WeightStore:
+    """ Host-local shared memory region holding versions of the parameters of a model, e.g. of an `MLP`.
+
+    A single writer publishes parameters into one of `n_slots` slots, then makes it the active slot and increments the
+    version. Readers map the active slot without copying it, so that every process of the host shares a single copy of the
+    parameters, and refreshing to a new version only swaps the view read from.
+
+    Each slot is protected by a seqlock: its sequence number is odd while the slot is being written. The writer only
+    overwrites a slot after publishing to every other slot, so readers run on the parameters they mapped for at least
+    `n_slots - 1` publishes, and `valid()` detects if a slot was overwritten since it was mapped, e.g. by a fast writer.
+    Stores are assumed to be observed in program order by other processes, as on x86-64.
+
+    Each region is stamped with a random generation. The writer retires its region when closed, and a new writer retires
+    the region left by a crashed one. Readers re-attach to the region recreated under the same name once a version is
+    published to it, checking at most every second, and keep running on the parameters they mapped until then.
+
+    Args:
+        memory : The shared memory region.
+        writer : Whether the region is owned by this process, which unlinks it when closed.
+    """
+    def __init__(self, memory: shared_memory.SharedMemory, writer: bool = False):
+        self.memory = memory
+        self.writer = writer
+        self.header = np.ndarray(shape=(MAGIC+1,), dtype=np.int64, buffer=memory.buf, offset=_HEADER_OFFSET)
+
+        # Version and view of the slot mapped by this process
+        self.version = 0
+        self.parameters: np.ndarray | None = None
+        self._slot = 0
+        self._sequence = 0
+
+        # Regions left by re-attaching, closed once the parameters mapped from them are no longer referenced
+        self._retired: list[shared_memory.SharedMemory] = []
+        self._next_reattach = time.monotonic() + _REATTACH_SECONDS
+
+    @classmethod
+    def create(cls, name: str, metadata: dict, n_parameters: int, n_slots: int = 3) -> 'WeightStore':
+        """ Creates the region, replacing any region of the same name left by a previous writer.
+
+        Args:
+            name : The name of the region, shared by the writer and readers of the host.
+            metadata : Describes the parameters, e.g. the header of an `MLP`, as returned by `flatten_mlp()`.
+            n_parameters : The number of float32 parameters of a version.
+            n_slots : The number of slots, at least 2.
+
+        Returns:
+            The writable store, without a published version.
+        """
+        if n_slots < 2:
+            raise ValueError('A weight store requires at least 2 slots!')
+        metadata = json.dumps(metadata).encode()
+        size = cls._slots_offset(n_slots, len(metadata)) + n_slots * _align(n_parameters * _DTYPE.itemsize)
+        try:
+            memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=name)
+            cls._retire(stale)
+            stale.close()
+            stale.unlink()
+            memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        store = cls(memory, writer=True)
+        store.header[:] = 0
+        store.header[N_SLOTS] = n_slots
+        store.header[N_PARAMETERS] = n_parameters
+        store.header[METADATA_LENGTH] = len(metadata)
+        store.header[GENERATION] = secrets.randbits(63) or 1
+        store._map()
+        store._metadata_bytes[:] = np.frombuffer(metadata, dtype=np.uint8)
+        store.sequences[:] = 0
+        # Readers wait for the magic, so that they never map a region whose sizes are not yet written, nor a retired region
+        store.header[MAGIC] = _MAGIC
+        return store
+
+    @classmethod
+    def attach(cls, name: str, timeout_seconds: float = 30.0) -> 'WeightStore':
+        """ Attaches to the region created by the writer, waiting for it to be created and for a version to be published.
+
+        Args:
+            name : The name of the region.
+            timeout_seconds : The maximum time to wait.
+
+        Returns:
+            The store, mapping the latest version read-only.
+
+        Raises:
+            TimeoutError: If no version was published within timeout_seconds.
+        """
+        deadline = time.monotonic() + timeout_seconds
+        store = None
+        while True:
+            try:
+                if store is None:
+                    memory = _attach(name)
+                    if memory.size >= _SEQUENCES_OFFSET:
+                        store = cls(memory)
+                        if store.header[MAGIC] == _MAGIC:
+                            store._map()
+                        else:
+                            store.close()
+                            store = None
+                    else:
+                        memory.close()
+                if store is not None and store.update():
+                    return store
+            except FileNotFoundError:
+                pass
+            if time.monotonic() > deadline:
+                if store is not None:
+                    store.close()
+                raise TimeoutError(f"Weight store '{name}' was not published within {timeout_seconds} seconds")
+            time.sleep(0.01)
+
+    @property
+    def n_slots(self) -> int:
+        return int(self.header[N_SLOTS])
+
+    @property
+    def n_parameters(self) -> int:
+        return int(self.header[N_PARAMETERS])
+
+    @property
+    def metadata(self) -> dict:
+        return json.loads(self._metadata_bytes.tobytes())
+
+    @property
+    def generation(self) -> int:
+        """ The random generation of the region, which differs for every region created under the same name. """
+        return int(self.header[GENERATION])
+
+    @property
+    def published_version(self) -> int:
+        """ The latest version published by the writer. """
+        return int(self.header[VERSION])
+
+    def publish(self, parameters: np.ndarray) -> int:
+        """ Publishes a version of the parameters, which readers map on their next `update()`. Writer only.
+
+        Args:
+            parameters : The flat parameters, cast to float32.
+
+        Returns:
+            The published version.
+        """
+        slot = (int(self.header[ACTIVE]) + 1) % self.n_slots if self.header[VERSION] > 0 else 0
+        self.sequences[slot] += 1
+        np.copyto(self.slots[slot], parameters.reshape(-1), casting='same_kind')
+        self.sequences[slot] += 1
+        self.header[ACTIVE] = slot
+        self.header[VERSION] += 1
+        self.version = int(self.header[VERSION])
+        self.parameters = self.slots[slot]
+        return self.version
+
+    def update(self) -> bool:
+        """ Maps the latest version, if newer than the mapped one.
+
+        Readers re-attach to the region recreated under the same name once a version is published to it, if the writer
+        retired the region or its region was unlinked, e.g. by the resource tracker of a crashed writer. The metadata of
+        the recreated region may differ.
+
+        Returns:
+            Whether a newer version, or the version of a recreated region, was mapped, as `parameters`.
+        """
+        if self._retired:
+            self._close_retired()
+        if not self.writer and time.monotonic() >= self._next_reattach:
+            self._next_reattach = time.monotonic() + _REATTACH_SECONDS
+            if not self._reattach() and self.header[MAGIC] != _MAGIC:
+                return False
+        version = int(self.header[VERSION])
+        if version == self.version:
+            return False
+        while True:
+            slot = int(self.header[ACTIVE])
+            sequence = int(self.sequences[slot])
+            # The active slot is only written after n_slots - 1 further publishes
+            if not sequence & 1:
+                break
+            time.sleep(0)
+        self._slot, self._sequence = slot, sequence
+        self.parameters = self.slots[slot]
+        self.version = version
+        return True
+
+    def valid(self) -> bool:
+        """ Whether the mapped parameters were not overwritten since they were mapped. """
+        return self.sequences[self._slot] == self._sequence
+
+    def close(self):
+        """ Releases the views of the region, then closes it. The writer also retires and unlinks it. """
+        self.header = self.sequences = self.slots = self.parameters = self._metadata_bytes = None
+        if self.writer:
+            self._retire(self.memory)
+        self.memory.close()
+        if self.writer:
+            self.memory.unlink()
+        self._close_retired()
+
+
+    ########## HELPERS ##########
+    def _reattach(self) -> bool:
+        """ Attaches to the region created under the name of the mapped region, if it was recreated and published to.
+
+        Returns:
+            Whether the store was re-attached. The parameters mapped from the previous region are used until then.
+        """
+        try:
+            store = WeightStore.attach(self.memory.name, timeout_seconds=0.0)
+        except TimeoutError:
+            return False
+        if store.generation == self.generation:
+            store.close()
+            return False
+
+        # The retired region is closed once the parameters mapped from it are no longer referenced, e.g. by an MLP
+        self._retired.append(self.memory)
+        self.memory = store.memory
+        self.header, self.sequences, self.slots, self._metadata_bytes = store.header, store.sequences, store.slots, store._metadata_bytes
+        self.version = 0
+        print(f"Weight store '{self.memory.name}' was recreated, re-attached to generation {self.generation}")
+        return True
+
+    def _close_retired(self):
+        """ Closes the regions left by re-attaching whose parameters are no longer referenced. """
+        for memory in list(self._retired):
+            try:
+                memory.close()
+            except BufferError:
+                continue
+            self._retired.remove(memory)
+
+    @staticmethod
+    def _retire(memory: shared_memory.SharedMemory):
+        """ Clears the magic of a region, so that its readers re-attach to the region recreated under its name. """
+        if memory.size >= _SEQUENCES_OFFSET:
+            header = np.ndarray(shape=(MAGIC+1,), dtype=np.int64, buffer=memory.buf, offset=_HEADER_OFFSET)
+            header[MAGIC] = 0
+            del header
+
+    def _map(self):
+        """ Maps the slot sequence numbers, metadata and slots of the region. """
+        n_slots, n_parameters, metadata_length = self.n_slots, self.n_parameters, int(self.header[METADATA_LENGTH])
+        buffer = self.memory.buf
+        self.sequences = np.ndarray(shape=(n_slots,), dtype=np.int64, buffer=buffer, offset=_SEQUENCES_OFFSET)
+        self._metadata_bytes = np.ndarray(shape=(metadata_length,), dtype=np.uint8, buffer=buffer,
+                                          offset=_align(_SEQUENCES_OFFSET + n_slots * 8))
+        slots_offset, slot_size = self._slots_offset(n_slots, metadata_length), _align(n_parameters * _DTYPE.itemsize)
+        self.slots = [np.ndarray(shape=(n_parameters,), dtype=_DTYPE, buffer=buffer, offset=slots_offset + i * slot_size)
+                      for i in range(n_slots)]
+        # Readers map the parameters read-only
+        if not self.writer:
+            for slot in self.slots:
+                slot.flags.writeable = False
+
+    @staticmethod
+    def _slots_offset(n_slots: int, metadata_length: int) -> int:
+        return _align(_align(_SEQUENCES_OFFSET + n_slots * 8) + metadata_length)
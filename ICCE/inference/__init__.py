@@ -0,0 +1,2 @@
+from .MLP import MLP, export_mlp, flatten_mlp, read_mlp
+from .WeightStore import WeightStore
\ No newline at end of file
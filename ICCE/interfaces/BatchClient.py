@@ -0,0 +1,251 @@
+import grpc
+from .ICCEEndpoint import ICCEEndpoint
+from ..grpc_interfaces import Environment_pb2
+from ..utils import Status, DType, Compression, INVALID_ID
+from ..utils import encoding, codecs
+
+import numpy as np
+import threading
+import time
+
+class BatchClient():
+    """ Client of an `EnvironmentInterface` which drives many of its agents with one batched RPC per tick.
+
+    Every agent is handshaked as an ICCE, so the environment maps, validates and evicts them as it does ICCEs. Each tick,
+    the actions of all agents are sent with a single `act_batch` RPC and their environment data is received with a single
+    `sample_batch` RPC, decoded in place into the preallocated `observations`, `rewards`, `terminated` and `truncated`
+    arrays (indexed like `agent_ids`). Used by the Gymnasium and PettingZoo adapters of `ICCE.adapters`.
+
+    Args:
+        n_agents : The number of agents to drive.
+        n_observations : The observation size of an agent.
+        n_actions : The action size of an agent.
+        observation_dtype : The requested wire dtype of observations.
+        action_dtype : The requested wire dtype of actions.
+        observation_codec : The requested codec of observations.
+        agent_hints : The Simulation Agent ID to request for each agent, INVALID_ID for any.
+        ip_addr : The IP address of the environment.
+        port : The port of the environment.
+        heartbeat_seconds : Interval at which heartbeats keep the agents mapped while not stepped, e.g. while learning.
+            Heartbeats are not sent if None.
+    """
+    def __init__(self, n_agents: int, n_observations: int, n_actions: int, observation_dtype: DType = DType.FLOAT32,
+                 action_dtype: DType = DType.FLOAT32, observation_codec: int = Compression.NONE,
+                 agent_hints: list[int] | None = None, ip_addr = 'localhost', port = 50051, heartbeat_seconds = 1.0):
+        # Batches of many observations may exceed the default message size limit
+        self._endpoint = ICCEEndpoint(ip_addr=ip_addr, port=port, options=[('grpc.max_receive_message_length', -1)])
+
+        self.n_agents = n_agents
+        self.n_observations = n_observations
+        self.n_actions = n_actions
+        self.observation_dtype = observation_dtype
+        self.action_dtype = action_dtype
+        self.observation_codec = observation_codec
+        self.agent_hints = agent_hints if agent_hints is not None else [INVALID_ID] * n_agents
+        self.heartbeat_seconds = heartbeat_seconds
+
+        # Negotiated at handshake
+        self.ids: list[int] = []
+        self.sessions: list[int] = [] # Session token issued to each agent, sent with its requests
+        self.agent_ids: list[int] = [] # Simulation Agent ID each agent is mapped to
+        self.observation_shape: tuple = ()
+        self.action_shape: tuple = ()
+        self.info_dtype: np.dtype | None = None
+
+        # Environment data of the latest sample, decoded in place
+        self.observations: np.ndarray
+        self.rewards = np.zeros(shape=n_agents, dtype=np.float32)
+        self.returns = np.zeros(shape=n_agents, dtype=np.float64) # Episode returns, accumulated by the environment
+        self.terminated = np.zeros(shape=n_agents, dtype=bool)
+        self.truncated = np.zeros(shape=n_agents, dtype=bool)
+        self.info: np.ndarray | None = None # Info records, structured by the schema declared by the environment
+        self.ticks = np.zeros(shape=n_agents, dtype=np.uint64)
+        self.status = Status.SUCCESS # Status of the environment
+        self.episode = 0
+        self.version = 0 # Published version of the environment, waited on by the next sample
+
+        self._codecs = []
+        self._action_encoder = None
+        self._decoded_ticks = [None] * n_agents
+        self._heartbeat_thread = None
+        self._closed = threading.Event()
+
+    def connect(self, timeout: float | None = None):
+        """ Handshakes every agent with the environment, then pulls the initial data.
+
+        Args:
+            timeout : The time to wait for the environment to be up and ready. Waits indefinitely if None.
+
+        Raises:
+            ConnectionError: If an agent failed to handshake, e.g. as no Simulation Agent is free.
+        """
+        for agent_hint in self.agent_hints:
+            response = self._endpoint.handshake_and_validate(
+                n_observations=self.n_observations,
+                n_actions=self.n_actions,
+                agent_hint=agent_hint,
+                observation_dtype=self.observation_dtype,
+                action_dtype=self.action_dtype,
+                observation_codec=self.observation_codec,
+                timeout=timeout
+            )
+            if response.status != Status.SUCCESS:
+                raise ConnectionError(f'Handshake of agent {len(self.ids)} failed: {Status(response.status).name}')
+            self.ids.append(response.id)
+            self.sessions.append(response.session)
+            self.agent_ids.append(response.agent_id)
+            self._codecs.append(codecs.create_codec(response.observation_codec))
+
+        # Wire format is negotiated identically for every agent
+        self.observation_dtype = DType(response.observation_dtype)
+        self.action_dtype = DType(response.action_dtype)
+        self.observation_shape = tuple(response.observation_shape)
+        self.action_shape = tuple(response.action_shape)
+        self.info_dtype = encoding.schema_to_dtype(response.info_schema) if response.info_schema else None
+
+        # Preallocate the buffers observations and info are decoded into, and actions encoded from, every tick
+        self.observations = np.zeros(shape=(self.n_agents, *self.observation_shape), dtype=encoding.numpy_dtype(self.observation_dtype))
+        self._action_encoder = encoding.Encoder(self.action_dtype, self.action_shape)
+        if self.info_dtype is not None:
+            self.info = np.zeros(shape=self.n_agents, dtype=self.info_dtype)
+        self._sample_request = Environment_pb2.SampleBatchRequest(ids=self.ids, sessions=self.sessions)
+
+        # Keep the agents mapped while not stepped
+        if self.heartbeat_seconds is not None:
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat, daemon=True)
+            self._heartbeat_thread.start()
+
+        self.sample(wait=False)
+
+    def act_async(self, actions: np.ndarray) -> grpc.Future:
+        """ Sends the actions of all agents with one RPC. Non-blocking.
+
+        Args:
+            actions : The actions of the agents, indexed like `agent_ids`.
+
+        Returns:
+            The future of the RPC, whose result holds the status of each action.
+        """
+        request = Environment_pb2.ActionBatchRequest()
+        for i, icce_id in enumerate(self.ids):
+            action_bytes, action_scale = self._action_encoder(np.asarray(actions[i]))
+            request.actions.add(id=icce_id, action=action_bytes, action_scale=action_scale, tick=int(self.ticks[i]), session=self.sessions[i])
+        return self._endpoint.act_batch(request)
+
+    def sample_async(self, wait: bool = True, timeout: float = 10.0) -> grpc.Future:
+        """ Requests the environment data of all agents with one RPC. Non-blocking.
+
+        Args:
+            wait : Whether the environment responds once it publishes a version newer than the latest sampled one, i.e. the
+                next tick or status change, rather than immediately.
+            timeout : The maximum time the environment waits for a newer version.
+
+        Returns:
+            The future of the RPC, whose result is passed to `update()`.
+        """
+        self._sample_request.wait = wait
+        self._sample_request.version = self.version
+        self._sample_request.timeout = timeout
+        # The environment encodes each observation against the last decoded observation of the agent
+        self._sample_request.base_ticks[:] = [tick or 0 for tick in self._decoded_ticks]
+        return self._endpoint.sample_batch(self._sample_request)
+
+    def update(self, response):
+        """ Decodes the environment data of all agents in place.
+
+        Args:
+            response : The `SampleBatchResponse` of a `sample_batch` RPC.
+
+        Raises:
+            ConnectionError: If an agent is no longer mapped by the environment, e.g. after missing heartbeats.
+        """
+        resync = False
+        for i, sample in enumerate(response.samples):
+            if sample.status == Status.ICCE_ID_ERROR:
+                raise ConnectionError(f'Agent {i} (ICCE ID {self.ids[i]}) is no longer mapped by the environment')
+
+            # Samples of an already decoded tick carry no observation, or one stateful codecs must not decode twice
+            if sample.tick != self._decoded_ticks[i]:
+                # Encoded against an observation which was not decoded, e.g. by another connection: request a keyframe
+                if sample.base_tick and sample.base_tick != self._decoded_ticks[i]:
+                    self._decoded_ticks[i] = None
+                    resync = True
+                    continue
+                encoding.decode(
+                    buffer=self._codecs[i].decode(sample.observation),
+                    dtype=self.observation_dtype,
+                    scale=sample.observation_scale,
+                    out=self.observations[i]
+                )
+                if self.info is not None:
+                    self.info[i:i+1].view(np.uint8)[:] = np.frombuffer(buffer=sample.info, dtype=np.uint8)
+                self._decoded_ticks[i] = sample.tick
+            self.rewards[i] = sample.reward
+            self.returns[i] = sample.episode_return
+            self.terminated[i] = sample.terminated
+            self.truncated[i] = sample.truncated
+            self.ticks[i] = sample.tick
+            self.status = Status(sample.status)
+            self.episode = sample.episode
+        self.version = response.version
+        if resync:
+            self.sample(wait=False)
+
+    def act(self, actions: np.ndarray) -> np.ndarray:
+        """ Sends the actions of all agents with one RPC.
+
+        Args:
+            actions : The actions of the agents, indexed like `agent_ids`.
+
+        Returns:
+            The status of each action.
+        """
+        return np.asarray(self.act_async(actions).result().status)
+
+    def sample(self, wait: bool = True, timeout: float = 10.0):
+        """ Samples the environment data of all agents with one RPC, decoding it in place.
+
+        Args:
+            wait : Whether to wait for the environment to publish a version newer than the latest sampled one.
+            timeout : The maximum time the environment waits for a newer version.
+        """
+        self.update(self.sample_async(wait=wait, timeout=timeout).result())
+
+    def wait_for_episode(self, timeout: float = 60.0):
+        """ Samples until the environment publishes the first tick of an episode, i.e. a tick with status SUCCESS and no
+        terminated or truncated agent. Returns immediately if the environment is mid-episode.
+
+        Args:
+            timeout : The maximum time to wait.
+
+        Raises:
+            ConnectionError: If the environment shut down.
+            TimeoutError: If no episode started within the timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while self.status != Status.SUCCESS or self.terminated.any() or self.truncated.any():
+            if self.status == Status.SHUTDOWN:
+                raise ConnectionError('Environment shut down')
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'Environment did not start an episode within {timeout} seconds')
+            self.sample(wait=True, timeout=min(1.0, timeout))
+
+    @property
+    def done(self) -> bool:
+        """ Whether the episode of the environment ended, as of the latest sample. """
+        return self.status != Status.SUCCESS or bool(self.terminated.any()) or bool(self.truncated.any())
+
+    def close(self):
+        self._closed.set()
+        self._endpoint.close()
+
+
+    ########## HELPERS ##########
+    def _heartbeat(self):
+        """ Periodically signals the environment that the agents are alive, on a background thread. """
+        while not self._closed.wait(self.heartbeat_seconds):
+            try:
+                for icce_id, session in zip(self.ids, self.sessions):
+                    self._endpoint.heartbeat(id=icce_id, session=session, timeout=self.heartbeat_seconds)
+            except grpc.RpcError:
+                pass
@@ -1,69 +1,429 @@
 import grpc
 from ..grpc_interfaces import Environment_pb2, Environment_pb2_grpc
+from ..utils import Status
+from ..utils.metrics import MetricsRegistry
+from ..utils.tracing import Tracer, TRACE_METADATA_KEY, NULL_SPAN
 
 import threading
+import time
 from concurrent import futures
 
+# Wire tags of the fields of SampleBatchResponse, which is serialized by concatenating the serialized samples
+_SAMPLES_TAG = b'\x0a' # Field 1, length-delimited
+_VERSION_TAG = b'\x10' # Field 2, varint
+
+def _varint(value: int) -> bytes:
+    """ Encodes an unsigned integer as a protobuf varint. """
+    encoded = bytearray()
+    while value > 0x7f:
+        encoded.append((value & 0x7f) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+# Method handler constructors, keyed by whether the requests and responses of a method are streamed
+_METHOD_HANDLERS = {
+    (False, False): grpc.unary_unary_rpc_method_handler,
+    (False, True): grpc.unary_stream_rpc_method_handler,
+    (True, False): grpc.stream_unary_rpc_method_handler,
+    (True, True): grpc.stream_stream_rpc_method_handler
+}
+
+def _environment_handler(servicer, serialized: tuple[str, ...]) -> grpc.GenericRpcHandler:
+    """ Builds the handler of every method of the Environment service, equivalent to the generated handlers.
+
+    Args:
+        servicer : The servicer implementing the methods.
+        serialized : The methods whose responses are serialized by the servicer, which are sent as-is.
+
+    Returns:
+        The generic handler of the Environment service.
+    """
+    service = Environment_pb2.DESCRIPTOR.services_by_name['Environment']
+    handlers = {}
+    for method in service.methods:
+        response = getattr(Environment_pb2, method.output_type.name)
+        handlers[method.name] = _METHOD_HANDLERS[method.client_streaming, method.server_streaming](
+            getattr(servicer, method.name),
+            request_deserializer=getattr(Environment_pb2, method.input_type.name).FromString,
+            response_serializer=bytes if method.name in serialized else response.SerializeToString
+        )
+    return grpc.method_handlers_generic_handler(service.full_name, handlers)
+
 class EnvironmentServicer(Environment_pb2_grpc.EnvironmentServicer):
-    def __init__(self, handshake_cb, sample_cb, act_cb):
+    # Interval (in seconds) at which subscriptions check if the client is still connected
+    SUBSCRIPTION_POLL_SECONDS = 1.0
+
+    def __init__(self, handshake_cb, sample_cb, sample_serialized_cb, act_cb, wait_cb, profile_cb, heartbeat_cb, health_cb, max_chunk_bytes,
+                 max_streams: int = 0, metrics: MetricsRegistry | None = None, tracer: Tracer | None = None):
         super().__init__()
         # Store callbacks
         self._on_handshake_and_validate = handshake_cb
         self._sample_cb = sample_cb
+        self._sample_serialized_cb = sample_serialized_cb
         self._act_cb = act_cb
+        self._wait_cb = wait_cb
+        self._profile_cb = profile_cb
+        self._heartbeat_cb = heartbeat_cb
+        self._health_cb = health_cb
+
+        # Maximum observation bytes per streamed message
+        self._max_chunk_bytes = max_chunk_bytes
+
+        # RPCs blocking until the next tick (subscriptions and waiting sample_batch RPCs) are served by workers reserved for
+        # them, so that they never starve the unary RPCs of workers. Unlimited if max_streams is 0
+        self._streams = threading.BoundedSemaphore(max_streams) if max_streams > 0 else None
+
+        # Per-RPC server latency and in-flight RPCs, if metrics are enabled
+        self._metrics = metrics
+        if metrics is not None:
+            self._rpc_seconds = {rpc: metrics.histogram('environment_rpc_seconds', 'Server latency of RPCs, in seconds', rpc=rpc)
+                                 for rpc in ('handshake_and_validate', 'sample', 'sample_stream', 'subscribe', 'act', 'sample_batch', 'act_batch')}
+            self._rpc_in_flight = metrics.gauge('environment_rpc_in_flight', 'Number of unary RPCs being served')
+
+        # Span tracing of RPCs, correlated with the steps of ICCEs, if enabled
+        self._tracer = tracer
+
+        # Responses without bytes fields are immutable once built, so are shared rather than rebuilt per RPC. Responses with
+        # bytes fields are built per RPC, as upb retains every bytes value assigned to a message until it is freed.
+        self._action_responses = {status: Environment_pb2.ActionResponse(status=int(status)) for status in Status}
+        self._heartbeat_responses = {status: Environment_pb2.HeartbeatResponse(status=int(status)) for status in Status}
 
     def handshake_and_validate(self, request, context):
         """ Servicer implementation of handshake_and_validate.
         
         This is an implementation of the gRPC servicer function `handshake_and_validate()`. Invoking this function invokes the
         callback function `_on_handshake_and_validate()` defined in the `EnvironmentInterface` class which validates the
-        observation(RL model input) and action(RL model output) sizes against the derived environment.
+        observation(RL model input) and action(RL model output) sizes against the derived environment, and negotiates
+        the wire format (dtypes, shapes, codec and chunking) of the observations and actions.
 
         Args:
-            request : The incoming gRPC request message, `HandshakeRequest` containing the ICCE's observation and action sizes.
+            request : The incoming gRPC request message, `HandshakeRequest` containing the ICCE's observation and action sizes,
+                dtypes, shapes and codec.
 
         Returns:
-            The gRPC response message `HandshakeResponse` containing the generated ICCE ID and validation status.
+            The gRPC response message `HandshakeResponse` containing the generated ICCE ID, validation status and the
+            negotiated wire format.
 
         Raises:
             None
         """
-        id, status = self._on_handshake_and_validate(request.n_observations, request.n_actions, request.agent_hint)
-        response = Environment_pb2.HandshakeResponse(id=id, status=int(status))
-        return response
+        start = self._begin_rpc()
+        try:
+            id, status, negotiated = self._on_handshake_and_validate(
+                n_observation=request.n_observations,
+                n_actions=request.n_actions,
+                agent_hint=request.agent_hint,
+                observation_dtype=request.observation_dtype,
+                action_dtype=request.action_dtype,
+                observation_shape=tuple(request.observation_shape),
+                action_shape=tuple(request.action_shape),
+                observation_codec=request.observation_codec,
+                resume=request.resume
+            )
+            return Environment_pb2.HandshakeResponse(id=id, status=int(status), **negotiated)
+        finally:
+            self._end_rpc('handshake_and_validate', start)
     
     def sample(self, request, context):
+        """ Servicer implementation of sample.
+
+        Invokes the callback function `_on_sample_serialized()` defined in the `EnvironmentInterface` class, which returns
+        the response of the ICCE serialized once per published tick/status. The serialized bytes are sent as-is.
+
+        Args:
+            request : The incoming gRPC request message, `SampleRequest` containing the ICCE ID, its session and the tick
+                of the observation it last decoded.
+
+        Returns:
+            The serialized gRPC response message `SampleResponse` containing the environment data of the ICCE.
+        """
+        start = self._begin_rpc()
+        try:
+            with self._span('sample', context):
+                return self._sample_serialized_cb(icce_id=request.id, serialize=self._serialize, base_tick=request.base_tick,
+                                                  session=request.session)
+        finally:
+            self._end_rpc('sample', start)
+
+    def _sample(self, request, base_tick):
         # Sample environment data from simulation
-        obs, reward, term, trunc, info, status = self._sample_cb(request.id)
+        return self._response(*self._sample_cb(request.id, base_tick, request.session))
 
+    def _serialize(self, *data) -> bytes:
+        """ Serializes environment data, as returned by the sample callback, into a `SampleResponse`. """
+        return self._response(*data).SerializeToString()
+
+    def _response(self, obs, obs_scale, reward, term, trunc, info, status, tick, episode, episode_return, base_tick):
         # Set response
         response = Environment_pb2.SampleResponse()
         response.observation = obs
+        response.observation_scale = obs_scale
         response.reward = reward
         response.terminated = term
         response.truncated = trunc
-        # TODO: response.data.info
-        response.episode = 1 # TODO
+        response.info = info
+        response.episode = episode
+        response.episode_return = episode_return
         response.status = status
+        response.tick = tick
+        response.base_tick = base_tick
         return response
+
+    def sample_stream(self, request, context):
+        """ Servicer implementation of sample_stream.
+
+        Streaming variant of `sample()` for observations exceeding the negotiated chunk size. The observation is split into
+        chunks of at most `max_chunk_bytes`, with the remaining environment data sent along with the first chunk. Every
+        message but the last is flagged as `partial`.
+
+        Args:
+            request : The incoming gRPC request message, `SampleRequest` containing the ICCE ID and its session.
+
+        Yields:
+            The gRPC response messages `SampleResponse` containing the chunks of the environment data.
+        """
+        start = self._begin_rpc()
+        try:
+            response = self._sample(request, request.base_tick)
+        finally:
+            self._end_rpc('sample_stream', start)
+        yield from self._chunk(response)
+
+    def subscribe(self, request_iterator, context):
+        """ Servicer implementation of subscribe.
+
+        Pushes the environment data of the ICCE as soon as the environment publishes a tick or status newer than the one
+        previously pushed, starting with the current environment data. Subscriptions are driven by the demand of the client:
+        each request signals that the client is ready for the next tick, so slow subscribers receive the latest published
+        data rather than ticks buffered by the transport. Observations exceeding the negotiated chunk size are sent in chunks,
+        as in `sample_stream()`. The stream ends when the environment shuts down or the client disconnects.
+
+        Args:
+            request_iterator : The incoming gRPC request messages, `SampleRequest` containing the ICCE ID, its session and
+                the tick of the observation last decoded, sent whenever the client is ready for the next tick.
+
+        Yields:
+            The gRPC response messages `SampleResponse` containing the environment data of each requested tick.
+        """
+        self._acquire_stream(context)
+        try:
+            version = None
+            for request in request_iterator:
+                # Block until a newer version is published
+                published = self._wait_cb(version=version, timeout=EnvironmentServicer.SUBSCRIPTION_POLL_SECONDS)
+                while published == version and context.is_active():
+                    published = self._wait_cb(version=version, timeout=EnvironmentServicer.SUBSCRIPTION_POLL_SECONDS)
+                if published == version:
+                    return
+                version = published
+
+                start = time.perf_counter()
+                try:
+                    response = self._sample(request, request.base_tick)
+                finally:
+                    if self._metrics is not None:
+                        self._rpc_seconds['subscribe'].observe(time.perf_counter() - start)
+                yield from self._chunk(response)
+                if response.status == Status.SHUTDOWN:
+                    return
+        finally:
+            self._release_stream()
+
+    def _chunk(self, response):
+        """ Splits the observation of a response into messages of at most `max_chunk_bytes`. """
+        obs = response.observation
+        n_chunks = max(1, -(-len(obs) // self._max_chunk_bytes))
+        if n_chunks == 1:
+            yield response
+            return
+
+        for i in range(n_chunks):
+            if i > 0:
+                response = Environment_pb2.SampleResponse()
+            response.observation = obs[i*self._max_chunk_bytes:(i+1)*self._max_chunk_bytes]
+            response.partial = i < n_chunks - 1
+            yield response
         
     def act(self, request, context):
-        self._act_cb(icce_id=request.id, action_bytes=request.action)
-        response = Environment_pb2.ActionResponse(status=1)
-        return response
+        start = self._begin_rpc()
+        try:
+            with self._span('act', context):
+                status = self._act_cb(icce_id=request.id, action_bytes=request.action, action_scale=request.action_scale, tick=request.tick,
+                                      session=request.session)
+            return self._action_responses[status]
+        finally:
+            self._end_rpc('act', start)
+
+    def sample_batch(self, request, context):
+        """ Servicer implementation of sample_batch.
+
+        Batched variant of `sample()`, used by clients which drive many agents, e.g. vectorized environments. If `wait`
+        is set, blocks until the environment publishes a version newer than the requested version, so that a client
+        receives each tick once. The response is assembled from the serialized response of each ICCE, which is shared
+        with its `sample()` RPCs, so the samples are not serialized again.
+
+        Args:
+            request : The incoming gRPC request message, `SampleBatchRequest` containing the ICCE IDs, their sessions, the
+                tick of the observation last decoded for each ICCE, and the version to wait for a newer version of.
+
+        Returns:
+            The serialized gRPC response message `SampleBatchResponse` containing the environment data of each ICCE, in
+            the requested order, and the published version.
+        """
+        if request.wait:
+            self._acquire_stream(context)
+            try:
+                version = self._wait_cb(version=request.version, timeout=request.timeout)
+            finally:
+                self._release_stream()
+        else:
+            version = self._wait_cb(version=None, timeout=0.0)
+
+        start = self._begin_rpc()
+        try:
+            with self._span('sample_batch', context):
+                parts = []
+                base_ticks = request.base_ticks if len(request.base_ticks) == len(request.ids) else [0] * len(request.ids)
+                sessions = request.sessions if len(request.sessions) == len(request.ids) else [0] * len(request.ids)
+                for icce_id, base_tick, session in zip(request.ids, base_ticks, sessions):
+                    payload = self._sample_serialized_cb(icce_id=icce_id, serialize=self._serialize, base_tick=base_tick, session=session)
+                    parts += (_SAMPLES_TAG, _varint(len(payload)), payload)
+                parts += (_VERSION_TAG, _varint(version))
+                return b''.join(parts)
+        finally:
+            self._end_rpc('sample_batch', start)
+
+    def act_batch(self, request, context):
+        """ Servicer implementation of act_batch.
+
+        Batched variant of `act()`, invoking the callback function `_on_act()` defined in the `EnvironmentInterface` class
+        for each action, in order.
+
+        Args:
+            request : The incoming gRPC request message, `ActionBatchRequest` containing an `ActionRequest` per ICCE.
+
+        Returns:
+            The gRPC response message `ActionBatchResponse` containing the status of each action.
+        """
+        start = self._begin_rpc()
+        try:
+            with self._span('act_batch', context):
+                statuses = [int(self._act_cb(icce_id=action.id, action_bytes=action.action, action_scale=action.action_scale, tick=action.tick,
+                                             session=action.session))
+                            for action in request.actions]
+            return Environment_pb2.ActionBatchResponse(status=statuses)
+        finally:
+            self._end_rpc('act_batch', start)
+
+    def profile(self, request, context):
+        """ Servicer implementation of profile.
+
+        Admin RPC which invokes the callback function `_on_profile()` defined in the `EnvironmentInterface` class, profiling
+        the running environment for the requested duration without stopping the tick loop. The profile blocks one of the
+        workers reserved for streams until it completes, so that it never occupies the workers serving sample and act.
+
+        Args:
+            request : The incoming gRPC request message, `ProfileRequest` containing the duration, sampling interval and
+                the profiling token of the environment.
+
+        Returns:
+            The gRPC response message `ProfileResponse` containing the status, `PERMISSION_ERROR` if profiling is disabled
+            or the token does not match, and the stats in the pstats dump format.
+        """
+        self._acquire_stream(context)
+        try:
+            status, stats = self._profile_cb(seconds=request.seconds, interval_seconds=request.interval_seconds, token=request.token)
+        finally:
+            self._release_stream()
+        return Environment_pb2.ProfileResponse(status=int(status), stats=stats)
+
+    def heartbeat(self, request, context):
+        """ Servicer implementation of heartbeat.
+
+        Invokes the callback function `_on_heartbeat()` defined in the `EnvironmentInterface` class, which keeps the ICCE
+        mapped to its agent. ICCEs which stop sending heartbeats are unmapped, freeing their agent.
+
+        Args:
+            request : The incoming gRPC request message, `HeartbeatRequest` containing the ICCE ID and its session.
+
+        Returns:
+            The gRPC response message `HeartbeatResponse` containing the status, `ICCE_ID_ERROR` if the ICCE is no longer mapped.
+        """
+        status = self._heartbeat_cb(icce_id=request.id, session=request.session)
+        return self._heartbeat_responses[status]
+
+    def health(self, request, context):
+        """ Servicer implementation of health.
+
+        Readiness probe which invokes the callback function `_on_health()` defined in the `EnvironmentInterface` class.
+        The server is up before the environment is ready, so that ICCEs and launch scripts can wait for readiness instead
+        of failing to connect.
+
+        Args:
+            request : The incoming gRPC request message, `HealthRequest`.
+
+        Returns:
+            The gRPC response message `HealthResponse` containing the status of the environment, whether it is ready to
+            accept handshakes, and its free and total agents.
+        """
+        status, ready, free_agents, total_agents = self._health_cb()
+        return Environment_pb2.HealthResponse(status=int(status), ready=ready, free_agents=free_agents, total_agents=total_agents)
+
+    def _span(self, rpc: str, context):
+        """ Creates the span of an RPC, tagged with the trace ID propagated by the ICCE, if tracing is enabled. """
+        if self._tracer is None:
+            return NULL_SPAN
+        trace_id = None
+        for key, value in context.invocation_metadata():
+            if key == TRACE_METADATA_KEY:
+                trace_id = int(value)
+                break
+        return self._tracer.span('server.' + rpc, trace_id=trace_id, flow_end=rpc)
+
+    def _acquire_stream(self, context):
+        """ Reserves a worker for an RPC blocking until the next tick, aborting the RPC with RESOURCE_EXHAUSTED if none is free. """
+        if self._streams is not None and not self._streams.acquire(blocking=False):
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, 'Maximum concurrent subscriptions reached')
+
+    def _release_stream(self):
+        if self._streams is not None:
+            self._streams.release()
+
+    def _begin_rpc(self) -> float:
+        """ Records the start of a unary RPC, if metrics are enabled. """
+        if self._metrics is None:
+            return 0.0
+        self._rpc_in_flight.inc()
+        return time.perf_counter()
+
+    def _end_rpc(self, rpc: str, start: float):
+        """ Records the server latency of a unary RPC, if metrics are enabled. Called whether or not the RPC raised. """
+        if self._metrics is None:
+            return
+        self._rpc_seconds[rpc].observe(time.perf_counter() - start)
+        self._rpc_in_flight.dec()
     
 
 class EnvironmentEndpoint():
-    def __init__(self, handshake_cb, sample_cb, act_cb, ip_addr='localhost'):
-        # gRPC server
-        self._server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    def __init__(self, handshake_cb, sample_cb, sample_serialized_cb, act_cb, wait_cb, profile_cb, heartbeat_cb, health_cb, ip_addr='localhost', port=50051,
+                 max_chunk_bytes=1 << 20, max_workers=10, max_streams=10, metrics=None, tracer=None):
+        # gRPC server - max_workers serve unary RPCs, and each subscription or waiting sample_batch RPC occupies one of
+        # max_streams additional workers for as long as it blocks
+        self._server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers + max_streams))
         self._server_thread = threading.Thread(target=self.start_server)
 
         # Environment servicer
-        self._servicer = EnvironmentServicer(handshake_cb=handshake_cb, sample_cb=sample_cb, act_cb=act_cb)
+        self._servicer = EnvironmentServicer(handshake_cb=handshake_cb, sample_cb=sample_cb, sample_serialized_cb=sample_serialized_cb, act_cb=act_cb,
+                                             wait_cb=wait_cb, profile_cb=profile_cb, heartbeat_cb=heartbeat_cb, health_cb=health_cb,
+                                             max_chunk_bytes=max_chunk_bytes, max_streams=max_streams,
+                                             metrics=metrics, tracer=tracer)
 
-        Environment_pb2_grpc.add_EnvironmentServicer_to_server(self._servicer, self._server)
-        self._server.add_insecure_port(ip_addr+':50051')
+        # Sample responses are serialized by the servicer, once per tick, so are sent as-is. Every method is registered
+        # once, rather than overriding the generated handlers, as which of two handlers of a method is matched depends on
+        # the grpcio version
+        self._server.add_generic_rpc_handlers((_environment_handler(self._servicer, serialized=('sample', 'sample_batch')),))
+        self._server.add_insecure_port(ip_addr+':'+str(port))
     
     def start(self):
         """ Starts the Environment communication layer on a separate thread. """
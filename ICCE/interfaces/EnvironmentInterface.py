@@ -1,29 +1,65 @@
 from .EnvironmentEndpoint import EnvironmentEndpoint
-from ..utils import Status, INVALID_ID
+from .RegistryClient import RegistryClient
+from ..utils import Status, DType, Compression, INVALID_ID
+from ..utils import encoding, codecs
+from ..utils.transforms import Transform
+from ..utils.metrics import MetricsRegistry, LENGTH_BUCKETS
+from ..utils.tracing import Tracer, NULL_SPAN
+from ..utils import profiling
 
-from tqdm import tqdm
 import numpy as np
+import grpc
+import hmac
+import secrets
+import socket
 import time
 import threading
 
+class _CachedSample:
+    """ Serialized sample response of an ICCE, valid until the environment publishes a new version.
+
+    Responses whose observation is delta encoded are only valid for samples of the tick they are encoded against.
+    """
+    __slots__ = ('lock', 'version', 'payload', 'base_tick')
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.version = None
+        self.payload = b''
+        self.base_tick = 0
+
+
 class EnvironmentInterface:
-    def __init__(self, frequency_hz=240, max_episodes=10, time_between_episodes=3, debug = False, ip_addr = 'localhost'):
+    def __init__(self, frequency_hz=240, max_episodes=10, time_between_episodes=3, time_before_shutdown=10, debug = False, ip_addr = 'localhost', max_chunk_bytes = 1 << 20,
+                 max_action_age = None, max_workers = 10, max_streams = 10, port = 50051, registry_ip_addr = None, registry_port = 50050, advertise_seconds = 1.0,
+                 metrics_port = None, metrics_snapshot_path = None, metrics_snapshot_seconds = 10.0, trace_path = None,
+                 heartbeat_timeout_seconds = 10.0, profile_token = None):
         # Environment attributes
         self.n_observation: int # n_observation of an agent
         self.n_action: int # n_action of an agent
+        self.observation_shape: tuple | None = None # Shape of an agent's observation, defaults to (n_observation,)
+        self.action_shape: tuple | None = None # Shape of an agent's action, defaults to (n_action,)
         self.observations: np.ndarray
         self.actions: np.ndarray
         self.rewards: np.ndarray
         self.term: np.ndarray
         self.trunc: np.ndarray
-        self.info: list
+        self.info: np.ndarray | list
+        self.action_ages: np.ndarray # Age (in ticks) of the observation each agent's latest action was computed from
+        self.stale_actions: np.ndarray # Number of actions rejected as stale, for exceeding max_action_age or by act(), per agent
+        self.info_dtype: np.dtype | None = None # Structured dtype of an agent's info. Info is not transmitted to ICCEs if None
+        self.transforms: list[Transform] = [] # Observation preprocessing pipeline, applied to all agents once per tick
+        self.simulation = None # SimulationBridge whose state table is copied once per tick, before sample() is called for each agent
 
         # Environment settings
         self.episode = 0
+        self.tick = 0 # Monotonic ID of the latest sampled tick
+        self.max_action_age = max_action_age # Actions computed from observations older than this (in ticks) are rejected
         self.status = Status.SUCCESS
         self.frequency_seconds = 1.0/frequency_hz
         self.max_episodes = max_episodes
         self.time_between_episodes = time_between_episodes
+        self.time_before_shutdown = time_before_shutdown
 
         # Debug attributes
         self.debug = debug
@@ -36,16 +72,90 @@ class EnvironmentInterface:
         self._sim_agent_to_icce = {}
         self.registered_agents = []
 
+        # Failure detection - ICCEs which have not been seen for heartbeat_timeout_seconds are unmapped, freeing their agent
+        self.heartbeat_timeout_seconds = heartbeat_timeout_seconds
+        self._last_seen = {} # {icce_id: time.monotonic()}
+        # Session token of each mapping, so that the requests of an ICCE whose agent was remapped are rejected: {icce_id: session}
+        self._icce_sessions = {}
+        self._monitor_thread = threading.Thread(target=self._monitor, daemon=True)
+
+        # Readiness - The server is started before the initial reset, and ICCEs are asked to wait until it completes
+        self._ready = threading.Event()
+        self._shutdown = threading.Event()
+
+        # Negotiated wire dtypes of each ICCE: {icce_id: (observation_dtype, action_dtype)}
+        self._icce_dtypes = {}
+        # Negotiated observation codec of each ICCE: {icce_id: Codec}
+        self._icce_codecs = {}
+        # Tick of the observation each codec last encoded, which the next observation is encoded against: {icce_id: tick}
+        self._icce_codec_ticks = {}
+        # Observation encoder of each ICCE, reusing its cast/quantization buffers every tick: {icce_id: Encoder}
+        self._icce_encoders = {}
+        # Serialized sample response of each ICCE, shared by every sample of a published version: {icce_id: _CachedSample}
+        self._icce_samples = {}
+        # Observations larger than this are streamed to ICCEs in chunks
+        self.max_chunk_bytes = max_chunk_bytes
+
+        # Metrics, only instrumented if served over HTTP and/or written as snapshots
+        self.metrics = MetricsRegistry() if metrics_port is not None or metrics_snapshot_path is not None else None
+        self.metrics_port = metrics_port
+        self.metrics_snapshot_path = metrics_snapshot_path
+        self.metrics_snapshot_seconds = metrics_snapshot_seconds
+        if self.metrics is not None:
+            self._tick_seconds = self.metrics.histogram('environment_tick_seconds', 'Duration of a tick excluding sleep, in seconds')
+            self._sample_hook_seconds = self.metrics.histogram('environment_sample_hook_seconds', 'Latency of the user-defined sample(), in seconds')
+            self._act_hook_seconds = self.metrics.histogram('environment_act_hook_seconds', 'Latency of the user-defined act(), in seconds')
+            self._missed_deadlines = self.metrics.counter('environment_missed_deadlines_total', 'Ticks which exceeded the tick interval')
+            self._ticks_total = self.metrics.counter('environment_ticks_total', 'Sampled ticks')
+            self._steps_per_second = self.metrics.gauge('environment_steps_per_second', 'Ticks per second, averaged over the current episode')
+            self._episode_length = self.metrics.histogram('environment_episode_length_ticks', 'Length of episodes, in ticks', buckets=LENGTH_BUCKETS)
+            self._active_icces = self.metrics.gauge('environment_active_icces', 'Number of ICCEs mapped to agents')
+            self._sample_cache = {hit: self.metrics.counter('environment_sample_cache_total', 'Samples served from, or serialized into, the sample cache',
+                                                            result='hit' if hit else 'miss') for hit in (True, False)}
+        self._episode_start = (0, 0.0) # Tick ID and time at the start of the episode
+
+        # Span tracing, flushed as Chrome trace JSON to trace_path at shutdown
+        self.trace_path = trace_path
+        self.tracer = Tracer(process_name='environment') if trace_path is not None else None
+
+        # On-demand profiler of the running environment, only exposed over the admin RPC profile if profile_token is set
+        self._profiler = profiling.SamplingProfiler()
+        self.profile_token = profile_token
+
         # Communication layer endpoint
         self._endpoint = EnvironmentEndpoint(
             handshake_cb=self._on_handshake_and_validate,
             sample_cb=self._on_sample,
+            sample_serialized_cb=self._on_sample_serialized,
             act_cb=self._on_act,
-            ip_addr=ip_addr
+            wait_cb=self._on_wait_for_publish,
+            profile_cb=self._on_profile,
+            heartbeat_cb=self._on_heartbeat,
+            health_cb=self._on_health,
+            ip_addr=ip_addr,
+            port=port,
+            max_chunk_bytes=max_chunk_bytes,
+            max_workers=max_workers,
+            max_streams=max_streams,
+            metrics=self.metrics,
+            tracer=self.tracer
         )
 
+        # Registry to advertise free agent slots to, if the environment is one of many servers
+        self.ip_addr = ip_addr if ip_addr not in ('0.0.0.0', '[::]') else socket.gethostname()
+        self.port = port
+        self.advertise_seconds = advertise_seconds
+        self._registry = RegistryClient(ip_addr=registry_ip_addr, port=registry_port) if registry_ip_addr is not None else None
+        self._advertise_event = threading.Event()
+        self._n_mapped = 0 # ICCEs mapped since the environment started, which claim the slots the registry reserved for them
+        self._advertise_thread = threading.Thread(target=self._advertise, daemon=True)
+
         # Mutex lock
         self.lock = threading.Lock()
+
+        # Notifies subscribed ICCEs of newly published ticks/status
+        self._published = 0
+        self._publish_condition = threading.Condition()
     
     @property
     def active_agents(self):
@@ -58,7 +168,8 @@ class EnvironmentInterface:
         
         Refer to the Sequence Diagram for a clearer picture. The flow of the Environment is
 
-        Environment resets the Simulation using the user-defined interface `reset()`\n
+        Starts the gRPC server, which reports the environment as not ready and asks ICCEs to wait\n
+        Environment resets the Simulation using the user-defined interface `reset()`, then reports the environment as ready\n
         {Ad-hoc} Environment validates ICCE input/output sizes, assigns ICCE IDs and maps Simulation Agent ID to ICCE ID\n
         Loop while episode count < max episodes (frequency-bound):\n
             Samples simulation data from Simulation -> Compute Observations, Rewards, Terminated, Truncated, Info of ALL ICCEs\n
@@ -70,29 +181,90 @@ class EnvironmentInterface:
 
         Raises:
             NotImplementedError: If any combination of interfaces, reset(), sample(), act(), is not implemented by user.
+            ValueError: If the observation/action shapes do not match the observation/action sizes.
+
+        Note:
+            If `transforms` change the observation shape (e.g. `FrameStack`), `observation_shape` and `n_observation` are
+            updated to the transformed shape, which ICCEs must request.
         """
+        # Resolve observation/action shapes
+        if self.observation_shape is None:
+            self.observation_shape = (self.n_observation,)
+        if self.action_shape is None:
+            self.action_shape = (self.n_action,)
+        self.observation_shape = tuple(self.observation_shape)
+        self.action_shape = tuple(self.action_shape)
+        if int(np.prod(self.observation_shape)) != self.n_observation:
+            raise ValueError("observation_shape does not match n_observation!")
+        if int(np.prod(self.action_shape)) != self.n_action:
+            raise ValueError("action_shape does not match n_action!")
+
         # Instantiate environment data
-        self.observations = np.ndarray(shape=(len(self.registered_agents), self.n_observation), dtype=np.float64)
-        self.actions = np.ndarray(shape=(len(self.registered_agents), self.n_action), dtype=np.float32)
+        # Each transform writes into its own output buffer, the last of which are the observations sent to ICCEs
+        self._raw_observations = np.ndarray(shape=(len(self.registered_agents), *self.observation_shape), dtype=np.float64)
+        self._transform_outputs = []
+        for transform in self.transforms:
+            transform.setup(len(self.registered_agents), self.observation_shape)
+            self.observation_shape = tuple(transform.output_shape(self.observation_shape))
+            self._transform_outputs.append(np.zeros(shape=(len(self.registered_agents), *self.observation_shape), dtype=np.float64))
+        self.n_observation = int(np.prod(self.observation_shape))
+        self.observations = self._transform_outputs[-1] if self.transforms else self._raw_observations
+        self.actions = np.ndarray(shape=(len(self.registered_agents), *self.action_shape), dtype=np.float32)
         self.rewards = np.ndarray(shape=(len(self.registered_agents)), dtype=np.float32)
+        self.returns = np.zeros(shape=(len(self.registered_agents)), dtype=np.float64)
         self.term = np.ndarray(shape=(len(self.registered_agents)), dtype=bool)
         self.trunc = np.ndarray(shape=(len(self.registered_agents)), dtype=bool)
-        self.info = [{} for _ in range(len(self.registered_agents))]
+        self.action_ages = np.zeros(shape=(len(self.registered_agents)), dtype=np.int64)
+        self.stale_actions = np.zeros(shape=(len(self.registered_agents)), dtype=np.int64)
+        if self.info_dtype is None:
+            self.info = [{} for _ in range(len(self.registered_agents))]
+        else:
+            self.info_dtype = np.dtype(self.info_dtype)
+            self.info = np.zeros(shape=(len(self.registered_agents)), dtype=self.info_dtype)
+
+        # Start gRPC server, so that ICCEs started before the environment is ready wait for it rather than fail
+        self._endpoint.start()
 
         # Reset simulation and pull initial data
         self._reset()
-
-        # Start gRPC server
-        self._endpoint.start()
+        self._ready.set()
+
+        # Serve metrics
+        if self.metrics is not None:
+            if self.metrics_port is not None:
+                self.metrics.serve(port=self.metrics_port)
+            if self.metrics_snapshot_path is not None:
+                self.metrics.start_snapshots(path=self.metrics_snapshot_path, interval_seconds=self.metrics_snapshot_seconds)
+
+        # Advertise free agent slots to registry
+        if self._registry is not None:
+            self._advertise_thread.start()
+
+        # Unmap ICCEs which stopped sending heartbeats
+        if self.heartbeat_timeout_seconds is not None:
+            self._monitor_thread.start()
         
         # Main update loop -> Until max_episodes hit
         self._update()
         
         # Set status to shutdown
         self.status = Status.SHUTDOWN
+        self._publish()
         # Sleep to allow time for ICCEs to sample this shutdown status
-        self._wait(time_seconds=10, description="SHUTTING DOWN")
+        self._wait(time_seconds=self.time_before_shutdown, description="SHUTTING DOWN")
         self._endpoint.shutdown()
+        if self.metrics is not None:
+            if self.metrics_snapshot_path is not None:
+                self.metrics.write_snapshot(self.metrics_snapshot_path)
+            self.metrics.shutdown()
+        if self.tracer is not None:
+            self.tracer.flush(self.trace_path)
+
+    def shutdown(self):
+        """ Shuts the environment down after the tick being sampled, rather than after max_episodes, without waiting for
+        ICCEs to sample the end of the episode or the shutdown status.
+        """
+        self._shutdown.set()
 
     def register(self, agent_id):
         """ Registers a Simulation agent.
@@ -131,22 +303,45 @@ class EnvironmentInterface:
 
         if status:
             # Reset Environment
+            for transform in self.transforms:
+                transform.reset()
+            self.returns[:] = 0.0
             self._sample_data()
+            self._episode_start = (self.tick, time.perf_counter())
             self.status = Status.SUCCESS
+            self._publish()
 
     def _sample_data(self):
         """ Samples and computes Environment data for all simulation agents.
 
         Samples the Simulation for simulation agent data and compute into Environment data
         (Observation, Reward, Terminated, Truncated, Info) and consolidates all agents' Environment
-        data into one repository for ICCE clients to sample.
+        data into one repository for ICCE clients to sample. If an info schema is declared, info is packed
+        into the preallocated structured array `self.info`. Observations are preprocessed by the `transforms` pipeline.
+        Rewards are accumulated into the return of the current episode of each agent, `self.returns`, sent to ICCEs.
+        Every sample is identified by a monotonic tick ID. If a `simulation` bridge is set, its state table is copied
+        once before sampling the agents, without holding `lock`, as it waits for a stopped simulation to be replaced.
 
         Raises:
             NotImplementedError: If user-defined interface, sample(), is not implemeted by the user.
         """
+        if self.simulation is not None:
+            self.simulation.update()
         with self.lock:
             for icce_id in range(len(self.registered_agents)):
-                self.observations[icce_id], self.rewards[icce_id], self.term[icce_id], self.trunc[icce_id], self.info[icce_id] = self.sample(self.registered_agents[icce_id])
+                if self.metrics is not None:
+                    start = time.perf_counter()
+                with self._span('sample_hook'):
+                    self._raw_observations[icce_id], self.rewards[icce_id], self.term[icce_id], self.trunc[icce_id], info = self.sample(self.registered_agents[icce_id])
+                if self.metrics is not None:
+                    self._sample_hook_seconds.observe(time.perf_counter() - start)
+                self.returns[icce_id] += self.rewards[icce_id]
+                # Dict info is supported for convenience, tuples are packed without intermediate allocations
+                if isinstance(info, dict) and self.info_dtype is not None:
+                    info = tuple(info[name] for name in self.info_dtype.names)
+                self.info[icce_id] = info
+            self._preprocess()
+            self.tick += 1
 
     def _update(self):
         """ Main update loop.
@@ -158,20 +353,25 @@ class EnvironmentInterface:
             NotImplementedError: If user-defined interfaces, sample() and/or reset(), are not defined by the user.
         """
         # Sample from Simulation as long as episode count not reached
-        while(self.episode < self.max_episodes):
+        while(self.episode < self.max_episodes and not self._shutdown.is_set()):
             # sample at fixed interval
             start = time.perf_counter()
 
             # sample
-            self._sample_data()
+            with self._span('tick'):
+                self._sample_data()
+            self._publish()
 
             # Check for end of episode
             if any(self.term) or any(self.trunc):
                 if self.debug:
                     print(f'Average update delta time: {self.cur_avg} seconds')
+                if self.metrics is not None:
+                    self._record_episode()
 
                 # Set status code to indicate term/trunc
                 self.status = Status.DONE
+                self._publish()
 
                 # Sleep to allow time for ICCEs to sample this truncated observation
                 self._wait(time_seconds=self.time_between_episodes, description=f"EPISODE {self.episode+1}/{self.max_episodes} COMPLETE")
@@ -186,6 +386,8 @@ class EnvironmentInterface:
             # delay = desired_interval - delta_time
             delta = time.perf_counter() - start
             delay = self.frequency_seconds - delta
+            if self.metrics is not None:
+                self._record_tick(delta, missed=delay <= 0)
             if delay > 0: # positive delay -> faster than expected
                 time.sleep(delay) 
 
@@ -216,7 +418,8 @@ class EnvironmentInterface:
         """ Interface to pull environment data from the Simulation.
         
         {MUST BE DEFINED} This is an interface function which retrieves simulation data for the specified Simulation Agent and converts it
-        into environment data: observation, reward, term, trunc, info.
+        into environment data: observation, reward, term, trunc, info. If `info_dtype` is declared, info should be a tuple
+        of the schema's fields in order (a dict keyed by field names is also accepted).
 
         Args:
             agent_id : The ID of the Simulation Agent to sample.
@@ -232,12 +435,17 @@ class EnvironmentInterface:
     def act(self, agent_id, action):
         """ Interface to set the action of an Agent in the Simulation.
 
-        {MUST BE DEFINED} This is an interface function which sets the action of the specified Simulation Agent.
+        {MUST BE DEFINED} This is an interface function which sets the action of the specified Simulation Agent. The action
+        may be rejected by returning an error status, e.g. `Status.STALE_ACTION_ERROR` if the Simulation has moved on from
+        the state the action was computed for, which is returned to the ICCE.
 
         Args:
             agent_id : The ID of the Simulation Agent to set the action of.
             action : The action of the Simulation as provided by the ICCE as an ndarray.
 
+        Returns:
+            Optionally, the status of setting the action. None is treated as SUCCESS.
+
         Raises:
             NotImplementedError: If this function is not implemented by the interfacing Environment.
         """
@@ -245,32 +453,60 @@ class EnvironmentInterface:
     
 
     ########## CORE CALLBACKS ##########
-    def _on_handshake_and_validate(self, n_observation: int, n_actions: int, agent_hint: int) -> tuple[int, Status]:
+    def _on_handshake_and_validate(self, n_observation: int, n_actions: int, agent_hint: int,
+                                   observation_dtype: int = DType.UNSPECIFIED, action_dtype: int = DType.UNSPECIFIED,
+                                   observation_shape: tuple = (), action_shape: tuple = (),
+                                   observation_codec: int = Compression.NONE, resume: bool = False) -> tuple[int, Status, dict]:
         """ Callback function used to generate ICCE ID and validate observation/action spaces.
         
         This is function is called when the RPC method `handshake_and_validate` is invoked. An ICCE ID is generated using the implemented
         interface method `generate_id()` defined when interfacing the `EnvironmentInterface` class. The observation/action sizes of the model
-        in the ICCE are also validated against that of the interfaced environment.
+        in the ICCE are also validated against that of the interfaced environment. The wire dtypes and codec requested by the ICCE are stored so
+        that observations are encoded, and actions decoded, per ICCE. Unsupported codecs fall back to `Compression.NONE`.
+        ICCEs reconnecting after a failure resume their hinted agent once it is free, i.e. once their previous connection
+        was unmapped for missing heartbeats. Every mapping is issued a new session token, which the ICCE sends with its
+        requests, so that the requests of a previous connection are rejected rather than acting for the new one.
 
         Args:
             n_observation : The observation size, or the input of the ICCE.
             n_actions: The action size, or the output of the ICCE.
+            agent_hint : The Simulation Agent ID the ICCE requests to be mapped to.
+            observation_dtype : The wire dtype the ICCE requests observations in. FLOAT64 if unspecified.
+            action_dtype : The wire dtype the ICCE sends actions in. FLOAT32 if unspecified.
+            observation_shape : The observation shape expected by the ICCE. Empty if the ICCE accepts the environment's shape.
+            action_shape : The action shape sent by the ICCE. Empty if the ICCE accepts the environment's shape.
+            observation_codec : The compression ID of the codec the ICCE requests observations to be encoded with.
+            resume : Whether the ICCE is reconnecting to the hinted agent it was previously mapped to.
 
         Returns:
-            The generated ICCE ID based on the defined interface and the validation status.
+            The generated ICCE ID based on the defined interface, the validation status and the negotiated wire format,
+            including the session token. The status is WAIT if the environment is not ready yet.
         """
+        # Sizes may still be resolved and the initial data sampled
+        if not self._ready.is_set():
+            return INVALID_ID, Status.WAIT, {}
+
         # I/O validation
         if (self.n_observation != n_observation):
-            return INVALID_ID, Status.OBSERVATION_SIZE_ERROR
+            return INVALID_ID, Status.OBSERVATION_SIZE_ERROR, {}
         if (self.n_action != n_actions):
-            return INVALID_ID, Status.ACTION_SIZE_ERROR
+            return INVALID_ID, Status.ACTION_SIZE_ERROR, {}
+        if observation_shape and tuple(observation_shape) != self.observation_shape:
+            return INVALID_ID, Status.OBSERVATION_SIZE_ERROR, {}
+        if action_shape and tuple(action_shape) != self.action_shape:
+            return INVALID_ID, Status.ACTION_SIZE_ERROR, {}
+        # ICCEs which do not negotiate dtypes receive float64 observations and send float32 actions
+        observation_dtype = observation_dtype or DType.FLOAT64
+        action_dtype = action_dtype or DType.FLOAT32
+        if not encoding.is_supported(observation_dtype) or not encoding.is_supported(action_dtype):
+            return INVALID_ID, Status.DTYPE_ERROR, {}
         
         agent_id = INVALID_ID
         # If ICCE requests to be mapped to a particular Agent ID
         if agent_hint != INVALID_ID:
-            # Requested Agent is already mapped: Error!
+            # Requested Agent is already mapped: Error! Reconnecting ICCEs retry until their previous connection times out
             if agent_hint in self.active_agents:
-                return INVALID_ID, Status.AGENT_ID_ERROR
+                return INVALID_ID, Status.AGENT_ID_ERROR, {}
             # Requested Agent is available
             agent_id = agent_hint
         # ICCE does not request any particular Agent IDs
@@ -278,20 +514,41 @@ class EnvironmentInterface:
             # Get an agent that has yet to be mapped
             agent_id = self._generate_agent_id()
             if agent_id == INVALID_ID:
-                return INVALID_ID, Status.AGENT_ID_ERROR
+                return INVALID_ID, Status.AGENT_ID_ERROR, {}
         
         # Generate ICCE ID based on registered agent
         try:
             icce_id = self.registered_agents.index(agent_id)
         except:
-            return INVALID_ID, Status.ICCE_ID_ERROR 
+            return INVALID_ID, Status.ICCE_ID_ERROR, {}
+
+        # Store negotiated wire format
+        if not codecs.is_supported(observation_codec):
+            observation_codec = Compression.NONE
+        self._icce_dtypes[icce_id] = (DType(observation_dtype), DType(action_dtype))
+        self._icce_codecs[icce_id] = codecs.create_codec(observation_codec)
+        self._icce_codec_ticks[icce_id] = 0
+        self._icce_encoders[icce_id] = encoding.Encoder(observation_dtype, self.observation_shape)
+        self._icce_samples[icce_id] = _CachedSample()
+        negotiated = {
+            'observation_dtype': observation_dtype,
+            'action_dtype': action_dtype,
+            'observation_shape': self.observation_shape,
+            'action_shape': self.action_shape,
+            'observation_codec': observation_codec,
+            'chunked': self.n_observation * encoding.numpy_dtype(observation_dtype).itemsize > self.max_chunk_bytes,
+            'info_schema': encoding.dtype_to_schema(self.info_dtype) if self.info_dtype is not None else '',
+            'agent_id': agent_id,
+            'session': secrets.randbits(64) or 1
+        }
 
         # icce_id = self._generate_icce_id()
         # if icce_id == INVALID_ID:
         #    return INVALID_ID, Status.ICCE_ID_ERROR 
         
         # Map icce to agent
-        self._add_icce(icce_id, agent_id)
+        self._add_icce(icce_id, agent_id, negotiated['session'])
+        self._advertise_event.set()
 
         # Print log
         if self.debug:
@@ -299,42 +556,286 @@ class EnvironmentInterface:
             for agent in self._sim_agent_to_icce.keys():
                 print(f"{agent} : {self._sim_agent_to_icce[agent]}")
 
-        return icce_id, Status.SUCCESS
+        return icce_id, Status.SUCCESS, negotiated
     
-    def _on_sample(self, icce_id):
+    def _on_sample(self, icce_id, base_tick=0, session=0):
         """ Retrieves the environment data of a specified ICCE agent.
 
         Callback function to sample the environment data (Observation, Reward, Terminated, Truncated, Info) of a specified ICCE, 
         as well as the status of the environment (SUCCESS/DONE/WAIT). This funciton is called by the gRPC endpoint when the relevant
-        RPC is invoked.
+        RPC is invoked. The observation is encoded in the wire dtype and with the codec negotiated by the ICCE, and the info
+        is packed according to the declared info schema. Only the encoded bytes are allocated per call.
+
+        Stateful codecs encode the observation against the observation they previously encoded. If the ICCE did not decode
+        that observation, e.g. as the response was lost or the RPC cancelled, the codec is reset so that the observation is
+        encoded independently. The tick and environment data are read together under `lock`, so that an observation is
+        never tagged with the tick before it, and the codec is not used for a tick the ICCE already decoded, which it
+        skips: the observation is then empty.
 
         Args:
             icce_id : The ID of the ICCE to sample.
+            base_tick : The tick of the observation last decoded by the ICCE, 0 if none.
+            session : The session token issued to the ICCE at handshake.
 
         Returns:
-            Observation (in bytes), Reward, Term, Trunc, Status of the ICCE.
+            Observation (in bytes), Observation scale, Reward, Term, Trunc, Info, Status, Tick ID, Episode, Episode return of
+            the ICCE, and the tick the observation is encoded against (0 if encoded independently).
         """
-        return self.observations[icce_id].tobytes(), self.rewards[icce_id], self.term[icce_id], self.trunc[icce_id], self.info[icce_id], int(self.status)
+        # ICCE unmapped, e.g. after missing heartbeats, or its agent remapped to a new session
+        encoder, codec, cache = self._icce_encoders.get(icce_id), self._icce_codecs.get(icce_id), self._icce_samples.get(icce_id)
+        if encoder is None or codec is None or cache is None or not self._valid_session(icce_id, session):
+            return b'', 1.0, 0.0, False, False, b'', int(Status.ICCE_ID_ERROR), self.tick, self.episode, 0.0, 0
+        self._last_seen[icce_id] = time.monotonic()
+
+        # The encoder and codec of an ICCE are used by one sample at a time, e.g. of a unary and a streamed sample
+        with cache.lock:
+            with self.lock:
+                tick = self.tick
+                decoded = base_tick != 0 and base_tick == tick
+                if not decoded:
+                    obs, obs_scale = encoder(self.observations[icce_id])
+                info = self.info[icce_id].tobytes() if self.info_dtype is not None else b''
+                data = (self.rewards[icce_id], self.term[icce_id], self.trunc[icce_id], info, int(self.status), tick, self.episode, self.returns[icce_id])
+
+            # The ICCE already decoded this tick, and must not decode it again
+            if decoded:
+                return b'', 1.0, *data, base_tick
+
+            # Encode independently of the codec's previous observation, if the ICCE did not decode it
+            if base_tick != self._icce_codec_ticks.get(icce_id):
+                codec.reset()
+                base_tick = 0
+            obs = codec.encode(obs)
+            self._icce_codec_ticks[icce_id] = tick
+        return obs, obs_scale, *data, base_tick
     
-    def _on_act(self, icce_id, action_bytes):
+    def _on_sample_serialized(self, icce_id: int, serialize, base_tick: int = 0, session: int = 0) -> bytes:
+        """ Retrieves the serialized environment data of a specified ICCE, serialized once per published version.
+
+        Callback function used by the `sample` RPC. The first sample of an ICCE after the environment publishes a new tick
+        or status encodes and serializes its environment data using `_on_sample()`, and every further sample of that
+        version (ICCEs polling faster than the environment ticks, spectators, etc.) returns the same bytes. Responses are
+        serialized on demand rather than on the tick loop, so that stateful codecs only encode the ticks sent to the ICCE.
+
+        Args:
+            icce_id : The ID of the ICCE to sample.
+            serialize : Serializes the environment data returned by `_on_sample()` into a response.
+            base_tick : The tick of the observation last decoded by the ICCE, 0 if none. Delta encoded responses are only
+                shared by samples of the same base tick.
+            session : The session token issued to the ICCE at handshake.
+
+        Returns:
+            The serialized response.
+        """
+        cache = self._icce_samples.get(icce_id)
+        if cache is None or not self._valid_session(icce_id, session):
+            return serialize(*self._on_sample(icce_id, base_tick, session))
+
+        with cache.lock:
+            # Version is read first, so that data published while serializing is serialized again by the next sample
+            version = self._published
+            hit = cache.version == version and cache.base_tick in (0, base_tick)
+            if not hit:
+                data = self._on_sample(icce_id, base_tick, session)
+                cache.payload = serialize(*data)
+                cache.version = version
+                cache.base_tick = data[-1]
+            payload = cache.payload
+        if hit:
+            self._last_seen[icce_id] = time.monotonic()
+        if self.metrics is not None:
+            self._sample_cache[hit].inc()
+        return payload
+
+    def _on_act(self, icce_id, action_bytes, action_scale=1.0, tick=0, session=0):
         """ Sets the action of a Simulation agent using the ICCE ID.
 
         Callback function to set the action of a Simulation agent. The action data is received from the ICCE client and the ICCE ID
         of the client is mapped to the Simulation Agent's ID. The action is then set by callin the user-defined interface act() to
-        set the action of the agent in the Simulation.
+        set the action of the agent in the Simulation. The age of the action is recorded, and actions computed from observations
+        older than `max_action_age` ticks are rejected. Actions are decoded in place into `self.actions`. The status returned
+        by the user-defined act() is returned to the ICCE.
 
         icce_id : The ID of the ICCE which is mapped to a Simulation Agent's ID.
-        action_bytes : The requested action in bytes which is to be converted to an ndarray.
+        action_bytes : The requested action in bytes, encoded in the negotiated wire dtype, which is to be converted to an ndarray.
+        action_scale : The quantization scale of the action.
+        tick : The tick ID of the observation the action was computed from.
+        session : The session token issued to the ICCE at handshake.
 
         Returns:
             Status of setting the action.
         """
-        action = np.frombuffer(buffer=action_bytes, dtype=np.float32)
-        status = self.act(agent_id=self._icce_to_sim_agent[icce_id], action=action)
+        # ICCE unmapped, e.g. after missing heartbeats, or its agent remapped to a new session
+        agent_id, dtypes = self._icce_to_sim_agent.get(icce_id), self._icce_dtypes.get(icce_id)
+        if agent_id is None or dtypes is None or not self._valid_session(icce_id, session):
+            return Status.ICCE_ID_ERROR
+        self._last_seen[icce_id] = time.monotonic()
+
+        # Record and validate age of action
+        age = self.tick - tick
+        self.action_ages[icce_id] = age
+        if self.max_action_age is not None and age > self.max_action_age:
+            self.stale_actions[icce_id] += 1
+            return Status.STALE_ACTION_ERROR
+
+        encoding.decode(action_bytes, dtypes[1], action_scale, out=self.actions[icce_id])
+        if self.metrics is not None:
+            start = time.perf_counter()
+        with self._span('act_hook'):
+            status = self.act(agent_id=agent_id, action=self.actions[icce_id])
+        if self.metrics is not None:
+            self._act_hook_seconds.observe(time.perf_counter() - start)
+        if status is None:
+            return Status.SUCCESS
+        status = Status(status)
+        if status == Status.STALE_ACTION_ERROR:
+            self.stale_actions[icce_id] += 1
         return status
 
 
+    def _on_wait_for_publish(self, version: int | None, timeout: float) -> int:
+        """ Blocks until the environment publishes a version newer than the specified version.
+
+        Callback function used by subscriptions to wake exactly when new environment data is available, instead
+        of polling.
+
+        Args:
+            version : The latest version received by the subscriber. None if nothing has been received.
+            timeout : Maximum time in seconds to block.
+
+        Returns:
+            The latest published version, which is unchanged if the wait timed out.
+        """
+        with self._publish_condition:
+            self._publish_condition.wait_for(lambda: self._published != version, timeout=timeout)
+            return self._published
+
+
+    def _on_heartbeat(self, icce_id: int, session: int = 0) -> Status:
+        """ Records that an ICCE is alive.
+
+        Callback function used by the RPC `heartbeat`, which ICCEs invoke periodically on a background thread.
+
+        Args:
+            icce_id : The ID of the ICCE.
+            session : The session token issued to the ICCE at handshake.
+
+        Returns:
+            SUCCESS if the ICCE is mapped, otherwise ICCE_ID_ERROR signalling the ICCE to handshake again.
+        """
+        if icce_id not in self._icce_to_sim_agent or not self._valid_session(icce_id, session):
+            return Status.ICCE_ID_ERROR
+        self._last_seen[icce_id] = time.monotonic()
+        return Status.SUCCESS
+
+    def _on_health(self) -> tuple[Status, bool, int, int]:
+        """ Reports the readiness of the environment.
+
+        Callback function used by the RPC `health`, which ICCEs and launch scripts poll until the environment is ready.
+
+        Returns:
+            The status of the environment, whether it is ready to accept handshakes, and its free and total agents.
+        """
+        total_agents = len(self.registered_agents)
+        return self.status, self._ready.is_set(), total_agents - len(self._sim_agent_to_icce), total_agents
+
+    def _on_profile(self, seconds: float, interval_seconds: float, token: str) -> tuple[Status, bytes]:
+        """ Profiles the running environment.
+
+        Callback function used by the admin RPC `profile`. All threads of the environment, including the tick loop, are sampled
+        for the requested duration without being stopped. Only one profile can be recorded at a time. Profiling is disabled
+        unless the environment was created with a `profile_token`, which the request must carry.
+
+        Args:
+            seconds : The duration to profile for.
+            interval_seconds : The sampling interval. Defaults to 1 millisecond if 0.
+            token : The profiling token sent by the client.
+
+        Returns:
+            The status of the profile, and the stats in the pstats dump format.
+        """
+        if self.profile_token is None or not hmac.compare_digest(token.encode(), self.profile_token.encode()):
+            return Status.PERMISSION_ERROR, b''
+        stats = self._profiler.profile(seconds=seconds, interval_seconds=interval_seconds or None)
+        if stats is None:
+            return Status.PROFILE_ERROR, b''
+        return Status.SUCCESS, profiling.dumps(stats)
+
+
     ########## HELPERS ##########
+    def _advertise(self):
+        """ Helper func to periodically advertise the free agent slots to the registry.
+
+        Runs on a background thread until the environment shuts down. Slots are also advertised as soon as an ICCE is mapped.
+        """
+        while self.status != Status.SHUTDOWN:
+            try:
+                self._registry.advertise(
+                    ip_addr=self.ip_addr,
+                    port=self.port,
+                    free_slots=len(self.registered_agents) - len(self._icce_to_sim_agent),
+                    total_slots=len(self.registered_agents),
+                    n_observations=self.n_observation,
+                    n_actions=self.n_action,
+                    n_mapped=self._n_mapped
+                )
+            except grpc.RpcError:
+                # Registry unavailable, retry on the next advertisement
+                pass
+            self._advertise_event.wait(timeout=self.advertise_seconds)
+            self._advertise_event.clear()
+
+    def _preprocess(self):
+        """ Helper func to apply the observation preprocessing pipeline to the observations of all agents, into `observations`. """
+        observations = self._raw_observations
+        for transform, out in zip(self.transforms, self._transform_outputs):
+            observations = transform(observations, out=out)
+
+    def _span(self, name: str):
+        """ Helper func to create a span, if tracing is enabled. """
+        return self.tracer.span(name) if self.tracer is not None else NULL_SPAN
+
+    def _record_tick(self, delta: float, missed: bool):
+        """ Helper func to record the metrics of a tick.
+
+        Args:
+            delta : The duration of the tick excluding sleep, in seconds.
+            missed : Whether the tick exceeded the tick interval.
+        """
+        self._tick_seconds.observe(delta)
+        self._ticks_total.inc()
+        if missed:
+            self._missed_deadlines.inc()
+        self._active_icces.set(len(self._icce_to_sim_agent))
+        start_tick, start_time = self._episode_start
+        elapsed = time.perf_counter() - start_time
+        if elapsed > 0:
+            self._steps_per_second.set((self.tick - start_tick) / elapsed)
+
+    def _record_episode(self):
+        """ Helper func to record the length of the completed episode. """
+        self._episode_length.observe(self.tick - self._episode_start[0])
+
+    def _monitor(self):
+        """ Helper func to unmap ICCEs which have not been seen for `heartbeat_timeout_seconds`.
+
+        Runs on a background thread until the environment shuts down. Unmapped agents are free to be mapped by a
+        new, or reconnecting, ICCE.
+        """
+        while self.status != Status.SHUTDOWN:
+            time.sleep(self.heartbeat_timeout_seconds / 4)
+            now = time.monotonic()
+            for icce_id, last_seen in list(self._last_seen.items()):
+                if now - last_seen > self.heartbeat_timeout_seconds:
+                    print(f'ICCE {icce_id} timed out, unmapping agent {self._icce_to_sim_agent.get(icce_id)}')
+                    self._remove_icce(icce_id)
+
+    def _publish(self):
+        """ Helper func to notify subscribed ICCEs that the environment data or status has changed. """
+        with self._publish_condition:
+            self._published += 1
+            self._publish_condition.notify_all()
+    
     def _generate_icce_id(self) -> int:
         """ Helper func to generate an ICCE ID.
 
@@ -369,17 +870,43 @@ class EnvironmentInterface:
 
         return agent_id
     
-    def _add_icce(self, icce_id, agent_id):
+    def _add_icce(self, icce_id, agent_id, session):
         """ Helper func to map ICCE IDs to Agent IDs and vice-versa
         
             Args:
                 icce_id : The ID of the ICCE.
                 agent_id : The ID of the Simulation agent.
+                session : The session token issued to the ICCE.
         """
         
         with self.lock:
             self._icce_to_sim_agent.update({icce_id:agent_id})
             self._sim_agent_to_icce.update({agent_id:icce_id})
+            self._icce_sessions[icce_id] = session
+            self._last_seen[icce_id] = time.monotonic()
+            self._n_mapped += 1
+
+    def _remove_icce(self, icce_id):
+        """ Helper func to unmap an ICCE, freeing its agent.
+
+            Args:
+                icce_id : The ID of the ICCE.
+        """
+        with self.lock:
+            agent_id = self._icce_to_sim_agent.pop(icce_id, None)
+            self._sim_agent_to_icce.pop(agent_id, None)
+            self._icce_dtypes.pop(icce_id, None)
+            self._icce_codecs.pop(icce_id, None)
+            self._icce_codec_ticks.pop(icce_id, None)
+            self._icce_encoders.pop(icce_id, None)
+            self._icce_samples.pop(icce_id, None)
+            self._icce_sessions.pop(icce_id, None)
+            self._last_seen.pop(icce_id, None)
+        self._advertise_event.set()
+
+    def _valid_session(self, icce_id: int, session: int) -> bool:
+        """ Helper func to check that a request was sent by the session an ICCE ID is currently mapped to. """
+        return session != 0 and self._icce_sessions.get(icce_id) == session
     
     def _wait(self, time_seconds: int, description: str | None = None):
         """ Sleeps and renders progress bar.
@@ -391,7 +918,10 @@ class EnvironmentInterface:
             time_seconds : Time in seconds to wait.
             description : Text to render on the left of the progress bar.
         """
+        from tqdm import tqdm # Imported on first use, as it is slow to import
         for _ in tqdm(range(time_seconds*4), desc=description):
+            if self._shutdown.is_set():
+                break
             time.sleep(0.25)
 
 
@@ -1,23 +1,181 @@
 import grpc
 from ..grpc_interfaces import Environment_pb2, Environment_pb2_grpc
+from ..utils import Status
+
+import queue
+import random
+import time
+
+# Reconnect quickly to environments which are not up yet, rather than backing off for up to 2 minutes as gRPC does by default
+_CHANNEL_OPTIONS = [
+    ('grpc.initial_reconnect_backoff_ms', 100),
+    ('grpc.min_reconnect_backoff_ms', 100),
+    ('grpc.max_reconnect_backoff_ms', 1000)
+]
+
+class Subscription:
+    """ Stream of the environment data pushed by the environment, on demand of the client.
+
+    Each `request()` signals the environment that the client is ready for the tick after the one it last received, which
+    is then received by iterating the subscription. Chunks of a chunked observation are received without further requests.
+
+    Args:
+        stub : The stub of the environment.
+        id : The ICCE ID.
+        session : The session token issued to the ICCE at handshake.
+    """
+    def __init__(self, stub, id: int, session: int):
+        self._id = id
+        self._session = session
+        self._requests = queue.SimpleQueue()
+        # The requests are consumed by a thread of gRPC until the None sentinel
+        self._responses = stub.subscribe(iter(self._requests.get, None))
+
+    def request(self, base_tick: int = 0):
+        """ Requests the next tick.
+
+        Args:
+            base_tick : The tick of the observation last decoded, 0 if none.
+        """
+        self._requests.put(Environment_pb2.SampleRequest(id=self._id, base_tick=base_tick, session=self._session))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._responses)
+
+    def cancel(self):
+        self._requests.put(None)
+        self._responses.cancel()
+
 
 class ICCEEndpoint():
-    def __init__(self, ip_addr = 'localhost'):
-        self._channel = grpc.insecure_channel(ip_addr+':50051')
+    # Backoff (in seconds) between readiness checks, doubled up to MAX_READY_BACKOFF_SECONDS
+    READY_BACKOFF_SECONDS = 0.05
+    MAX_READY_BACKOFF_SECONDS = 1.0
+
+    def __init__(self, ip_addr = 'localhost', port = 50051, options = None):
+        self._channel = grpc.insecure_channel(ip_addr+':'+str(port), options=_CHANNEL_OPTIONS + list(options or ()))
         self._stub = Environment_pb2_grpc.EnvironmentStub(self._channel)
 
-    def handshake_and_validate(self, n_observations, n_actions, agent_hint):
+        # Requests of the ICCE ID are reused rather than rebuilt every tick
+        self._id_request = Environment_pb2.SampleRequest(id=-1)
+        self._heartbeat_request = Environment_pb2.HeartbeatRequest(id=-1)
+
+    def handshake_and_validate(self, n_observations, n_actions, agent_hint, observation_dtype, action_dtype,
+                               observation_shape=(), action_shape=(), observation_codec=0, resume=False, timeout=None):
+        """ Handshakes with the environment, waiting for it to be up and ready.
+
+        The RPC waits for the server to be up, and is retried with jittered exponential backoff while the environment
+        reports that it is not ready (WAIT), e.g. while it resets the simulation. Processes can therefore be started in
+        any order.
+
+        Args:
+            timeout : The maximum time to wait for the environment, in seconds. Waits indefinitely if None.
+
+        Returns:
+            The `HandshakeResponse`, whose status is WAIT if the environment was not ready within the timeout.
+
+        Raises:
+            grpc.RpcError: If the server was not up within the timeout.
+        """
         handshake_req = Environment_pb2.HandshakeRequest(
             n_observations=n_observations,
             n_actions=n_actions,
-            agent_hint=agent_hint)
+            agent_hint=agent_hint,
+            observation_dtype=observation_dtype,
+            action_dtype=action_dtype,
+            observation_shape=observation_shape,
+            action_shape=action_shape,
+            observation_codec=observation_codec,
+            resume=resume)
         
-        return self._stub.handshake_and_validate(handshake_req)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        backoff = ICCEEndpoint.READY_BACKOFF_SECONDS
+        while True:
+            # Wait for the server to be up instead of failing fast
+            response = self._stub.handshake_and_validate(handshake_req, wait_for_ready=True, timeout=self._remaining(deadline))
+            if response.status != Status.WAIT or not self._backoff(backoff, deadline):
+                return response
+            backoff = min(2 * backoff, ICCEEndpoint.MAX_READY_BACKOFF_SECONDS)
+
+    def wait_for_ready(self, timeout: float | None = None):
+        """ Blocks until the environment is up and ready to accept handshakes, e.g. in launch scripts.
+
+        Args:
+            timeout : The maximum time to wait, in seconds. Waits indefinitely if None.
+
+        Returns:
+            The `HealthResponse` of the ready environment, containing its status and free and total agents.
 
-    def sample(self, id: int):
-        icce_data = Environment_pb2.SampleRequest(id=id)
-        return self._stub.sample(icce_data)
+        Raises:
+            TimeoutError: If the environment was not ready within the timeout.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        backoff = ICCEEndpoint.READY_BACKOFF_SECONDS
+        while True:
+            try:
+                response = self._stub.health(Environment_pb2.HealthRequest(), wait_for_ready=True, timeout=self._remaining(deadline))
+                if response.ready:
+                    return response
+            except grpc.RpcError as error:
+                if error.code() != grpc.StatusCode.DEADLINE_EXCEEDED:
+                    raise
+            if not self._backoff(backoff, deadline):
+                raise TimeoutError(f'Environment was not ready within {timeout} seconds')
+            backoff = min(2 * backoff, ICCEEndpoint.MAX_READY_BACKOFF_SECONDS)
+
+    def sample(self, id: int, base_tick: int = 0, session: int = 0, metadata=None):
+        return self._stub.sample(self._sample_request(id, base_tick, session), metadata=metadata)
+
+    def sample_stream(self, id: int, base_tick: int = 0, session: int = 0):
+        return self._stub.sample_stream(self._sample_request(id, base_tick, session))
+
+    def subscribe(self, id: int, session: int = 0) -> Subscription:
+        return Subscription(self._stub, id, session)
     
-    def act(self, id: int, action: bytes):
-        request = Environment_pb2.ActionRequest(id=id, action=action)
-        return self._stub.act(request)
\ No newline at end of file
+    def act(self, id: int, action: bytes, action_scale: float = 1.0, tick: int = 0, session: int = 0, metadata=None):
+        request = Environment_pb2.ActionRequest(id=id, action=action, action_scale=action_scale, tick=tick, session=session)
+        return self._stub.act(request, metadata=metadata)
+
+    def profile(self, seconds: float, interval_seconds: float = 0.0, token: str = ''):
+        request = Environment_pb2.ProfileRequest(seconds=seconds, interval_seconds=interval_seconds, token=token)
+        return self._stub.profile(request)
+
+    def heartbeat(self, id: int, session: int = 0, timeout: float | None = None):
+        if self._heartbeat_request.id != id or self._heartbeat_request.session != session:
+            self._heartbeat_request = Environment_pb2.HeartbeatRequest(id=id, session=session)
+        return self._stub.heartbeat(self._heartbeat_request, timeout=timeout)
+
+    def sample_batch(self, request):
+        return self._stub.sample_batch.future(request)
+
+    def act_batch(self, request):
+        return self._stub.act_batch.future(request)
+
+    def close(self):
+        self._channel.close()
+
+    def _remaining(self, deadline: float | None) -> float | None:
+        """ The time left until a deadline, None if there is none. """
+        return max(0.0, deadline - time.monotonic()) if deadline is not None else None
+
+    def _backoff(self, backoff: float, deadline: float | None) -> bool:
+        """ Sleeps for a jittered backoff, so that many processes do not retry in lockstep.
+
+        Returns:
+            False without sleeping if the deadline would be exceeded.
+        """
+        delay = random.uniform(0.5, 1.0) * backoff
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return False
+        time.sleep(delay)
+        return True
+
+    def _sample_request(self, id: int, base_tick: int, session: int):
+        if self._id_request.id != id or self._id_request.session != session:
+            self._id_request = Environment_pb2.SampleRequest(id=id, session=session)
+        # Requests are serialized when invoked, so the base tick is updated in place
+        self._id_request.base_tick = base_tick
+        return self._id_request
\ No newline at end of file
@@ -1,30 +1,119 @@
 from .ICCEEndpoint import ICCEEndpoint
-from ..utils import Status, INVALID_ID
+from .LearnerClient import LearnerClient
+from .RegistryClient import RegistryClient
+from ..utils import Status, DType, Compression, INVALID_ID
+from ..utils import encoding, codecs
+from ..utils.metrics import MetricsRegistry, LENGTH_BUCKETS
+from ..utils.tracing import Tracer, NULL_SPAN, TRACE_METADATA_KEY
+from ..utils import tracing, profiling
 
+import grpc
 import numpy as np
+import signal
+import sys
+import threading
 import time
 
+# Wire status -> Status, looked up without calling the enum constructor every tick
+_STATUSES = {int(status): status for status in Status}
+
+# Errors of RPCs which are recovered from by reconnecting, as the environment is unreachable, e.g. restarted
+_RECONNECT_CODES = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
+
 class ICCEInterface:
     
-    def __init__(self, frequency_hz=120, agent_hint = INVALID_ID, ip_addr = 'localhost'):
+    def __init__(self, frequency_hz=120, agent_hint = INVALID_ID, ip_addr = 'localhost', subscribe = False,
+                 learner_ip_addr = None, learner_port = 50053, port = 50051, registry_ip_addr = None, registry_port = 50050,
+                 action_repeat = 1, record_substeps = False, metrics_port = None, metrics_snapshot_path = None, metrics_snapshot_seconds = 10.0,
+                 trace_path = None, profile_path = None, profile_seconds = 10.0, heartbeat_seconds = 1.0, reconnect_timeout_seconds = 60.0,
+                 evaluate = False):
         # ICCE attributes
         self.n_observation: int
         self.n_action: int
-        self.observation : np.ndarray
+        self.observation_dtype = DType.FLOAT64 # Wire dtype of observations, negotiated at handshake
+        self.action_dtype = DType.FLOAT32 # Wire dtype of actions, negotiated at handshake
+        self.observation_shape: tuple | None = None # Shape of observations, received from the environment if None
+        self.action_shape: tuple | None = None # Shape of actions, received from the environment if None
+        # Codec of observations, negotiated at handshake. A Compression, or the int ID of a codec registered with register_codec()
+        self.observation_codec = Compression.NONE
+        self.observation : np.ndarray # Decoded in place every tick, copy to retain past observations
         self.reward: float
         self.term: bool
         self.trunc: bool
-        self.info: dict
+        self.info: np.void | None = None # Info record, structured by the schema declared by the environment
+        self.info_dtype: np.dtype | None = None # Info schema, received from the environment at handshake
 
         # ICCE settings
         self.id = INVALID_ID
+        self.session = 0 # Session token of the mapping, issued by the environment at handshake
+        self.agent_id = INVALID_ID # Simulation Agent ID the ICCE is mapped to, resumed when reconnecting
         self.status = Status.SUCCESS
         self.episode = 0
+        self.tick = 0 # Tick ID of the latest sample
+        self._acted_tick = None # Tick ID of the observation the latest action was computed from
+        self.stale_actions = 0 # Number of actions rejected by the environment as computed from stale observations
         self.frequency_seconds = 1.0 / frequency_hz
         self.agent_hint = agent_hint
+        self.subscribe = subscribe # Environment pushes every tick instead of being polled at frequency_hz
+        self.action_repeat = action_repeat # Number of environment ticks each action is held for
+        self.record_substeps = record_substeps # Calls post_substep() on every tick an action is held for
+        self._holding = False # An action is held, awaiting post_sample()
+        self._repeat_reward = 0.0 # Reward accumulated over the ticks the held action was held for
+
+        # Evaluation - Inference only, the user-defined post_sample(), post_substep() and post_episode() are not called
+        self.evaluate = evaluate
+        self.episode_return = 0.0 # Reward accumulated over the current episode by the environment, including unsampled ticks
+        self.episode_returns: list[float] = [] # Return of each evaluated episode
+        self.episode_scores: list[float | None] = [] # Score of each evaluated episode, from episode_score()
 
         # Communication layer endpoint
-        self._endpoint = ICCEEndpoint(ip_addr=ip_addr)
+        self.address = f'{ip_addr}:{port}' # Address of the environment, assigned by the registry if any
+        self._endpoint = ICCEEndpoint(ip_addr=ip_addr, port=port)
+        self._registry = RegistryClient(ip_addr=registry_ip_addr, port=registry_port) if registry_ip_addr is not None else None
+        self._codec = None
+        self._chunked = False
+        self._action_encoder = None # Reuses its cast/quantization buffers every action
+        self._info = None # Bytes of the preallocated info record, which self.info is a view of
+        self._decoded_tick = None # Tick ID of the decoded observation
+        self._subscription = None
+
+        # Learner client, if the ICCE acts for a centralized learner
+        self.weights_version = 0 # Version of the weights loaded from the learner
+        self._learner = LearnerClient(ip_addr=learner_ip_addr, port=learner_port) if learner_ip_addr is not None else None
+
+        # Metrics, only instrumented if served over HTTP and/or written as snapshots
+        self.metrics = MetricsRegistry() if metrics_port is not None or metrics_snapshot_path is not None else None
+        self.metrics_port = metrics_port
+        self.metrics_snapshot_path = metrics_snapshot_path
+        self.metrics_snapshot_seconds = metrics_snapshot_seconds
+        if self.metrics is not None:
+            self._step_seconds = self.metrics.histogram('icce_step_seconds', 'Duration of a control loop iteration excluding sleep, in seconds')
+            self._act_hook_seconds = self.metrics.histogram('icce_act_hook_seconds', 'Latency of the user-defined act(), in seconds')
+            self._post_sample_hook_seconds = self.metrics.histogram('icce_post_sample_hook_seconds', 'Latency of the user-defined post_sample(), in seconds')
+            self._rpc_seconds = {rpc: self.metrics.histogram('icce_rpc_seconds', 'Round trip latency of RPCs, in seconds', rpc=rpc)
+                                for rpc in ('sample', 'sample_stream', 'subscribe', 'act')}
+            self._stale_actions = self.metrics.counter('icce_stale_actions_total', 'Actions rejected by the environment as stale')
+            self._missed_deadlines = self.metrics.counter('icce_missed_deadlines_total', 'Loop iterations which exceeded the loop interval')
+            self._steps_per_second = self.metrics.gauge('icce_steps_per_second', 'Sampled ticks per second, averaged over the current episode')
+            self._episode_length = self.metrics.histogram('icce_episode_length_ticks', 'Length of episodes, in ticks', buckets=LENGTH_BUCKETS)
+            self._trajectory_queue_depth = self.metrics.gauge('icce_trajectory_queue_depth', 'Trajectories awaiting sending to the learner')
+        self._episode_start = (0, 0.0) # Tick ID and time at the start of the episode
+
+        # Span tracing, flushed as Chrome trace JSON to trace_path at shutdown
+        self.trace_path = trace_path
+        self.tracer = Tracer(process_name='icce') if trace_path is not None else None
+
+        # On-demand profiler, triggered by SIGUSR1 if profile_path is set
+        self.profile_path = profile_path
+        self.profile_seconds = profile_seconds
+        self._profiler = profiling.SamplingProfiler()
+
+        # Failure detection - Heartbeats keep the ICCE mapped, and lost connections are re-established with backoff
+        self.heartbeat_seconds = heartbeat_seconds
+        self.reconnect_timeout_seconds = reconnect_timeout_seconds
+        self._evicted = threading.Event() # Environment no longer maps the ICCE, set by the heartbeat thread
+        self._closed = threading.Event() # Stops the heartbeat thread, set by close()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat, daemon=True)
 
     def run(self):
         """ Runs the ICCE client.
@@ -33,51 +122,128 @@ class ICCEInterface:
 
         ICCE handshakes with the Environment, validating its input/output sizes, and assigns an ICCE ID
         Samples the Environment for initial environment data (Observation, Reward, Terminated, Truncated, Info)
-        Loop while the Environment does not shut down (frequency-bound):
-            Calls act() user-defined interface to take an action in the Simulation
+        Loop while the Environment does not shut down (frequency-bound, or tick-bound if subscribed):
+            If acting for a learner and new weights were pulled, calls load_weights() user-defined interface
+            If the Environment is unavailable, or the ICCE was unmapped, reconnects and resumes its agent. Other RPC errors are raised
+            Calls act() user-defined interface to take an action in the Simulation, if the observation is of a new tick and no action is held.
+            Actions rejected by the environment as stale are counted in `stale_actions` and not held
             Samples the Environment for environment data after taking action
-            Calls post_sample() user-defined interface to run behaviors after taking an action in the simulation
+            If a new tick was sampled, accumulates its reward and calls post_substep() user-defined interface if record_substeps is set
+            Calls post_sample() user-defined interface to run behaviors after taking an action in the simulation, once the action
+            has been held for action_repeat ticks, with the accumulated reward
             If received end-of-episode, calls user-defined interface post_episode to run behaviours after the end of an episode
 
+        If `evaluate` is set, the ICCE only infers actions: post_sample(), post_substep() and post_episode() are not called,
+        gradients are disabled if torch is used, and the return (accumulated by the environment) and episode_score() of each
+        episode are recorded in `episode_returns` and `episode_scores`. run() then returns when the environment shuts down,
+        rather than exiting.
+
         Raises:
             NotImplementedError: If user-defined interfaces, act(), post_sample(), post_episode(), are not implemented by the interfacing ICCE.
+            grpc.RpcError: If an RPC failed for a reason other than the environment being unavailable.
         """
-        # Handshake with environment and validate I/O of model with environment - Blocking
-        self._handshake_and_validate()
+        # Profile on demand without restarting, e.g. `kill -USR1 <pid>`
+        if self.profile_path is not None and hasattr(signal, 'SIGUSR1') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.start_profile(seconds=self.profile_seconds, path=self.profile_path))
 
-        # Pull initial data
-        self._sample()
+        # Inference only - Disable gradient tracking on the control loop thread, if the ICCE uses torch
+        if self.evaluate and 'torch' in sys.modules:
+            sys.modules['torch'].set_grad_enabled(False)
+
+        # Handshake with environment and validate I/O of model with environment, subscribe and pull initial data - Blocking
+        self._connect()
+
+        # Keep the ICCE mapped while alive
+        if self.heartbeat_seconds is not None:
+            self._heartbeat_thread.start()
+
+        # Serve metrics
+        if self.metrics is not None:
+            if self.metrics_port is not None:
+                self.metrics.serve(port=self.metrics_port)
+            if self.metrics_snapshot_path is not None:
+                self.metrics.start_snapshots(path=self.metrics_snapshot_path, interval_seconds=self.metrics_snapshot_seconds)
+
+        self._episode_start = (self.tick, time.perf_counter())
 
         # Main loop
         while True:
             # sample at fixed interval
             start = time.perf_counter()
 
-            match(self.status):
-                case Status.SUCCESS:
-                    # ICCE to act
-                    self._act()
+            # Load weights pulled in the background
+            if self._learner is not None:
+                self._sync_weights()
 
-                    # Sample the environment after taking an action
-                    self._sample()
+            # Reconnect if unmapped by the environment
+            if self._evicted.is_set():
+                self._reconnect()
 
-                    # Post sample - Learn/Remember, depends on algorithm
-                    self.post_sample(observation=self.observation, reward=self.reward)
-                case Status.DONE:
-                    print('end of episode...')
-                    self.post_episode()
-                    self.status = Status.WAIT # Wait for sample to retrieve status == SUCCESS
-                case Status.WAIT:
-                    # Continue sampling for status change to SUCCESS
-                    self._sample()
-                case Status.SHUTDOWN:
-                    print('shutting down...')
-                    exit(code=1)
+            try:
+                match(self.status):
+                    case Status.SUCCESS:
+                        with self._span('step', trace_id=tracing.trace_id(self.id, self.tick)):
+                            # ICCE to act - Skip inference if the environment has not ticked since the last action, or the action is held.
+                            # Rejected actions are not held, so that the ICCE acts again on the next tick
+                            if not self._holding and self.tick != self._acted_tick:
+                                self._holding = self._act()
+
+                            # Sample the environment after taking an action
+                            previous_tick = self.tick
+                            self._sample()
+
+                            # Post sample - Learn/Remember, depends on algorithm. Only once per tick of a held action
+                            if self.tick != previous_tick and self._holding:
+                                self._post_sample()
+                    case Status.DONE:
+                        print('end of episode...')
+                        if self.metrics is not None:
+                            self._episode_length.observe(self.tick - self._episode_start[0])
+                        if self.evaluate:
+                            self.episode_returns.append(self.episode_return)
+                            self.episode_scores.append(self.episode_score())
+                        else:
+                            self.post_episode()
+                        self.status = Status.WAIT # Wait for sample to retrieve status == SUCCESS
+                    case Status.WAIT:
+                        # Continue sampling for status change to SUCCESS
+                        self._sample()
+                        if self.status == Status.SUCCESS:
+                            self._episode_start = (self.tick, time.perf_counter())
+                    case Status.ICCE_ID_ERROR:
+                        # Unmapped by the environment, e.g. after missing heartbeats
+                        self._reconnect()
+                    case Status.SHUTDOWN:
+                        print('shutting down...')
+                        if self.metrics is not None:
+                            if self.metrics_snapshot_path is not None:
+                                self.metrics.write_snapshot(self.metrics_snapshot_path)
+                            self.metrics.shutdown()
+                        if self.tracer is not None:
+                            self.tracer.flush(self.trace_path)
+                        self.close()
+                        if self.evaluate:
+                            # Evaluated episodes are collected by the caller
+                            return
+                        exit(code=1)
+            except grpc.RpcError as error:
+                # Environment unavailable, e.g. restarted. Other errors, e.g. of invalid requests, are not fixed by reconnecting
+                if error.code() not in _RECONNECT_CODES:
+                    raise
+                self._reconnect()
+
+            # Subscribed ICCEs are paced by the environment, blocking in _sample() until the next tick
+            if self.subscribe:
+                if self.metrics is not None:
+                    self._record_step(time.perf_counter() - start, missed=False)
+                continue
 
             # Check interval
             # delay = desired_interval - delta_time
             delta = time.perf_counter() - start
             delay = self.frequency_seconds - delta
+            if self.metrics is not None:
+                self._record_step(delta, missed=delay <= 0)
             if delay > 0: # positive delay -> faster than expected
                 time.sleep(delay)
 
@@ -96,7 +262,8 @@ class ICCEInterface:
         """ User-defined behaviour after sampling the Environment.
 
         This function is called after taking an action in the environment and sampling the environment after. Examples of use cases
-        of this function is to allow the RL agent to learn using the new observations and reward after taking an action.
+        of this function is to allow the RL agent to learn using the new observations and reward after taking an action. The
+        observation is overwritten in place by the next sample, so it must be copied to be retained, e.g. in a replay buffer.
 
         Raises:
             NotImplementedError: If this function is not implemented by the interfacing ICCE.
@@ -112,14 +279,300 @@ class ICCEInterface:
             NotImplementedError: If this function is not implemented by the interfacing ICCE.
         """
         raise NotImplementedError("Functionality to infer actions must be defined!")
+
+    def post_substep(self, observation: np.ndarray, reward: float):
+        """ User-defined behaviour after sampling the Environment while an action is held.
+
+        This function is called on every tick an action is held for, if `record_substeps` is set, e.g. to record every
+        environment tick while acting every `action_repeat` ticks.
+
+        Args:
+            observation : The observation of the tick.
+            reward : The reward of the tick.
+
+        Raises:
+            NotImplementedError: If this function is not implemented by the interfacing ICCE.
+        """
+        raise NotImplementedError("Functionality to record substeps must be defined!")
+
+    def episode_score(self) -> float | None:
+        """ User-defined outcome of an evaluated episode.
+
+        This function is called at the end of each episode if `evaluate` is set, once the final tick has been sampled, e.g. to
+        return 1.0 if the agent won, 0.5 on a draw and 0.0 if it lost, using `self.reward`, `self.term` and `self.info`.
+
+        Returns:
+            The score of the episode, or None if episodes have no outcome.
+        """
+        return None
+
+    def load_weights(self, weights: dict[str, np.ndarray]):
+        """ User-defined behaviour when new weights are received from the learner.
+
+        This function is called on the control loop, between steps, when the learner has broadcasted new weights. Only
+        required if the ICCE acts for a learner, e.g. `model.load_state_dict({k: torch.from_numpy(v) for k, v in weights.items()})`.
+
+        Args:
+            weights : The weights broadcasted by the learner, keyed by name.
+
+        Raises:
+            NotImplementedError: If this function is not implemented by the interfacing ICCE.
+        """
+        raise NotImplementedError("Functionality to load weights must be defined!")
+
+    def push_trajectory(self, **trajectory: np.ndarray):
+        """ Pushes a trajectory to the learner. Non-blocking.
+
+        The trajectory is tagged with the ICCE ID and the version of the loaded weights, and sent on a background thread.
+        Typically called in post_episode(), e.g. `self.push_trajectory(observations=obs, actions=actions, rewards=rewards)`.
+
+        Args:
+            trajectory : The named arrays of the trajectory.
+
+        Raises:
+            ValueError: If the ICCE was not created with a learner address.
+        """
+        if self._learner is None:
+            raise ValueError("ICCE is not acting for a learner, learner_ip_addr must be set!")
+        self._learner.push_trajectory(actor_id=self.id, weights_version=self.weights_version, trajectory=trajectory)
         
+    def start_profile(self, seconds: float, path: str) -> bool:
+        """ Profiles the running ICCE on a background thread. Non-blocking.
+
+        All threads of the ICCE, including the control loop, are sampled for the specified duration without being stopped,
+        and the stats are written in the pstats dump format, e.g. to be inspected using `python -m pstats <path>`.
+
+        Args:
+            seconds : The duration to profile for.
+            path : The path the stats are written to.
+
+        Returns:
+            Whether the profile was started, False if a profile is already being recorded.
+        """
+        if self._profiler.running:
+            return False
+
+        def profile():
+            stats = self._profiler.profile(seconds=seconds)
+            if stats is not None:
+                with open(path, 'wb') as f:
+                    f.write(profiling.dumps(stats))
+                print(f'Profile written to {path}')
+
+        threading.Thread(target=profile, daemon=True).start()
+        return True
+
+    def close(self):
+        """ Stops the heartbeats, cancels the subscription and closes the connection to the environment. Called by run()
+        when the environment shuts down, and may be called to release an ICCE whose run() raised.
+        """
+        self._closed.set()
+        if self._subscription is not None:
+            self._subscription.cancel()
+            self._subscription = None
+        self._endpoint.close()
+        if self._learner is not None:
+            self._learner.close()
+
     # HELPERS
-    def _handshake_and_validate(self) -> bool:
+    def _assign(self, deadline: float):
+        """ Requests the registry to assign the ICCE to an environment, and connects to it.
+
+        Waits for the registry to be up, and retries assignment with backoff while no matching environment has advertised
+        yet, or every matching environment is full, e.g. as its free agents are reserved for other ICCEs, until the
+        deadline. ICCEs can therefore be started before the registry and environments.
+
+        Args:
+            deadline : The time.monotonic() time after which assignment is no longer retried.
+        """
+        backoff = 0.1
+        while True:
+            try:
+                response = self._registry.assign(n_observations=self.n_observations, n_actions=self.n_actions,
+                                                 timeout=max(0.0, deadline - time.monotonic()))
+            except grpc.RpcError as error:
+                if error.code() != grpc.StatusCode.DEADLINE_EXCEEDED:
+                    raise
+                print('Assignment failed.')
+                print('Registry unavailable.')
+                # End program
+                exit()
+            if response.status not in (Status.AGENT_ID_ERROR, Status.OBSERVATION_SIZE_ERROR) or time.monotonic() + backoff >= deadline:
+                break
+            time.sleep(backoff)
+            backoff = min(2 * backoff, 5.0)
+
+        ## Assignment failed
+        if Status(response.status) != Status.SUCCESS:
+            print('Assignment failed.')
+            match(response.status):
+                case Status.OBSERVATION_SIZE_ERROR:
+                    print('No environment with matching n_observations and n_actions.')
+                case Status.AGENT_ID_ERROR:
+                    print('No environment with free agents.')
+            # End program
+            exit()
+
+        ## Assignment success
+        print(f'Assigned to environment at {response.ip_addr}:{response.port}')
+        self._endpoint.close()
+        self.address = f'{response.ip_addr}:{response.port}'
+        self._endpoint = ICCEEndpoint(ip_addr=response.ip_addr, port=response.port)
+
+    def _post_sample(self):
+        """ Accumulates the reward of a newly sampled tick, and calls post_sample() once the action is no longer held.
+
+        The action is released after `action_repeat` ticks, or at the end of an episode.
+        """
+        self._repeat_reward += self.reward
+        if self.record_substeps and not self.evaluate:
+            self.post_substep(observation=self.observation, reward=self.reward)
+
+        if self.tick - self._acted_tick >= self.action_repeat or self.term or self.trunc or self.status == Status.DONE:
+            if not self.evaluate:
+                if self.metrics is not None:
+                    start = time.perf_counter()
+                with self._span('post_sample_hook'):
+                    self.post_sample(observation=self.observation, reward=self._repeat_reward)
+                if self.metrics is not None:
+                    self._post_sample_hook_seconds.observe(time.perf_counter() - start)
+            self._holding = False
+            self._repeat_reward = 0.0
+
+    def _record_step(self, delta: float, missed: bool):
+        """ Records the metrics of a control loop iteration.
+
+        Args:
+            delta : The duration of the iteration excluding sleep, in seconds.
+            missed : Whether the iteration exceeded the loop interval.
+        """
+        self._step_seconds.observe(delta)
+        if missed:
+            self._missed_deadlines.inc()
+        start_tick, start_time = self._episode_start
+        elapsed = time.perf_counter() - start_time
+        if elapsed > 0:
+            self._steps_per_second.set((self.tick - start_tick) / elapsed)
+        if self._learner is not None:
+            self._trajectory_queue_depth.set(self._learner.queue_depth)
+
+    def _span(self, name: str, trace_id: int | None = None, flow_start: str | None = None):
+        """ Creates a span, if tracing is enabled. """
+        return self.tracer.span(name, trace_id=trace_id, flow_start=flow_start) if self.tracer is not None else NULL_SPAN
+
+    def _trace_metadata(self):
+        """ The gRPC metadata propagating the trace ID of the step to the environment, if tracing is enabled. """
+        if self.tracer is None:
+            return None
+        return ((TRACE_METADATA_KEY, str(tracing.trace_id(self.id, self.tick))),)
+
+    def _connect(self, resume: bool = False) -> bool:
+        """ Handshakes with the environment, subscribes to its ticks if enabled, and pulls the initial data.
+
+        Args:
+            resume : Whether the ICCE is reconnecting to the agent it was previously mapped to.
+
+        Returns:
+            Whether the ICCE is connected. Always True if not resuming, as a failed handshake ends the program.
+        """
+        if not self._handshake_and_validate(resume=resume):
+            return False
+
+        # Subscribe to environment ticks
+        if self.subscribe:
+            self._subscription = self._endpoint.subscribe(id=self.id, session=self.session)
+
+        # Pull initial data
+        self._sample()
+        return True
+
+    def _reconnect(self):
+        """ Reconnects to the environment with exponential backoff, resuming the agent the ICCE was mapped to.
+
+        The in-memory state of the ICCE (model, buffers, etc.) is kept, while the state of the interrupted step is discarded.
+
+        Raises:
+            ConnectionError: If the environment could not be reconnected to within `reconnect_timeout_seconds`.
+        """
+        print('Connection to environment lost, reconnecting...')
+        if self._subscription is not None:
+            self._subscription.cancel()
+            self._subscription = None
+        self._evicted.clear()
+
+        backoff = 0.1
+        deadline = time.monotonic() + self.reconnect_timeout_seconds
+        while True:
+            try:
+                if self._connect(resume=True):
+                    break
+            except grpc.RpcError as error:
+                if error.code() not in _RECONNECT_CODES:
+                    raise
+            if time.monotonic() >= deadline:
+                raise ConnectionError(f'Failed to reconnect to environment within {self.reconnect_timeout_seconds} seconds!')
+            time.sleep(backoff)
+            backoff = min(2 * backoff, 5.0)
+
+        # Discard the interrupted step
+        self._acted_tick = None
+        self._holding = False
+        self._repeat_reward = 0.0
+        print('Reconnected. ICCE ID : ', self.id)
+
+    def _heartbeat(self):
+        """ Periodically signals the environment that the ICCE is alive, on a background thread, until closed.
+
+        Flags the ICCE to reconnect if the environment no longer maps its session. Unavailable environments are left to
+        the control loop to reconnect to.
+        """
+        while not self._closed.wait(self.heartbeat_seconds):
+            # The session is read before the ID, which is updated first, so a heartbeat racing a handshake is discarded
+            session = self.session
+            try:
+                response = self._endpoint.heartbeat(id=self.id, session=session, timeout=self.heartbeat_seconds)
+                if Status(response.status) == Status.ICCE_ID_ERROR and session == self.session:
+                    self._evicted.set()
+            except (grpc.RpcError, ValueError):
+                # Environment unavailable, or the channel was closed by a reconnect or close()
+                pass
+
+    def _sync_weights(self):
+        """ Loads the weights pulled from the learner, if any. """
+        weights = self._learner.poll_weights()
+        if weights is None:
+            return
+        self.weights_version, weights = weights
+        self.load_weights(weights)
+
+    def _handshake_and_validate(self, resume: bool = False) -> bool:
         print("Handshake and validate\n----------")
         print(f"{self.n_observations}  {self.n_actions}")
 
-        # Invoke RPC
-        response = self._endpoint.handshake_and_validate(self.n_observations, self.n_actions, self.agent_hint)
+        deadline = time.monotonic() + self.reconnect_timeout_seconds
+        while True:
+            # Get assigned to the least-loaded environment
+            if self._registry is not None and not resume:
+                self._assign(deadline)
+
+            # Invoke RPC
+            response = self._endpoint.handshake_and_validate(
+                n_observations=self.n_observations,
+                n_actions=self.n_actions,
+                agent_hint=self.agent_id if resume else self.agent_hint,
+                observation_dtype=self.observation_dtype,
+                action_dtype=self.action_dtype,
+                observation_shape=self.observation_shape or (),
+                action_shape=self.action_shape or (),
+                observation_codec=self.observation_codec,
+                resume=resume,
+                timeout=self.reconnect_timeout_seconds if resume else None
+            )
+
+            # Assigned agent was taken by another ICCE, ask the registry for another environment
+            if self._registry is None or resume or response.status != Status.AGENT_ID_ERROR or time.monotonic() >= deadline:
+                break
+            print('Assigned environment has no free agents, reassigning...')
 
         ## Handshake failed
         if Status(response.status) != Status.SUCCESS:
@@ -133,37 +586,144 @@ class ICCEInterface:
                     print('Failed to generate ICCE ID. Maximum Agents mapped or invalid Simulation Agent ID hinted.')
                 case Status.AGENT_ID_ERROR:
                     print('Failed to map Agent ID. Maximum Agents mapped.')
+                case Status.DTYPE_ERROR:
+                    print('observation_dtype or action_dtype is not supported.')
+                case Status.WAIT:
+                    print('Environment not ready.')
+            # Retry if reconnecting, e.g. the agent is mapped to another ICCE until the environment times it out
+            if resume:
+                return False
             # End program
             exit()
         
         ## Handshake success
         self.id = response.id
+        self.session = response.session
+        self.agent_id = response.agent_id
+        self.observation_dtype = DType(response.observation_dtype)
+        self.action_dtype = DType(response.action_dtype)
+        self.observation_shape = tuple(response.observation_shape)
+        self.action_shape = tuple(response.action_shape)
+        self.observation_codec = response.observation_codec
+        self._codec = codecs.create_codec(self.observation_codec)
+        self._chunked = response.chunked
+        self.info_dtype = encoding.schema_to_dtype(response.info_schema) if response.info_schema else None
+
+        # Preallocate the buffers observations and info are decoded into, and actions encoded from, every tick
+        self.observation = np.zeros(shape=self.observation_shape, dtype=encoding.numpy_dtype(self.observation_dtype))
+        self._action_encoder = encoding.Encoder(self.action_dtype, self.action_shape)
+        if self.info_dtype is not None:
+            info = np.zeros(shape=1, dtype=self.info_dtype)
+            self.info = info[0]
+            self._info = info.view(np.uint8)
+        self._decoded_tick = None
+        if self.tracer is not None:
+            self.tracer.process_name = f'icce {self.id}'
         print('Handshake successful. ICCE ID : ', self.id)
+        return True
 
     def _sample(self):
-        # Invoke RPC
-        response = self._endpoint.sample(id=self.id)
-
-        # Cache into memory
-        self.observation = np.frombuffer(
-            buffer=response.observation,
-            dtype=np.float64
-        )
+        # Invoke RPC, or wait for the next tick pushed by the environment. The environment encodes the observation against
+        # the last decoded observation
+        base_tick = self._decoded_tick or 0
+        if self._subscription is not None or self._chunked:
+            # Timed until the last chunk is received. Subscriptions include the wait for the next tick
+            if self.metrics is not None:
+                start = time.perf_counter()
+            if self._subscription is not None:
+                rpc = 'subscribe'
+                self._subscription.request(base_tick=base_tick)
+                responses = self._subscription
+            else:
+                rpc = 'sample_stream'
+                responses = self._endpoint.sample_stream(id=self.id, base_tick=base_tick, session=self.session)
+            response = next(responses)
+
+            # Reassemble observation streamed in chunks
+            chunk, chunks = response, [response.observation]
+            while chunk.partial:
+                chunk = next(responses)
+                chunks.append(chunk.observation)
+            observation = b''.join(chunks)
+            if self.metrics is not None:
+                self._rpc_seconds[rpc].observe(time.perf_counter() - start)
+        else:
+            if self.metrics is not None:
+                start = time.perf_counter()
+            with self._span('rpc.sample', flow_start='sample'):
+                response = self._endpoint.sample(id=self.id, base_tick=base_tick, session=self.session, metadata=self._trace_metadata())
+            if self.metrics is not None:
+                self._rpc_seconds['sample'].observe(time.perf_counter() - start)
+            observation = response.observation
+
+        # Unmapped by the environment
+        if response.status == Status.ICCE_ID_ERROR:
+            self.status = Status.ICCE_ID_ERROR
+            return
+
+        # Cache into memory - Decoded in place into the preallocated buffers. Samples of an already decoded tick carry no
+        # observation, or one stateful codecs must not decode twice
+        if response.tick != self._decoded_tick:
+            # Encoded against an observation which was not decoded, e.g. by another connection: request a keyframe
+            if response.base_tick and response.base_tick != self._decoded_tick:
+                self._resync()
+                return
+            encoding.decode(
+                buffer=self._codec.decode(observation),
+                dtype=self.observation_dtype,
+                scale=response.observation_scale,
+                out=self.observation
+            )
+            if self._info is not None:
+                np.copyto(self._info, np.frombuffer(buffer=response.info, dtype=np.uint8))
+            self._decoded_tick = response.tick
         self.reward = response.reward
         self.term = response.terminated
         self.trunc = response.truncated
         self.episode = response.episode
+        self.episode_return = response.episode_return
+        self.tick = response.tick
         # If post_episode() executed (moved to WAIT), do not set status back to DONE
-        status = Status(response.status)
+        status = _STATUSES[response.status]
         if status == Status.DONE and self.status == Status.WAIT:
             return
         self.status = status
 
-    def _act(self):
+    def _resync(self):
+        """ Discards the decoded observation, and samples an observation encoded independently of it. """
+        self._decoded_tick = None
+        self._sample()
+
+    def _act(self) -> bool:
+        """ Infers and sends the action of the sampled observation.
+
+        Returns:
+            Whether the environment applied the action. Actions rejected as stale are counted in `stale_actions`.
+        """
         # Call user-defined act() which sets self.action
-        action = self.act(self.observation)
+        if self.metrics is not None:
+            start = time.perf_counter()
+        with self._span('act_hook'):
+            action = self.act(self.observation)
+        if self.metrics is not None:
+            self._act_hook_seconds.observe(time.perf_counter() - start)
+
+        # Encode in negotiated dtype and invoke RPC
+        action_bytes, action_scale = self._action_encoder(np.asarray(action))
+        if self.metrics is not None:
+            start = time.perf_counter()
+        with self._span('rpc.act', flow_start='act'):
+            response = self._endpoint.act(id=self.id, action=action_bytes, action_scale=action_scale, tick=self.tick, session=self.session,
+                                          metadata=self._trace_metadata())
+        if self.metrics is not None:
+            self._rpc_seconds['act'].observe(time.perf_counter() - start)
+        self._acted_tick = self.tick
 
-        # Invoke RPC
-        _ = self._endpoint.act(id=self.id, action=action.tobytes())
+        # Stale actions are dropped, and the ICCE acts on the next sampled tick instead
+        if response.status == Status.STALE_ACTION_ERROR:
+            self.stale_actions += 1
+            if self.metrics is not None:
+                self._stale_actions.inc()
+        return response.status == Status.SUCCESS
 
 
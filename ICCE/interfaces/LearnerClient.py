@@ -0,0 +1,131 @@
+import grpc
+from ..grpc_interfaces import Learner_pb2, Learner_pb2_grpc
+from .LearnerEndpoint import MESSAGE_OPTIONS, pack_tensors, unpack_tensors
+
+import numpy as np
+import queue
+import threading
+
+class LearnerClient():
+    """ Client of a `LearnerInterface`, used by ICCEs acting as actors.
+
+    Trajectories are pushed, and new weights are pulled, on a background thread so that the control loop of the ICCE is
+    never stalled by the learner. Pulled weights are held until the ICCE retrieves them using `poll_weights()`.
+
+    While the learner is unavailable, the trajectory being pushed is retried every `weights_poll_seconds`. Any other RPC
+    error stops the background thread, and is raised by the next `push_trajectory()` or `poll_weights()`.
+
+    Args:
+        ip_addr : The IP address of the learner.
+        port : The port of the learner.
+        weights_poll_seconds : Interval at which new weights are polled while no trajectories are pushed.
+        max_queued_trajectories : Trajectories pushed while this many are awaiting sending are dropped.
+    """
+    def __init__(self, ip_addr = 'localhost', port = 50053, weights_poll_seconds = 1.0, max_queued_trajectories = 64):
+        self._channel = grpc.insecure_channel(ip_addr+':'+str(port), options=MESSAGE_OPTIONS)
+        self._stub = Learner_pb2_grpc.LearnerStub(self._channel)
+        self.weights_poll_seconds = weights_poll_seconds
+
+        # Statistics
+        self.n_dropped_trajectories = 0
+
+        # Trajectories awaiting sending
+        self._trajectories = queue.Queue(maxsize=max_queued_trajectories)
+
+        # Latest pulled weights, until retrieved by poll_weights()
+        self._pulled_version = 0
+        self._weights = None
+        self._weights_lock = threading.Lock()
+
+        self._error = None
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def queue_depth(self) -> int:
+        """ The number of trajectories awaiting sending. """
+        return self._trajectories.qsize()
+
+    def push_trajectory(self, actor_id: int, weights_version: int, trajectory: dict[str, np.ndarray]):
+        """ Queues a trajectory to be pushed to the learner. Non-blocking.
+
+        Args:
+            actor_id : The ID of the actor, usually the ICCE ID.
+            weights_version : The version of the weights the trajectory was collected with.
+            trajectory : The trajectory, as named arrays.
+
+        Raises:
+            grpc.RpcError: The error which stopped the background thread, other than the learner being unavailable.
+        """
+        self._raise()
+        try:
+            self._trajectories.put_nowait((actor_id, weights_version, trajectory))
+        except queue.Full:
+            self.n_dropped_trajectories += 1
+
+    def poll_weights(self) -> tuple[int, dict[str, np.ndarray]] | None:
+        """ Retrieves the weights pulled since the last call. Non-blocking.
+
+        Returns:
+            The weights version and weights, or None if no new weights have been pulled.
+
+        Raises:
+            grpc.RpcError: The error which stopped the background thread, other than the learner being unavailable.
+        """
+        with self._weights_lock:
+            weights, self._weights = self._weights, None
+        if weights is None:
+            self._raise()
+        return weights
+
+    def close(self):
+        """ Stops the background thread, dropping the trajectories awaiting sending, and closes the channel. """
+        self._closed.set()
+        self._thread.join()
+        self._channel.close()
+
+
+    ########## HELPERS ##########
+    def _run(self):
+        """ Background loop which pushes queued trajectories and pulls new weights, until closed. """
+        trajectory = None
+        while not self._closed.is_set():
+            # The trajectory of a failed push is retried before the next queued one
+            if trajectory is None:
+                try:
+                    actor_id, weights_version, trajectory = self._trajectories.get(timeout=self.weights_poll_seconds)
+                except queue.Empty:
+                    pass
+
+            try:
+                # Push trajectory, the response indicates if newer weights are available
+                if trajectory is not None:
+                    response = self._stub.push_trajectory(Learner_pb2.Trajectory(
+                        actor_id=actor_id,
+                        weights_version=weights_version,
+                        tensors=pack_tensors(trajectory)
+                    ))
+                    trajectory = None
+                    if response.weights_version <= self._pulled_version:
+                        continue
+
+                # Pull newer weights
+                response = self._stub.pull_weights(Learner_pb2.WeightsRequest(version=self._pulled_version))
+                if response.version > self._pulled_version:
+                    weights = unpack_tensors(response.tensors)
+                    with self._weights_lock:
+                        self._weights = (response.version, weights)
+                    self._pulled_version = response.version
+            except grpc.RpcError as error:
+                # Learner unavailable, e.g. restarting: retry after the poll interval. Other errors, e.g. of messages
+                # exceeding the size limits, are not fixed by retrying
+                if error.code() != grpc.StatusCode.UNAVAILABLE:
+                    self._error = error
+                    return
+                self._closed.wait(timeout=self.weights_poll_seconds)
+
+    def _raise(self):
+        """ Raises the error which stopped the background thread, if any. """
+        if self._error is not None:
+            raise self._error
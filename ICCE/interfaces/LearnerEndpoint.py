@@ -0,0 +1,116 @@
+import grpc
+from ..grpc_interfaces import Learner_pb2, Learner_pb2_grpc
+
+import numpy as np
+import threading
+from concurrent import futures
+
+# Weights and trajectories are not bounded by gRPC's default 4 MB message size, e.g. the weights of models of over 1M parameters
+MESSAGE_OPTIONS = [
+    ('grpc.max_receive_message_length', -1),
+    ('grpc.max_send_message_length', -1)
+]
+
+def pack_tensors(tensors: dict[str, np.ndarray]) -> list:
+    """ Packs named arrays into `Tensor` messages.
+
+    Args:
+        tensors : The arrays to pack, keyed by name.
+
+    Returns:
+        A list of `Tensor` messages.
+    """
+    packed = []
+    for name, array in tensors.items():
+        array = np.ascontiguousarray(array)
+        packed.append(Learner_pb2.Tensor(name=name, dtype=array.dtype.str, shape=array.shape, data=array.tobytes()))
+    return packed
+
+def unpack_tensors(tensors) -> dict[str, np.ndarray]:
+    """ Unpacks `Tensor` messages into named arrays.
+
+    Args:
+        tensors : The `Tensor` messages to unpack.
+
+    Returns:
+        The unpacked arrays, keyed by name.
+    """
+    return {tensor.name: np.frombuffer(buffer=tensor.data, dtype=np.dtype(tensor.dtype)).reshape(tuple(tensor.shape)) for tensor in tensors}
+
+
+class LearnerServicer(Learner_pb2_grpc.LearnerServicer):
+    def __init__(self, trajectory_cb, weights_cb):
+        super().__init__()
+        # Store callbacks
+        self._trajectory_cb = trajectory_cb
+        self._weights_cb = weights_cb
+
+        # Serialized weights are cached per version, as every actor pulls the same weights
+        self._weights = Learner_pb2.Weights(version=0)
+        self._weights_lock = threading.Lock()
+
+    def push_trajectory(self, request, context):
+        """ Servicer implementation of push_trajectory.
+
+        Invokes the callback function `_on_push_trajectory()` defined in the `LearnerInterface` class, which queues the
+        trajectory for learning.
+
+        Args:
+            request : The incoming gRPC request message, `Trajectory` containing the tensors of an actor's trajectory.
+
+        Returns:
+            The gRPC response message `TrajectoryResponse` containing the status and the latest weights version.
+        """
+        status, version = self._trajectory_cb(
+            actor_id=request.actor_id,
+            weights_version=request.weights_version,
+            trajectory=unpack_tensors(request.tensors)
+        )
+        return Learner_pb2.TrajectoryResponse(status=int(status), weights_version=version)
+
+    def pull_weights(self, request, context):
+        """ Servicer implementation of pull_weights.
+
+        Returns the latest weights if they are newer than the version held by the actor, otherwise only the latest version.
+
+        Args:
+            request : The incoming gRPC request message, `WeightsRequest` containing the weights version held by the actor.
+
+        Returns:
+            The gRPC response message `Weights` containing the latest weights.
+        """
+        with self._weights_lock:
+            version, weights = self._weights_cb()
+            if version != self._weights.version:
+                self._weights = Learner_pb2.Weights(version=version, tensors=pack_tensors(weights))
+
+        if request.version >= self._weights.version:
+            return Learner_pb2.Weights(version=self._weights.version)
+        return self._weights
+
+
+class LearnerEndpoint():
+    def __init__(self, trajectory_cb, weights_cb, ip_addr='localhost', port=50053, max_workers=10):
+        # gRPC server
+        self._server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers), options=MESSAGE_OPTIONS)
+        self._server_thread = threading.Thread(target=self.start_server)
+
+        # Learner servicer
+        self._servicer = LearnerServicer(trajectory_cb=trajectory_cb, weights_cb=weights_cb)
+
+        Learner_pb2_grpc.add_LearnerServicer_to_server(self._servicer, self._server)
+        self._server.add_insecure_port(ip_addr+':'+str(port))
+
+    def start(self):
+        """ Starts the Learner communication layer on a separate thread. """
+        self._server_thread.start()
+
+    def shutdown(self):
+        """ Shutsdown the gRPC server and rejoin the communication layer thread. """
+        self._server.stop(grace=None)
+        self._server_thread.join()
+
+    def start_server(self):
+        """ Starts the gRPC server and blocks the calling thread until server shutsdown. """
+        self._server.start()
+        self._server.wait_for_termination()
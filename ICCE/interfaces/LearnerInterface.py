@@ -0,0 +1,151 @@
+from .LearnerEndpoint import LearnerEndpoint
+from ..utils import Status
+
+import numpy as np
+import queue
+import threading
+
+class LearnerInterface:
+    def __init__(self, batch_size=1, max_queued_trajectories=1024, ip_addr='localhost', port=50053, max_workers=10):
+        # Learner settings
+        self.batch_size = batch_size # Number of trajectories per call to learn()
+
+        # Versioned weights broadcasted to actors
+        self.weights_version = 0
+        self._weights = {}
+        self._weights_lock = threading.Lock()
+
+        # Statistics
+        self.n_trajectories = 0
+        self.n_dropped_trajectories = 0
+        self.policy_lag = 0 # Weights versions between the weights used to collect, and learn from, the latest trajectory
+
+        # Trajectories awaiting learning
+        self._trajectories = queue.Queue(maxsize=max_queued_trajectories)
+        self._shutdown = threading.Event()
+
+        # Communication layer endpoint
+        self._endpoint = LearnerEndpoint(
+            trajectory_cb=self._on_push_trajectory,
+            weights_cb=self._on_pull_weights,
+            ip_addr=ip_addr,
+            port=port,
+            max_workers=max_workers
+        )
+
+    ########## KEY FUNCTIONALITIES ##########
+    def run(self):
+        """ Runs the learner.
+
+        The flow of the learner is
+
+        Publishes the initial weights using the user-defined interface get_weights()\n
+        {Ad-hoc} Actors (ICCEs) push trajectories, which are queued for learning\n
+        {Ad-hoc} Actors pull the latest weights in the background\n
+        Loop until shutdown() is called:\n
+            Collects batch_size trajectories\n
+            Calls learn() user-defined interface on the batch of trajectories\n
+            Publishes the updated weights as a new version\n
+        Shutdown the learner
+
+        Raises:
+            NotImplementedError: If the user-defined interfaces learn() and/or get_weights() are not implemented by the user.
+        """
+        # Publish initial weights and start gRPC server
+        self.publish_weights()
+        self._endpoint.start()
+
+        batch = []
+        try:
+            while not self._shutdown.is_set():
+                try:
+                    batch.append(self._trajectories.get(timeout=0.1))
+                except queue.Empty:
+                    continue
+                if len(batch) < self.batch_size:
+                    continue
+
+                # Learn and broadcast new weights
+                self.learn(batch)
+                self.publish_weights()
+                batch = []
+        finally:
+            self._endpoint.shutdown()
+
+    def shutdown(self):
+        """ Stops the learner after the batch being learned. """
+        self._shutdown.set()
+
+    def publish_weights(self):
+        """ Publishes the weights returned by the user-defined interface get_weights() as a new version.
+
+        Weights are copied, so that the learner can keep updating its model while actors pull the published version.
+
+        Raises:
+            NotImplementedError: If the user-defined interface get_weights() is not implemented by the user.
+        """
+        weights = {name: np.array(array, copy=True) for name, array in self.get_weights().items()}
+        with self._weights_lock:
+            self._weights = weights
+            self.weights_version += 1
+
+
+    ########## USER-DEFINED INTERFACES ##########
+    def learn(self, trajectories: list[dict[str, np.ndarray]]):
+        """ Interface to learn from a batch of trajectories.
+
+        {MUST BE DEFINED} This is an interface function which optimizes the model using trajectories collected by actors.
+
+        Args:
+            trajectories : The trajectories, each a dict of named arrays as pushed by an actor.
+
+        Raises:
+            NotImplementedError: If this function is not implemented by the interfacing learner.
+        """
+        raise NotImplementedError('Functionality to learn from trajectories must be defined!')
+
+    def get_weights(self) -> dict[str, np.ndarray]:
+        """ Interface to retrieve the weights of the model.
+
+        {MUST BE DEFINED} This is an interface function which returns the weights to broadcast to actors, e.g.
+        `{name: tensor.numpy() for name, tensor in model.state_dict().items()}`.
+
+        Returns:
+            The weights of the model, keyed by name.
+
+        Raises:
+            NotImplementedError: If this function is not implemented by the interfacing learner.
+        """
+        raise NotImplementedError('Functionality to retrieve weights must be defined!')
+
+
+    ########## CORE CALLBACKS ##########
+    def _on_push_trajectory(self, actor_id: int, weights_version: int, trajectory: dict[str, np.ndarray]) -> tuple[Status, int]:
+        """ Queues a trajectory pushed by an actor for learning.
+
+        Trajectories are dropped if the queue is full, so that actors are never stalled by a slow learner.
+
+        Args:
+            actor_id : The ID of the actor.
+            weights_version : The version of the weights the trajectory was collected with.
+            trajectory : The trajectory, as named arrays.
+
+        Returns:
+            The status and the latest weights version.
+        """
+        try:
+            self._trajectories.put_nowait(trajectory)
+            self.n_trajectories += 1
+            self.policy_lag = self.weights_version - weights_version
+        except queue.Full:
+            self.n_dropped_trajectories += 1
+        return Status.SUCCESS, self.weights_version
+
+    def _on_pull_weights(self) -> tuple[int, dict[str, np.ndarray]]:
+        """ Retrieves the latest published weights.
+
+        Returns:
+            The latest weights version and weights.
+        """
+        with self._weights_lock:
+            return self.weights_version, self._weights
@@ -0,0 +1,34 @@
+import grpc
+from ..grpc_interfaces import Policy_pb2, Policy_pb2_grpc
+from ..utils import Status
+
+import numpy as np
+
+class PolicyClient():
+    """ Client of a `PolicyServerInterface`, used by ICCEs which share a centrally hosted policy.
+
+    Calling `act()` from an ICCE's user-defined `act()` sends the observation to the policy server, which infers it as
+    part of a batch with the observations of other ICCEs.
+    """
+    def __init__(self, ip_addr = 'localhost', port = 50052):
+        self._channel = grpc.insecure_channel(ip_addr+':'+str(port))
+        self._stub = Policy_pb2_grpc.PolicyStub(self._channel)
+
+    def act(self, observation: np.ndarray) -> np.ndarray:
+        """ Requests the action of an observation from the policy server.
+
+        Args:
+            observation : The observation to infer.
+
+        Returns:
+            The inferred action, as float32.
+
+        Raises:
+            RuntimeError: If the policy server failed to infer the action.
+        """
+        request = Policy_pb2.PolicyRequest(observation=np.asarray(observation, dtype=np.float32).tobytes())
+        response = self._stub.act(request)
+
+        if Status(response.status) != Status.SUCCESS:
+            raise RuntimeError(f'Policy server failed to infer action: {Status(response.status).name}')
+        return np.frombuffer(buffer=response.action, dtype=np.float32)
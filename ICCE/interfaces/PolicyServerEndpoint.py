@@ -0,0 +1,54 @@
+import grpc
+from ..grpc_interfaces import Policy_pb2, Policy_pb2_grpc
+
+import threading
+from concurrent import futures
+
+class PolicyServicer(Policy_pb2_grpc.PolicyServicer):
+    def __init__(self, act_cb):
+        super().__init__()
+        # Store callbacks
+        self._act_cb = act_cb
+
+    def act(self, request, context):
+        """ Servicer implementation of act.
+
+        Invokes the callback function `_on_act()` defined in the `PolicyServerInterface` class, which blocks until the
+        observation has been inferred as part of a batch.
+
+        Args:
+            request : The incoming gRPC request message, `PolicyRequest` containing the observation of an ICCE.
+
+        Returns:
+            The gRPC response message `PolicyResponse` containing the inferred action and status.
+        """
+        action, status = self._act_cb(observation_bytes=request.observation)
+        response = Policy_pb2.PolicyResponse(action=action, status=int(status))
+        return response
+
+
+class PolicyServerEndpoint():
+    def __init__(self, act_cb, ip_addr='localhost', port=50052, max_workers=64):
+        # gRPC server - Each in-flight request occupies a worker until its batch is inferred
+        self._server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+        self._server_thread = threading.Thread(target=self.start_server)
+
+        # Policy servicer
+        self._servicer = PolicyServicer(act_cb=act_cb)
+
+        Policy_pb2_grpc.add_PolicyServicer_to_server(self._servicer, self._server)
+        self._server.add_insecure_port(ip_addr+':'+str(port))
+
+    def start(self):
+        """ Starts the Policy server communication layer on a separate thread. """
+        self._server_thread.start()
+
+    def shutdown(self, grace: float | None = None):
+        """ Shutsdown the gRPC server, after in-flight requests complete or grace seconds, and rejoin the communication layer thread. """
+        self._server.stop(grace=grace)
+        self._server_thread.join()
+
+    def start_server(self):
+        """ Starts the gRPC server and blocks the calling thread until server shutsdown. """
+        self._server.start()
+        self._server.wait_for_termination()
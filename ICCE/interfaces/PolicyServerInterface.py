@@ -0,0 +1,181 @@
+from .PolicyServerEndpoint import PolicyServerEndpoint
+from ..utils import Status
+
+import numpy as np
+import queue
+import threading
+import time
+
+class _PendingAct:
+    """ An observation awaiting inference, and the slot its action is written to. """
+    __slots__ = ('observation', 'action', 'status', 'done')
+
+    def __init__(self, observation: bytes):
+        self.observation = observation
+        self.action = b''
+        self.status = Status.INFERENCE_ERROR
+        self.done = threading.Event()
+
+
+class PolicyServerInterface:
+    def __init__(self, max_batch_size=64, batch_window_seconds=0.002, ip_addr='localhost', port=50052, max_workers=64):
+        # Policy attributes
+        self.n_observation: int # n_observation of an agent
+        self.n_action: int # n_action of an agent
+
+        # Batching settings
+        self.max_batch_size = max_batch_size
+        self.batch_window_seconds = batch_window_seconds
+
+        # Statistics
+        self.n_batches = 0
+        self.n_requests = 0
+        self.n_failed = 0 # Requests of batches whose inference raised
+
+        # Observations awaiting inference. Observations are queued under the lock, so that none is queued once pending
+        # observations are released at shutdown
+        self._pending = queue.SimpleQueue()
+        self._pending_lock = threading.Lock()
+        self._observations: np.ndarray
+        self._shutdown = threading.Event()
+
+        # Communication layer endpoint
+        self._endpoint = PolicyServerEndpoint(act_cb=self._on_act, ip_addr=ip_addr, port=port, max_workers=max_workers)
+
+    ########## KEY FUNCTIONALITIES ##########
+    def run(self):
+        """ Runs the policy server.
+
+        The flow of the policy server is
+
+        {Ad-hoc} ICCE clients request actions for their observations, blocking until inferred\n
+        Loop until shutdown() is called:\n
+            Collects pending observations for up to batch_window_seconds or max_batch_size observations\n
+            Calls infer() user-defined interface once on the batch of observations\n
+            Returns each inferred action to its ICCE client, or status INFERENCE_ERROR if infer() raised\n
+        Releases the ICCE clients of observations still pending with status SHUTDOWN, and shutdown the policy server
+
+        Raises:
+            NotImplementedError: If the user-defined interface infer() is not implemented by the user.
+        """
+        # Preallocate batch buffer
+        self._observations = np.zeros(shape=(self.max_batch_size, self.n_observation), dtype=np.float32)
+
+        # Start gRPC server
+        self._endpoint.start()
+
+        try:
+            while not self._shutdown.is_set():
+                self._infer_batch()
+        finally:
+            self._shutdown.set()
+            self._release_pending()
+            # Released requests are responded to before the server stops
+            self._endpoint.shutdown(grace=1.0)
+
+    def shutdown(self):
+        """ Stops the policy server after the batch being inferred. Observations still pending are not inferred. """
+        self._shutdown.set()
+
+    def _release_pending(self):
+        """ Releases the ICCE clients of every pending observation with status SHUTDOWN. """
+        with self._pending_lock:
+            while True:
+                try:
+                    pending = self._pending.get_nowait()
+                except queue.Empty:
+                    return
+                pending.status = Status.SHUTDOWN
+                pending.done.set()
+
+    def _infer_batch(self):
+        """ Collects pending observations into a batch and infers their actions.
+
+        Blocks until at least one observation is pending, then keeps collecting observations until the batching window
+        elapses or the batch is full. A single call to the user-defined interface infer() is made for the whole batch. If
+        it raises, the requests of the batch are completed with status INFERENCE_ERROR and the next batch is served.
+
+        Raises:
+            NotImplementedError: If the user-defined interface infer() is not implemented by the user.
+        """
+        try:
+            batch = [self._pending.get(timeout=0.1)]
+        except queue.Empty:
+            return
+
+        # Collect within batching window
+        deadline = time.perf_counter() + self.batch_window_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        try:
+            # Batched inference
+            observations = self._observations[:len(batch)]
+            for i, pending in enumerate(batch):
+                observations[i] = np.frombuffer(buffer=pending.observation, dtype=np.float32)
+            actions = np.asarray(self.infer(observations), dtype=np.float32)
+
+            for i, pending in enumerate(batch):
+                pending.action = actions[i].tobytes()
+                pending.status = Status.SUCCESS
+        except NotImplementedError:
+            raise
+        except Exception as e:
+            # Requests keep their status INFERENCE_ERROR
+            print(f'Inference of a batch of {len(batch)} failed: {e}')
+            self.n_failed += len(batch)
+        finally:
+            # Release waiting ICCEs, even if inference failed
+            for pending in batch:
+                pending.done.set()
+
+        self.n_batches += 1
+        self.n_requests += len(batch)
+
+
+    ########## USER-DEFINED INTERFACES ##########
+    def infer(self, observations: np.ndarray) -> np.ndarray:
+        """ Interface to infer the actions of a batch of observations.
+
+        {MUST BE DEFINED} This is an interface function which runs a single batched forward pass of the policy.
+
+        Args:
+            observations : The observations of shape (batch_size, n_observation), as float32.
+
+        Returns:
+            The actions of shape (batch_size, n_action).
+
+        Raises:
+            NotImplementedError: If this function is not implemented by the interfacing policy server.
+        """
+        raise NotImplementedError('Functionality to infer a batch of actions must be defined!')
+
+
+    ########## CORE CALLBACKS ##########
+    def _on_act(self, observation_bytes: bytes) -> tuple[bytes, Status]:
+        """ Queues an observation for batched inference and blocks until its action is inferred.
+
+        This function is called by the gRPC endpoint when an ICCE client requests an action.
+
+        Args:
+            observation_bytes : The observation of the ICCE, in float32 bytes.
+
+        Returns:
+            The action (in float32 bytes) and the inference status, SHUTDOWN if the policy server is shutting down.
+        """
+        if len(observation_bytes) != self.n_observation * np.dtype(np.float32).itemsize:
+            return b'', Status.OBSERVATION_SIZE_ERROR
+
+        pending = _PendingAct(observation_bytes)
+        with self._pending_lock:
+            if self._shutdown.is_set():
+                return b'', Status.SHUTDOWN
+            self._pending.put(pending)
+        pending.done.wait()
+        return pending.action, pending.status
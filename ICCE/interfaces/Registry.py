@@ -0,0 +1,135 @@
+from .RegistryEndpoint import RegistryEndpoint
+from ..utils import Status
+
+import collections
+import threading
+import time
+
+class _Server:
+    """ Agent slots advertised by an Environment server, and the slots reserved for ICCEs assigned to it. """
+    __slots__ = ('ip_addr', 'port', 'free_slots', 'total_slots', 'n_observations', 'n_actions', 'n_mapped', 'last_seen', 'reservations')
+
+    def __init__(self, ip_addr, port, free_slots, total_slots, n_observations, n_actions, n_mapped):
+        self.ip_addr = ip_addr
+        self.port = port
+        self.free_slots = free_slots
+        self.total_slots = total_slots
+        self.n_observations = n_observations
+        self.n_actions = n_actions
+        self.n_mapped = n_mapped
+        self.last_seen = time.monotonic()
+        self.reservations = collections.deque() # Expiry time of each reserved slot, oldest first
+
+    @property
+    def unreserved_slots(self) -> int:
+        return self.free_slots - len(self.reservations)
+
+
+class Registry:
+    """ Routes ICCEs across many Environment servers.
+
+    Environment servers, possibly on different nodes, periodically advertise their free agent slots to the registry.
+    ICCEs ask the registry for an Environment at handshake time and are assigned to the least-loaded server with matching
+    observation/action sizes. The assigned slot is reserved until the server advertises that an ICCE claimed it, or until
+    the reservation expires, e.g. as the ICCE died before its handshake.
+
+    Args:
+        ip_addr : The IP address the registry listens on.
+        port : The port the registry listens on.
+        timeout_seconds : Servers which have not advertised for this long are no longer assigned.
+        reservation_seconds : Reserved slots which have not been claimed for this long are free to be assigned again.
+    """
+    def __init__(self, ip_addr='localhost', port=50050, timeout_seconds=5.0, reservation_seconds=10.0):
+        self.timeout_seconds = timeout_seconds
+        self.reservation_seconds = reservation_seconds
+
+        # Advertised servers: {(ip_addr, port): _Server}
+        self._servers = {}
+        self._lock = threading.Lock()
+        self._shutdown = threading.Event()
+
+        # Communication layer endpoint
+        self._endpoint = RegistryEndpoint(advertise_cb=self._on_advertise, assign_cb=self._on_assign, ip_addr=ip_addr, port=port)
+
+    @property
+    def servers(self) -> list[tuple[str, int, int, int]]:
+        """ The advertised servers as (ip_addr, port, free_slots, total_slots), excluding reserved slots from the free slots. """
+        with self._lock:
+            return [(server.ip_addr, server.port, server.unreserved_slots, server.total_slots) for server in self._servers.values()]
+
+    def run(self):
+        """ Runs the registry, blocking until shutdown() is called. """
+        self._endpoint.start()
+        try:
+            self._shutdown.wait()
+        finally:
+            self._endpoint.shutdown()
+
+    def shutdown(self):
+        """ Stops the registry. """
+        self._shutdown.set()
+
+
+    ########## CORE CALLBACKS ##########
+    def _on_advertise(self, ip_addr: str, port: int, free_slots: int, total_slots: int, n_observations: int, n_actions: int,
+                      n_mapped: int = 0) -> Status:
+        """ Records the free agent slots of an Environment server.
+
+        The ICCEs mapped by the server since its previous advertisement claim the oldest reservations of the server.
+
+        Args:
+            ip_addr : The IP address of the Environment server.
+            port : The port of the Environment server.
+            free_slots : The number of registered agents which are not mapped to an ICCE.
+            total_slots : The number of registered agents.
+            n_observations : The observation size of the Environment.
+            n_actions : The action size of the Environment.
+            n_mapped : The number of ICCEs mapped by the Environment since it started.
+
+        Returns:
+            The status of the advertisement.
+        """
+        with self._lock:
+            previous = self._servers.get((ip_addr, port))
+            server = _Server(ip_addr, port, free_slots, total_slots, n_observations, n_actions, n_mapped)
+            # Reservations are carried over, unless the server restarted
+            if previous is not None and n_mapped >= previous.n_mapped:
+                server.reservations = previous.reservations
+                for _ in range(min(n_mapped - previous.n_mapped, len(server.reservations))):
+                    server.reservations.popleft()
+            self._servers[(ip_addr, port)] = server
+        return Status.SUCCESS
+
+    def _on_assign(self, n_observations: int, n_actions: int) -> tuple[Status, str, int]:
+        """ Assigns an ICCE to the least-loaded Environment server.
+
+        Args:
+            n_observations : The observation size of the ICCE.
+            n_actions : The action size of the ICCE.
+
+        Returns:
+            The status of the assignment, and the IP address and port of the assigned Environment server.
+        """
+        now = time.monotonic()
+        with self._lock:
+            # Live servers with matching I/O
+            candidates = [server for server in self._servers.values()
+                          if now - server.last_seen <= self.timeout_seconds
+                          and server.n_observations == n_observations and server.n_actions == n_actions]
+            if not candidates:
+                return Status.OBSERVATION_SIZE_ERROR, '', 0
+
+            # Release expired reservations
+            for server in candidates:
+                while server.reservations and server.reservations[0] <= now:
+                    server.reservations.popleft()
+
+            # Least-loaded server with an unreserved free slot
+            available = [server for server in candidates if server.unreserved_slots > 0]
+            if not available:
+                return Status.AGENT_ID_ERROR, '', 0
+            server = max(available, key=lambda server: (server.unreserved_slots / server.total_slots, server.unreserved_slots))
+
+            # Reserve slot until claimed by the ICCE, or expired
+            server.reservations.append(now + self.reservation_seconds)
+            return Status.SUCCESS, server.ip_addr, server.port
@@ -0,0 +1,25 @@
+import grpc
+from ..grpc_interfaces import Registry_pb2, Registry_pb2_grpc
+
+class RegistryClient():
+    """ Client of a `Registry`, used by Environments to advertise their free agent slots and by ICCEs to be assigned
+    to an Environment. """
+    def __init__(self, ip_addr = 'localhost', port = 50050):
+        self._channel = grpc.insecure_channel(ip_addr+':'+str(port))
+        self._stub = Registry_pb2_grpc.RegistryStub(self._channel)
+
+    def advertise(self, ip_addr: str, port: int, free_slots: int, total_slots: int, n_observations: int, n_actions: int, n_mapped: int = 0):
+        request = Registry_pb2.Advertisement(
+            ip_addr=ip_addr,
+            port=port,
+            free_slots=free_slots,
+            total_slots=total_slots,
+            n_observations=n_observations,
+            n_actions=n_actions,
+            n_mapped=n_mapped)
+        return self._stub.advertise(request)
+
+    def assign(self, n_observations: int, n_actions: int, timeout: float | None = None):
+        # Waits for the registry to be up, so that ICCEs can be started before it
+        request = Registry_pb2.AssignRequest(n_observations=n_observations, n_actions=n_actions)
+        return self._stub.assign(request, wait_for_ready=True, timeout=timeout)
@@ -0,0 +1,77 @@
+import grpc
+from ..grpc_interfaces import Registry_pb2, Registry_pb2_grpc
+
+import threading
+from concurrent import futures
+
+class RegistryServicer(Registry_pb2_grpc.RegistryServicer):
+    def __init__(self, advertise_cb, assign_cb):
+        super().__init__()
+        # Store callbacks
+        self._advertise_cb = advertise_cb
+        self._assign_cb = assign_cb
+
+    def advertise(self, request, context):
+        """ Servicer implementation of advertise.
+
+        Invokes the callback function `_on_advertise()` defined in the `Registry` class, which records the free agent
+        slots of an Environment server.
+
+        Args:
+            request : The incoming gRPC request message, `Advertisement` containing the address and slots of an Environment.
+
+        Returns:
+            The gRPC response message `AdvertiseResponse` containing the status.
+        """
+        status = self._advertise_cb(
+            ip_addr=request.ip_addr,
+            port=request.port,
+            free_slots=request.free_slots,
+            total_slots=request.total_slots,
+            n_observations=request.n_observations,
+            n_actions=request.n_actions,
+            n_mapped=request.n_mapped
+        )
+        return Registry_pb2.AdvertiseResponse(status=int(status))
+
+    def assign(self, request, context):
+        """ Servicer implementation of assign.
+
+        Invokes the callback function `_on_assign()` defined in the `Registry` class, which assigns an ICCE to the
+        least-loaded Environment server.
+
+        Args:
+            request : The incoming gRPC request message, `AssignRequest` containing the ICCE's observation and action sizes.
+
+        Returns:
+            The gRPC response message `Assignment` containing the status and the address of the assigned Environment.
+        """
+        status, ip_addr, port = self._assign_cb(n_observations=request.n_observations, n_actions=request.n_actions)
+        return Registry_pb2.Assignment(status=int(status), ip_addr=ip_addr, port=port)
+
+
+class RegistryEndpoint():
+    def __init__(self, advertise_cb, assign_cb, ip_addr='localhost', port=50050, max_workers=10):
+        # gRPC server
+        self._server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+        self._server_thread = threading.Thread(target=self.start_server)
+
+        # Registry servicer
+        self._servicer = RegistryServicer(advertise_cb=advertise_cb, assign_cb=assign_cb)
+
+        Registry_pb2_grpc.add_RegistryServicer_to_server(self._servicer, self._server)
+        self._server.add_insecure_port(ip_addr+':'+str(port))
+
+    def start(self):
+        """ Starts the Registry communication layer on a separate thread. """
+        self._server_thread.start()
+
+    def shutdown(self):
+        """ Shutsdown the gRPC server and rejoin the communication layer thread. """
+        self._server.stop(grace=None)
+        self._server_thread.join()
+
+    def start_server(self):
+        """ Starts the gRPC server and blocks the calling thread until server shutsdown. """
+        self._server.start()
+        self._server.wait_for_termination()
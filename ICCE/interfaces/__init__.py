@@ -1,2 +1,32 @@
-from .EnvironmentInterface import EnvironmentInterface
-from .ICCEInterface import ICCEInterface
\ No newline at end of file
+import importlib
+import sys
+import types
+
+# Interfaces are imported on first use, so that each process only imports the modules (gRPC stubs, etc.) of the
+# interfaces it uses. Each interface is defined in the submodule of the same name, which remains importable as a module,
+# e.g. by unittest.mock.patch, through sys.modules and importlib.import_module()
+_INTERFACES = ('EnvironmentInterface', 'ICCEInterface', 'PolicyServerInterface', 'PolicyClient', 'LearnerInterface',
+               'LearnerClient', 'Registry', 'BatchClient', 'ICCEEndpoint')
+
+__all__ = list(_INTERFACES)
+
+def __getattr__(name):
+    if name not in _INTERFACES:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    interface = getattr(importlib.import_module('.'+name, __name__), name)
+    globals()[name] = interface
+    return interface
+
+def __dir__():
+    return sorted(set(globals()) | set(_INTERFACES))
+
+
+class _Interfaces(types.ModuleType):
+    def __setattr__(self, name, value):
+        # Importing a submodule binds it to the package, e.g. `from .ICCEEndpoint import ICCEEndpoint` in ICCEInterface,
+        # which must not shadow the interface of the same name
+        if name in _INTERFACES and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+sys.modules[__name__].__class__ = _Interfaces
\ No newline at end of file
@@ -0,0 +1,234 @@
+import numpy as np
+import os
+import threading
+from concurrent import futures
+from statistics import NormalDist
+
+class Evaluation:
+    """ The evaluated episodes of a checkpoint, and their statistics.
+
+    Confidence intervals are two-sided: the interval of the mean return uses the normal approximation, and the interval of
+    the win rate is the Wilson score interval, which remains valid for few episodes and win rates close to 0 or 1.
+
+    Args:
+        name : The unique name of the checkpoint.
+        checkpoint : The checkpoint passed to `run_episodes()`, e.g. the path of the model file.
+    """
+    __slots__ = ('name', 'checkpoint', 'returns', 'scores', 'n_failed')
+
+    def __init__(self, name: str, checkpoint):
+        self.name = name
+        self.checkpoint = checkpoint
+        self.returns: list[float] = []
+        self.scores: list[float] = [] # Scores of the episodes which have an outcome
+        self.n_failed = 0 # Episodes of failed rollouts
+
+    @property
+    def n_episodes(self) -> int:
+        return len(self.returns)
+
+    @property
+    def mean_return(self) -> float:
+        return float(np.mean(self.returns)) if self.returns else float('nan')
+
+    @property
+    def win_rate(self) -> float | None:
+        """ The fraction of scored episodes which were won, or None if no episode has an outcome. """
+        if not self.scores:
+            return None
+        return float(np.mean(np.asarray(self.scores) > 0.5))
+
+    def return_interval(self, confidence: float = 0.95) -> tuple[float, float]:
+        """ The confidence interval of the mean return.
+
+        Args:
+            confidence : The confidence level.
+
+        Returns:
+            The lower and upper bounds of the interval, NaN if fewer than 2 episodes were evaluated.
+        """
+        if len(self.returns) < 2:
+            return float('nan'), float('nan')
+        z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+        half_width = z * np.std(self.returns, ddof=1) / np.sqrt(len(self.returns))
+        return self.mean_return - half_width, self.mean_return + half_width
+
+    def win_rate_interval(self, confidence: float = 0.95) -> tuple[float, float] | None:
+        """ The confidence interval of the win rate.
+
+        Args:
+            confidence : The confidence level.
+
+        Returns:
+            The lower and upper bounds of the interval, or None if no episode has an outcome.
+        """
+        if not self.scores:
+            return None
+        n = len(self.scores)
+        p = self.win_rate
+        z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+        center = (p + z**2 / (2*n)) / (1 + z**2 / n)
+        half_width = z / (1 + z**2 / n) * np.sqrt(p * (1 - p) / n + z**2 / (4 * n**2))
+        return max(0.0, center - half_width), min(1.0, center + half_width)
+
+    def __repr__(self):
+        low, high = self.return_interval()
+        text = f'Evaluation({self.name}, episodes={self.n_episodes}, return={self.mean_return:.2f} [{low:.2f}, {high:.2f}]'
+        if self.scores:
+            low, high = self.win_rate_interval()
+            text += f', win rate={self.win_rate:.3f} [{low:.3f}, {high:.3f}]'
+        return text + ')'
+
+
+class Evaluator:
+    """ Evaluates checkpoints by running many headless episodes concurrently, and aggregates their returns and win rates.
+
+    The episode budget of each checkpoint is split into rollouts of `episodes_per_rollout` episodes, so that the start up
+    and shut down of an environment is amortized over several episodes. Rollouts of all checkpoints are interleaved, and
+    run by the user-defined `run_episodes(checkpoint, n_episodes, port)` in a pool of worker processes, one rollout per
+    core by default. `run_episodes` is expected to run a headless environment listening on `port` for n_episodes, with an
+    inference-only ICCE (`evaluate=True`) loading the checkpoint, and return the (return, score) of each episode, e.g.
+    using `run_evaluation()`. It must be picklable, i.e. a module-level function.
+
+    Args:
+        run_episodes : Runs a rollout and returns the (return, score) of each episode. Scores are None for episodes
+            without an outcome, otherwise 1.0 win, 0.5 draw, 0.0 loss.
+        max_concurrent : The maximum number of concurrent rollouts. Defaults to the number of cores.
+        base_port : Rollouts are assigned ports from base_port to base_port + max_concurrent - 1.
+        episodes_per_rollout : The number of episodes of a rollout.
+    """
+    def __init__(self, run_episodes, max_concurrent: int | None = None, base_port: int = 50100, episodes_per_rollout: int = 10):
+        self.run_episodes = run_episodes
+        self.max_concurrent = max_concurrent if max_concurrent is not None else os.cpu_count()
+        self.base_port = base_port
+        self.episodes_per_rollout = episodes_per_rollout
+
+        self.evaluations: list[Evaluation] = []
+        self._lock = threading.Lock()
+
+    @property
+    def leaderboard(self) -> list[Evaluation]:
+        """ The evaluations sorted by descending win rate, then mean return. """
+        with self._lock:
+            return sorted(self.evaluations, key=lambda evaluation: (evaluation.win_rate or 0.0, evaluation.mean_return), reverse=True)
+
+    def add_checkpoint(self, name: str, checkpoint) -> Evaluation:
+        """ Adds a checkpoint to evaluate.
+
+        Args:
+            name : The unique name of the checkpoint.
+            checkpoint : The checkpoint passed to `run_episodes()`.
+
+        Returns:
+            The evaluation of the checkpoint, updated as its episodes complete.
+
+        Raises:
+            ValueError: If a checkpoint with the same name has already been added.
+        """
+        with self._lock:
+            if any(evaluation.name == name for evaluation in self.evaluations):
+                raise ValueError("Identical checkpoint names detected while adding checkpoints!")
+            evaluation = Evaluation(name, checkpoint)
+            self.evaluations.append(evaluation)
+        return evaluation
+
+    def run(self, n_episodes: int) -> list[Evaluation]:
+        """ Evaluates every checkpoint for n_episodes, keeping max_concurrent rollouts running at all times.
+
+        Failed rollouts are counted but not retried.
+
+        Args:
+            n_episodes : The episode budget of each checkpoint.
+
+        Returns:
+            The leaderboard.
+        """
+        # Interleave the rollouts of all checkpoints, so that partial results cover every checkpoint
+        n_rollouts = -(-n_episodes // self.episodes_per_rollout)
+        rollouts = []
+        for i in range(n_rollouts):
+            n = min(self.episodes_per_rollout, n_episodes - i * self.episodes_per_rollout)
+            rollouts += [(evaluation, n) for evaluation in self.evaluations]
+        rollouts.reverse()
+
+        free_ports = list(range(self.base_port, self.base_port + self.max_concurrent))
+        running = {}
+
+        with futures.ProcessPoolExecutor(max_workers=self.max_concurrent) as executor:
+            while rollouts or running:
+                # Keep every worker busy
+                while rollouts and len(running) < self.max_concurrent:
+                    evaluation, n = rollouts.pop()
+                    port = free_ports.pop()
+                    future = executor.submit(self.run_episodes, evaluation.checkpoint, n, port)
+                    running[future] = (evaluation, n, port)
+
+                # Aggregate completed rollouts
+                done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    evaluation, n, port = running.pop(future)
+                    free_ports.append(port)
+                    try:
+                        episodes = future.result()
+                    except Exception as e:
+                        print(f'Rollout of {evaluation.name} failed: {e}')
+                        evaluation.n_failed += n
+                        continue
+                    self.record(evaluation, episodes)
+        return self.leaderboard
+
+    def record(self, evaluation: Evaluation, episodes: list[tuple[float, float | None]]):
+        """ Records the evaluated episodes of a checkpoint.
+
+        Args:
+            evaluation : The evaluation of the checkpoint.
+            episodes : The (return, score) of each episode.
+        """
+        with self._lock:
+            for episode_return, score in episodes:
+                evaluation.returns.append(float(episode_return))
+                if score is not None:
+                    evaluation.scores.append(float(score))
+
+
+def run_evaluation(environment, icce, opponents = ()) -> list[tuple[float, float | None]]:
+    """ Runs an environment with inference-only ICCEs until it shuts down, in the calling process.
+
+    The environment and opponents run on background threads, and the evaluated ICCE on the calling thread. The environment
+    is expected to be headless, and to shut down after the requested number of episodes (`max_episodes`), with
+    `time_between_episodes` long enough for the ICCEs to sample the end of each episode.
+
+    Args:
+        environment : The `EnvironmentInterface`, with its agents registered.
+        icce : The evaluated `ICCEInterface`.
+        opponents : The `ICCEInterface`s of the other agents, if any.
+
+    Returns:
+        The (return, score) of each episode of the evaluated ICCE.
+
+    Raises:
+        grpc.RpcError: If an RPC of the evaluated ICCE failed. The environment is shut down and every ICCE is closed, so
+            that the worker running the rollout can run the next one.
+    """
+    threads = [threading.Thread(target=environment.run, daemon=True)]
+    for opponent in opponents:
+        opponent.evaluate = True
+        threads.append(threading.Thread(target=opponent.run, daemon=True))
+    for thread in threads:
+        thread.start()
+
+    icce.evaluate = True
+    try:
+        icce.run()
+    except BaseException:
+        # Rather than running the remaining episodes without the evaluated ICCE
+        environment.shutdown()
+        raise
+    finally:
+        # Releases the port, heartbeats and channels of the rollout
+        threads[0].join()
+        for client in (icce, *opponents):
+            client.close()
+        for thread in threads[1:]:
+            thread.join()
+    return list(zip(icce.episode_returns, icce.episode_scores))
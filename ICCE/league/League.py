@@ -0,0 +1,197 @@
+from ..utils import Matchmaking
+
+import numpy as np
+import os
+import threading
+from concurrent import futures
+
+class Player:
+    """ A policy checkpoint in the league, and its rating.
+
+    Args:
+        name : The unique name of the player.
+        checkpoint : The checkpoint passed to `play_match()`, e.g. the path of the model file.
+        rating : The initial Elo rating.
+    """
+    __slots__ = ('name', 'checkpoint', 'rating', 'wins', 'losses', 'draws')
+
+    def __init__(self, name: str, checkpoint, rating: float = 1200.0):
+        self.name = name
+        self.checkpoint = checkpoint
+        self.rating = rating
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.losses + self.draws
+
+    def __repr__(self):
+        return f'Player({self.name}, rating={self.rating:.1f}, W/L/D={self.wins}/{self.losses}/{self.draws})'
+
+
+class League:
+    """ Self-play league which runs many matchups concurrently and rates the players.
+
+    Every matchup assigns a player's checkpoint to each of the two agent slots of an environment, chosen by the
+    matchmaking strategy. Slot 0 is always the latest player (the one being trained), and slot 1 is its opponent:
+
+    * `Matchmaking.LATEST`: the latest player against itself.
+    * `Matchmaking.HISTORICAL`: the latest player against a uniformly sampled player of the pool.
+    * `Matchmaking.ELO`: the latest player against a player of the pool, favouring opponents of similar rating.
+
+    Matchups are run by the user-defined `play_match(checkpoints, port)` in a pool of worker processes, one matchup per
+    core by default. `play_match` is expected to run an environment listening on `port` with an ICCE for each checkpoint,
+    and return the score of slot 0 (1.0 win, 0.5 draw, 0.0 loss). It must be picklable, i.e. a module-level function.
+
+    Args:
+        play_match : Runs a matchup and returns the score of slot 0.
+        strategy : The matchmaking strategy.
+        max_concurrent : The maximum number of concurrent matchups. Defaults to the number of cores.
+        base_port : Matchups are assigned ports from base_port to base_port + max_concurrent - 1.
+        k_factor : The Elo K-factor.
+        seed : Seed of the matchmaking random number generator.
+    """
+    def __init__(self, play_match, strategy: Matchmaking = Matchmaking.ELO, max_concurrent: int | None = None, base_port: int = 50100,
+                 k_factor: float = 32.0, seed: int | None = None):
+        self.play_match = play_match
+        self.strategy = strategy
+        self.max_concurrent = max_concurrent if max_concurrent is not None else os.cpu_count()
+        self.base_port = base_port
+        self.k_factor = k_factor
+
+        self.players: list[Player] = []
+        self.results: list[tuple[str, str, float]] = [] # (player, opponent, score of player)
+        self.n_failed = 0
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def latest(self) -> Player:
+        """ The latest player added to the league. """
+        return self.players[-1]
+
+    @property
+    def leaderboard(self) -> list[Player]:
+        """ The players sorted by descending rating. """
+        with self._lock:
+            return sorted(self.players, key=lambda player: player.rating, reverse=True)
+
+    def add_player(self, name: str, checkpoint, rating: float | None = None) -> Player:
+        """ Adds a checkpoint to the league, which becomes the latest player.
+
+        Args:
+            name : The unique name of the player.
+            checkpoint : The checkpoint passed to `play_match()`.
+            rating : The initial Elo rating. Defaults to the rating of the previous latest player, if any.
+
+        Returns:
+            The added player.
+
+        Raises:
+            ValueError: If a player with the same name has already been added.
+        """
+        with self._lock:
+            if any(player.name == name for player in self.players):
+                raise ValueError("Identical player names detected while adding players!")
+            if rating is None:
+                rating = self.players[-1].rating if self.players else 1200.0
+            player = Player(name, checkpoint, rating)
+            self.players.append(player)
+        return player
+
+    def matchmake(self) -> tuple[Player, Player]:
+        """ Chooses the players of a matchup using the matchmaking strategy.
+
+        Returns:
+            The players of slot 0 and slot 1.
+
+        Raises:
+            ValueError: If no players have been added.
+        """
+        with self._lock:
+            if not self.players:
+                raise ValueError("No players in the league!")
+            latest = self.players[-1]
+            pool = self.players[:-1] or [latest]
+
+            match(self.strategy):
+                case Matchmaking.LATEST:
+                    opponent = latest
+                case Matchmaking.HISTORICAL:
+                    opponent = pool[self._rng.integers(len(pool))]
+                case Matchmaking.ELO:
+                    # Favour opponents the latest player has an even chance against
+                    p = np.array([self._expected_score(latest.rating, player.rating) for player in pool])
+                    weights = p * (1.0 - p) + 1e-6
+                    opponent = pool[self._rng.choice(len(pool), p=weights / weights.sum())]
+        return latest, opponent
+
+    def run(self, n_matches: int):
+        """ Runs matchups until n_matches have been played, keeping max_concurrent matchups running at all times.
+
+        Players are chosen when a matchup is started, so players added while the league is running are matched
+        as soon as a worker is free. Failed matchups are counted but not rated.
+
+        Args:
+            n_matches : The number of matchups to play.
+        """
+        free_ports = list(range(self.base_port, self.base_port + self.max_concurrent))
+        running = {}
+        n_started = 0
+
+        with futures.ProcessPoolExecutor(max_workers=self.max_concurrent) as executor:
+            while n_started < n_matches or running:
+                # Keep every worker busy
+                while n_started < n_matches and len(running) < self.max_concurrent:
+                    players = self.matchmake()
+                    port = free_ports.pop()
+                    future = executor.submit(self.play_match, [player.checkpoint for player in players], port)
+                    running[future] = (players, port)
+                    n_started += 1
+
+                # Rate completed matchups
+                done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    (player, opponent), port = running.pop(future)
+                    free_ports.append(port)
+                    try:
+                        score = float(future.result())
+                    except Exception as e:
+                        print(f'Matchup {player.name} vs {opponent.name} failed: {e}')
+                        self.n_failed += 1
+                        continue
+                    self.record(player, opponent, score)
+
+    def record(self, player: Player, opponent: Player, score: float):
+        """ Records the result of a matchup and updates the Elo ratings of both players.
+
+        Args:
+            player : The player of slot 0.
+            opponent : The player of slot 1.
+            score : The score of the player (1.0 win, 0.5 draw, 0.0 loss).
+        """
+        with self._lock:
+            self.results.append((player.name, opponent.name, score))
+            if player is opponent:
+                return
+
+            expected = self._expected_score(player.rating, opponent.rating)
+            player.rating += self.k_factor * (score - expected)
+            opponent.rating -= self.k_factor * (score - expected)
+
+            if score > 0.5:
+                player.wins += 1
+                opponent.losses += 1
+            elif score < 0.5:
+                player.losses += 1
+                opponent.wins += 1
+            else:
+                player.draws += 1
+                opponent.draws += 1
+
+    @staticmethod
+    def _expected_score(rating: float, opponent_rating: float) -> float:
+        """ Helper func to compute the expected score of a player against an opponent under the Elo model. """
+        return 1.0 / (1.0 + 10.0 ** ((opponent_rating - rating) / 400.0))
@@ -0,0 +1,2 @@
+from .League import League, Player
+from .Evaluator import Evaluator, Evaluation, run_evaluation
\ No newline at end of file
@@ -0,0 +1,185 @@
+from .StateTable import StateTable, ACT, RESET
+
+import numpy as np
+import threading
+import time
+
+class SimulationBridge:
+    """ Reads the agent state table published by a `SimulationPublisher` on the same host, and sends it commands.
+
+    Set as the `simulation` of an `EnvironmentInterface`, the state table is copied out of shared memory once per tick,
+    with a single memcpy for all agents, before `sample()` is called for each agent. `sample()` then reads its agent's
+    state from the copy using `SimulationBridge.sample()`, so every agent of a tick observes the same simulation step.
+
+    If the simulation stops signalling that it is alive for `stale_seconds`, e.g. as it crashed mid-write or was
+    restarted, `update()` re-attaches to the region created under the same name by its replacement.
+
+    Args:
+        name : The name of the shared memory region, shared with the `SimulationPublisher`.
+        timeout_seconds : The time to wait for the simulation to create the region, or for a stopped simulation to be replaced.
+        stale_seconds : The time since the simulation last signalled that it is alive after which it is considered stopped.
+
+    Raises:
+        TimeoutError: If the simulation did not create the region within timeout_seconds.
+    """
+    def __init__(self, name: str, timeout_seconds: float = 30.0, stale_seconds: float = 5.0):
+        self.name = name
+        self.timeout_seconds = timeout_seconds
+        self.stale_seconds = stale_seconds
+        self._table = StateTable.attach(name, timeout_seconds)
+
+        # Statistics
+        self.n_dropped = 0 # Commands dropped as the queue was full
+
+        # Copy of the state table, updated by update()
+        self._snapshot = np.zeros(shape=(), dtype=self._table.state.dtype)
+        self._snapshot_bytes = self._snapshot.reshape(1).view(np.uint8)
+        self._table.read(self._snapshot_bytes, timeout_seconds=stale_seconds)
+        self.observations = self._snapshot['observations']
+        self.rewards = self._snapshot['rewards']
+        self.terminated = self._snapshot['terminated']
+        self.truncated = self._snapshot['truncated']
+
+        # Commands are sent by the Environment's tick and gRPC threads, the queue has a single producer
+        self._lock = threading.Lock()
+        self._resets_requested = int(self._snapshot['resets'])
+
+    @property
+    def tick(self) -> int:
+        """ The number of states published by the simulation, as of the latest update(). """
+        return int(self._snapshot['tick'])
+
+    @property
+    def n_agents(self) -> int:
+        return self._table.n_agents
+
+    def update(self) -> bool:
+        """ Copies the latest state table published by the simulation, re-attaching to its region if it was replaced.
+
+        Returns:
+            True if the simulation published a new state since the previous update.
+
+        Raises:
+            ConnectionError: If the simulation stopped and was not replaced within `timeout_seconds`.
+        """
+        tick = int(self._snapshot['tick'])
+        try:
+            if self._table.heartbeat_age <= self.stale_seconds:
+                self._table.read(self._snapshot_bytes, timeout_seconds=self.stale_seconds)
+                return int(self._snapshot['tick']) != tick
+        except TimeoutError:
+            pass
+        # Simulation stopped, e.g. crashed mid-write or restarted
+        self._reattach()
+        return True
+
+    def sample(self, agent_id: int) -> tuple[np.ndarray, float, bool, bool]:
+        """ Retrieves the state of an agent, as of the latest update().
+
+        Args:
+            agent_id : The index of the agent in the state table.
+
+        Returns:
+            observation, reward, terminated, truncated of the agent. The observation is a view, overwritten by update().
+        """
+        return self.observations[agent_id], float(self.rewards[agent_id]), bool(self.terminated[agent_id]), bool(self.truncated[agent_id])
+
+    def act(self, agent_id: int, action: np.ndarray) -> bool:
+        """ Queues the action of an agent. Non-blocking.
+
+        Args:
+            agent_id : The index of the agent in the state table.
+            action : The action of the agent.
+
+        Returns:
+            True if the action was queued, False if it was dropped as the queue is full.
+        """
+        with self._lock:
+            slot = self._reserve()
+            if slot is None:
+                return False
+            slot['command'] = ACT
+            slot['agent'] = agent_id
+            slot['action'] = action
+            self._commit()
+        return True
+
+    def reset(self, timeout_seconds: float = 10.0) -> bool:
+        """ Requests a reset of the simulation, and waits for it to publish its initial state.
+
+        Args:
+            timeout_seconds : The time to wait for the simulation to reset.
+
+        Returns:
+            True if the simulation was reset, False if the request was dropped or timed out.
+        """
+        with self._lock:
+            slot = self._reserve()
+            if slot is None:
+                return False
+            slot['command'] = RESET
+            slot['agent'] = -1
+            self._commit()
+            self._resets_requested += 1
+            target = self._resets_requested
+
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            self.update()
+            if self._snapshot['resets'] >= target:
+                return True
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.001)
+
+    def close(self):
+        """ Detaches from the shared memory region. """
+        self._table.close()
+
+
+    ########## HELPERS ##########
+    def _reserve(self) -> np.ndarray | None:
+        """ The next free slot of the command queue, or None if the queue is full. """
+        table = self._table
+        tail = int(table.tail[0])
+        if tail - int(table.head[0]) >= table.capacity:
+            self.n_dropped += 1
+            return None
+        return table.queue[tail % table.capacity]
+
+    def _commit(self):
+        """ Publishes the reserved slot to the simulation, once written. """
+        self._table.tail[0] += 1
+
+    def _reattach(self):
+        """ Attaches to the region of the simulation replacing a stopped one, waiting up to `timeout_seconds`.
+
+        Raises:
+            ConnectionError: If no live simulation created a new region within `timeout_seconds`.
+            ValueError: If the new region's sizes differ from the previous region's.
+        """
+        print(f"Simulation '{self.name}' stopped publishing, re-attaching...")
+        deadline = time.monotonic() + self.timeout_seconds
+        while True:
+            try:
+                table = StateTable.attach(self.name, timeout_seconds=max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                table = None
+            if table is not None:
+                # The stopped simulation's region may not have been replaced yet
+                if table.generation != self._table.generation and table.heartbeat_age <= self.stale_seconds:
+                    break
+                table.close()
+            if time.monotonic() > deadline:
+                raise ConnectionError(f"Simulation '{self.name}' stopped publishing and was not replaced within {self.timeout_seconds} seconds")
+            time.sleep(0.1)
+
+        if (table.n_agents, table.n_observation, table.n_action) != (self.n_agents, self._table.n_observation, self._table.n_action):
+            table.close()
+            raise ValueError(f"Simulation '{self.name}' was replaced by a simulation of different sizes")
+        table.read(self._snapshot_bytes, timeout_seconds=self.stale_seconds)
+        with self._lock:
+            self._table.close()
+            self._table = table
+            self._resets_requested = int(self._snapshot['resets'])
+        print(f"Re-attached to simulation '{self.name}'")
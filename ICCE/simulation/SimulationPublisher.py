@@ -0,0 +1,85 @@
+from .StateTable import StateTable, ACT, RESET
+
+import numpy as np
+
+class SimulationPublisher:
+    """ Publishes the agent state table of a simulation to an Environment on the same host, through shared memory.
+
+    The simulation publishes the state of all its agents once per step using `publish()`, which copies it into a shared
+    memory region guarded by a seqlock. The `SimulationBridge` of the Environment copies the whole table out with a single
+    memcpy per tick, so neither side ever blocks the other.
+
+    Actions and resets requested by the Environment are queued, and dispatched to `act_cb` and `reset_cb` on the
+    simulation's own thread when it calls `poll()`, so that the simulation needs no locking.
+
+    Args:
+        name : The name of the shared memory region, shared with the `SimulationBridge`.
+        n_agents : The number of agents in the state table. Agents are identified by their index, 0 to n_agents-1.
+        n_observation : The observation size of an agent.
+        n_action : The action size of an agent.
+        act_cb : Called as `act_cb(agent_id, action)` for each queued action. The action is only valid during the call.
+        reset_cb : Called as `reset_cb()` for each queued reset. The simulation must then publish its initial state.
+        capacity : The number of commands which can be queued. Commands sent while the queue is full are dropped.
+    """
+    def __init__(self, name: str, n_agents: int, n_observation: int, n_action: int, act_cb=None, reset_cb=None, capacity: int = 1024):
+        self.name = name
+        self.act_cb = act_cb
+        self.reset_cb = reset_cb
+        self.tick = 0 # Number of published states
+
+        self._table = StateTable.create(name, n_agents, n_observation, n_action, capacity)
+        self._state = self._table.state
+        self._resets = 0 # Resets dispatched, published with the next state
+
+    def publish(self, observations: np.ndarray, rewards: np.ndarray, terminated: np.ndarray, truncated: np.ndarray):
+        """ Publishes the state of all agents.
+
+        Args:
+            observations : The observations of the agents, of shape (n_agents, n_observation).
+            rewards : The rewards of the agents, of shape (n_agents,).
+            terminated : The terminated flags of the agents, of shape (n_agents,).
+            truncated : The truncated flags of the agents, of shape (n_agents,).
+        """
+        self.tick += 1
+        self._table.begin_write()
+        state = self._state
+        state['tick'] = self.tick
+        state['resets'] = self._resets
+        state['observations'] = observations
+        state['rewards'] = rewards
+        state['terminated'] = terminated
+        state['truncated'] = truncated
+        self._table.end_write()
+        self._table.beat()
+
+    def poll(self) -> int:
+        """ Dispatches the queued commands to `act_cb` and `reset_cb`, in the order they were sent. Also signals the
+        Environment that the simulation is alive, so should be called regularly even while not publishing, e.g. when paused.
+
+        Returns:
+            The number of dispatched commands.
+        """
+        table = self._table
+        table.beat()
+        head = int(table.head[0])
+        tail = int(table.tail[0])
+        capacity = table.capacity
+        for index in range(head, tail):
+            command = table.queue[index % capacity]
+            if command['command'] == ACT:
+                if self.act_cb is not None:
+                    self.act_cb(int(command['agent']), command['action'])
+            elif command['command'] == RESET:
+                if self.reset_cb is not None:
+                    self.reset_cb()
+                self._resets += 1
+        # Free the slots for the Environment
+        table.head[0] = tail
+        return tail - head
+
+    def close(self):
+        """ Closes and removes the shared memory region. """
+        memory = self._table.memory
+        self._state = None
+        self._table.close()
+        memory.unlink()
@@ -0,0 +1,216 @@
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+import secrets
+import threading
+import time
+
+# Layout of the header, as int64 fields. Sizes and generation are immutable once the magic is set
+SEQUENCE, N_AGENTS, N_OBSERVATION, N_ACTION, CAPACITY, GENERATION, HEARTBEAT, MAGIC = range(8)
+_MAGIC = 0x49434345 # 'ICCE'
+
+# Serializes attaching, which temporarily disables the resource tracker
+_tracker_lock = threading.Lock()
+
+# Queue indices are on their own cache lines, as they are written by different processes
+_HEADER_OFFSET = 0
+_HEAD_OFFSET = 64
+_TAIL_OFFSET = 128
+_STATE_OFFSET = 192
+
+# Commands of the queue
+ACT = 0
+RESET = 1
+
+def _align(offset: int, alignment: int = 64) -> int:
+    return (offset + alignment - 1) // alignment * alignment
+
+def state_dtype(n_agents: int, n_observation: int) -> np.dtype:
+    """ Structured dtype of the agent state table, published by the simulation every tick. """
+    return np.dtype([
+        ('tick', np.int64),
+        ('resets', np.int64),
+        ('observations', np.float64, (n_agents, n_observation)),
+        ('rewards', np.float64, (n_agents,)),
+        ('terminated', np.bool_, (n_agents,)),
+        ('truncated', np.bool_, (n_agents,))
+    ])
+
+def command_dtype(n_action: int) -> np.dtype:
+    """ Structured dtype of a command sent by the environment to the simulation. """
+    return np.dtype([('command', np.int64), ('agent', np.int64), ('action', np.float32, (n_action,))])
+
+
+class StateTable:
+    """ Shared memory region holding the agent state table of a simulation, and a queue of commands to it.
+
+    The state table is written by a single writer, the simulation, and protected by a seqlock: the sequence number is odd
+    while the table is being written. Readers copy the whole table, then retry if the sequence number was odd or changed
+    during the copy. Readers therefore never block the writer, and never observe a partially written table.
+
+    Commands are sent through a single-producer single-consumer ring buffer: the producer only writes the tail index and the
+    consumer only writes the head index.
+
+    Each region is stamped with a random generation, so that readers detect that the simulation recreated the region, and
+    the writer periodically stamps a heartbeat, so that readers detect that it stopped, e.g. crashed mid-write.
+
+    The seqlock and ring buffer rely on stores being observed in program order by other processes, as on x86-64.
+
+    Args:
+        memory : The shared memory region.
+    """
+    def __init__(self, memory: shared_memory.SharedMemory):
+        self.memory = memory
+        self.header = np.ndarray(shape=(MAGIC+1,), dtype=np.int64, buffer=memory.buf, offset=_HEADER_OFFSET)
+        self.head = np.ndarray(shape=(1,), dtype=np.int64, buffer=memory.buf, offset=_HEAD_OFFSET)
+        self.tail = np.ndarray(shape=(1,), dtype=np.int64, buffer=memory.buf, offset=_TAIL_OFFSET)
+
+    @classmethod
+    def create(cls, name: str, n_agents: int, n_observation: int, n_action: int, capacity: int) -> 'StateTable':
+        """ Creates the region, replacing any region of the same name left by a previous simulation. """
+        size = cls._size(n_agents, n_observation, n_action, capacity)
+        try:
+            memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        table = cls(memory)
+        table.header[:] = 0
+        table.header[N_AGENTS] = n_agents
+        table.header[N_OBSERVATION] = n_observation
+        table.header[N_ACTION] = n_action
+        table.header[CAPACITY] = capacity
+        table.header[GENERATION] = secrets.randbits(63) or 1
+        table.beat()
+        table.head[0] = 0
+        table.tail[0] = 0
+        table._map()
+        # Readers wait for the magic, so that they never map a region whose sizes are not yet written
+        table.header[MAGIC] = _MAGIC
+        return table
+
+    @classmethod
+    def attach(cls, name: str, timeout_seconds: float) -> 'StateTable':
+        """ Attaches to the region created by a simulation, waiting for it to be created.
+
+        Raises:
+            TimeoutError: If the region was not created within timeout_seconds.
+        """
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            try:
+                memory = _attach(name)
+                if memory.size >= _STATE_OFFSET:
+                    table = cls(memory)
+                    if table.header[MAGIC] == _MAGIC:
+                        table._map()
+                        return table
+                    table.close()
+                else:
+                    memory.close()
+            except FileNotFoundError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Simulation state table '{name}' was not created within {timeout_seconds} seconds")
+            time.sleep(0.01)
+
+    @property
+    def n_agents(self) -> int:
+        return int(self.header[N_AGENTS])
+
+    @property
+    def n_observation(self) -> int:
+        return int(self.header[N_OBSERVATION])
+
+    @property
+    def n_action(self) -> int:
+        return int(self.header[N_ACTION])
+
+    @property
+    def capacity(self) -> int:
+        return int(self.header[CAPACITY])
+
+    @property
+    def generation(self) -> int:
+        """ The random generation of the region, which differs for every region created under the same name. """
+        return int(self.header[GENERATION])
+
+    @property
+    def heartbeat_age(self) -> float:
+        """ The time since the writer last stamped its heartbeat, in seconds. """
+        return (time.monotonic_ns() - int(self.header[HEARTBEAT])) / 1e9
+
+    def beat(self):
+        """ Stamps the heartbeat of the writer. The monotonic clock is shared by the processes of a host. """
+        self.header[HEARTBEAT] = time.monotonic_ns()
+
+    def begin_write(self):
+        """ Marks the state table as being written. """
+        self.header[SEQUENCE] += 1
+
+    def end_write(self):
+        """ Marks the state table as written. """
+        self.header[SEQUENCE] += 1
+
+    def read(self, out: np.ndarray, timeout_seconds: float = 1.0):
+        """ Copies the state table into out, a uint8 buffer of the table's size, with a single memcpy per attempt.
+
+        Raises:
+            TimeoutError: If no consistent copy was made within timeout_seconds, e.g. as the writer died mid-write.
+        """
+        attempts = 0
+        deadline = None
+        while True:
+            sequence = self.header[SEQUENCE]
+            if not sequence & 1:
+                out[:] = self.state_bytes
+                if self.header[SEQUENCE] == sequence:
+                    return
+            # Writer is mid-write, yield to it
+            attempts += 1
+            if attempts % 64 == 0:
+                now = time.monotonic()
+                if deadline is None:
+                    deadline = now + timeout_seconds
+                elif now > deadline:
+                    raise TimeoutError(f'State table was not read consistently within {timeout_seconds} seconds')
+                time.sleep(0)
+
+    def close(self):
+        """ Releases the views of the region, then closes it. """
+        self.header = self.head = self.tail = None
+        self.state = self.state_bytes = self.queue = None
+        self.memory.close()
+
+
+    ########## HELPERS ##########
+    def _map(self):
+        """ Maps the state table and command queue of the region. """
+        dtype = state_dtype(self.n_agents, self.n_observation)
+        self.state = np.ndarray(shape=(), dtype=dtype, buffer=self.memory.buf, offset=_STATE_OFFSET)
+        self.state_bytes = np.ndarray(shape=(dtype.itemsize,), dtype=np.uint8, buffer=self.memory.buf, offset=_STATE_OFFSET)
+        self.queue = np.ndarray(shape=(self.capacity,), dtype=command_dtype(self.n_action), buffer=self.memory.buf,
+                                offset=_align(_STATE_OFFSET + dtype.itemsize))
+
+    @staticmethod
+    def _size(n_agents: int, n_observation: int, n_action: int, capacity: int) -> int:
+        return _align(_STATE_OFFSET + state_dtype(n_agents, n_observation).itemsize) + capacity * command_dtype(n_action).itemsize
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """ Attaches to an existing shared memory region, without the resource tracker unlinking it when this process exits. """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    # Python < 3.13 always tracks attached regions. Unregistering afterwards would also drop the registration of a
+    # publisher sharing this process' tracker, so registration is skipped instead
+    with _tracker_lock:
+        register, resource_tracker.register = resource_tracker.register, lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
@@ -0,0 +1,2 @@
+from .SimulationPublisher import SimulationPublisher
+from .SimulationBridge import SimulationBridge
\ No newline at end of file
@@ -1 +1,7 @@
-from .enumerators import Status, INVALID_ID
\ No newline at end of file
+from .enumerators import Status, DType, Compression, Matchmaking, INVALID_ID
+from .encoding import encode, decode
+from .codecs import Codec, register_codec
+from .transforms import Transform, NanToNum, Clip, RunningNormalize, FrameStack
+from .metrics import MetricsRegistry
+from .tracing import Tracer, merge_traces
+from .checkpoints import CheckpointManager
\ No newline at end of file
@@ -0,0 +1,263 @@
+import copy
+import importlib.util
+import json
+import os
+import pickle
+import queue
+import threading
+
+import numpy as np
+
+def snapshot(state):
+    """ Copies a state so that it can be serialized while the original keeps being updated.
+
+    Tensors are detached and copied to the CPU, arrays are copied, and containers are copied recursively. Immutable
+    scalars are shared, and any other object is deep-copied.
+
+    Args:
+        state : The state to copy, e.g. a dict of model and optimizer `state_dict()`.
+
+    Returns:
+        The copied state.
+    """
+    if isinstance(state, dict):
+        return type(state)((key, snapshot(value)) for key, value in state.items())
+    if isinstance(state, (list, tuple)):
+        return type(state)(snapshot(value) for value in state)
+    if isinstance(state, np.ndarray):
+        return state.copy()
+    if isinstance(state, (int, float, complex, str, bytes, bool, type(None))):
+        return state
+    if hasattr(state, 'detach') and hasattr(state, 'to'):
+        # torch.Tensor, duck-typed so that torch is not imported
+        return state.detach().to('cpu', copy=True)
+    return copy.deepcopy(state)
+
+
+class CheckpointManager:
+    """ Saves checkpoints asynchronously, retaining the latest and best ones.
+
+    `save()` snapshots the state on the calling thread, so that training can resume immediately, and a background writer
+    serializes the snapshot to a temporary file which is atomically renamed into place. A checkpoint is therefore never
+    observed partially written, even if the process is killed. Checkpoints are serialized with `torch.save` if torch is
+    installed, otherwise with pickle.
+
+    After each write, checkpoints which are neither among the `keep_last` latest nor the `keep_best` best scored are
+    deleted. The retained checkpoints are listed in an index file, so that a manager created on the same directory resumes
+    the rotation.
+
+    Args:
+        directory : The directory checkpoints are written to. Created if missing.
+        keep_last : The number of latest checkpoints retained.
+        keep_best : The number of best scored checkpoints retained.
+        prefix : The prefix of the checkpoint file names.
+        mode : 'max' if higher scores are better, 'min' if lower scores are better.
+        max_pending : Saves made while this many snapshots are awaiting writing are dropped, so that a slow disk never
+            stalls the caller.
+    """
+    def __init__(self, directory: str, keep_last: int = 3, keep_best: int = 1, prefix: str = 'checkpoint', mode: str = 'max',
+                 max_pending: int = 2):
+        if mode not in ('max', 'min'):
+            raise ValueError(f"Unknown mode '{mode}', expected 'max' or 'min'")
+        self.directory = directory
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        self.prefix = prefix
+        self.mode = mode
+        os.makedirs(directory, exist_ok=True)
+
+        # Statistics
+        self.n_dropped = 0
+
+        # Retained checkpoints, ordered by step: [{'step', 'score', 'path'}]
+        self._index_path = os.path.join(directory, prefix+'_index.json')
+        self._checkpoints = []
+        self._lock = threading.Lock()
+        self.reload()
+
+        # torch is only imported by the writer and load()
+        self._extension = '.pt' if importlib.util.find_spec('torch') is not None else '.pkl'
+
+        # Snapshots awaiting writing
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def checkpoints(self) -> list[tuple[int, float | None, str]]:
+        """ The retained checkpoints as (step, score, path), ordered by step. """
+        with self._lock:
+            return [(checkpoint['step'], checkpoint['score'], checkpoint['path']) for checkpoint in self._checkpoints]
+
+    @property
+    def latest(self) -> str | None:
+        """ The path of the latest written checkpoint, or None if none were written. """
+        with self._lock:
+            return self._checkpoints[-1]['path'] if self._checkpoints else None
+
+    @property
+    def best(self) -> str | None:
+        """ The path of the best scored written checkpoint, or None if no scored checkpoints were written. """
+        with self._lock:
+            best = self._best(self._checkpoints, 1)
+        return best[0]['path'] if best else None
+
+    def save(self, state, step: int, score: float | None = None) -> bool:
+        """ Snapshots a state and queues it for writing. Non-blocking besides the snapshot.
+
+        Args:
+            state : The state to save, e.g. `{'model': model.state_dict(), 'optimizer': optimizer.state_dict()}`.
+            step : The step of the checkpoint, e.g. the episode. Later checkpoints must have greater steps.
+            score : The score ranking the checkpoint among the best, e.g. the running reward. Unscored checkpoints are
+                only retained as latest.
+
+        Returns:
+            True if the checkpoint was queued, False if it was dropped as too many are awaiting writing.
+
+        Raises:
+            RuntimeError: If the manager was closed.
+            Exception: The error of a previously failed write.
+        """
+        if self._closed:
+            raise RuntimeError(f"CheckpointManager of '{self.directory}' is closed")
+        self._raise()
+        try:
+            self._pending.put_nowait((snapshot(state), step, score))
+        except queue.Full:
+            self.n_dropped += 1
+            return False
+        return True
+
+    def load(self, which: str = 'latest', map_location=None):
+        """ Loads a checkpoint, waiting for pending writes.
+
+        The file is read once, so callers should retrieve every entry from the returned state rather than loading again.
+
+        Args:
+            which : 'latest', 'best', or the path of a checkpoint.
+            map_location : The device tensors are loaded to, passed to `torch.load`.
+
+        Returns:
+            The saved state.
+
+        Raises:
+            FileNotFoundError: If no such checkpoint was written.
+        """
+        self.flush()
+        path = {'latest': self.latest, 'best': self.best}.get(which, which)
+        if path is None:
+            raise FileNotFoundError(f"No {which} checkpoint in '{self.directory}'")
+
+        if path.endswith('.pt'):
+            import torch
+            return torch.load(path, map_location=map_location)
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+
+    def reload(self) -> bool:
+        """ Reads the index, e.g. to follow the checkpoints written by a manager of another process on the same directory.
+
+        The index is replaced atomically, so it is never read partially written. Managers which save should not reload.
+
+        Returns:
+            Whether the retained checkpoints changed.
+        """
+        try:
+            with open(self._index_path) as file:
+                checkpoints = json.load(file)
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            changed = checkpoints != self._checkpoints
+            self._checkpoints = checkpoints
+        return changed
+
+    def flush(self):
+        """ Blocks until pending checkpoints are written.
+
+        Raises:
+            Exception: The error of a failed write.
+        """
+        self._pending.join()
+        self._raise()
+
+    def close(self):
+        """ Writes pending checkpoints and stops the writer. Checkpoints can still be loaded, but no longer saved. """
+        if self._closed:
+            return
+        self._closed = True
+        self._pending.join()
+        self._pending.put((None, None, None))
+        self._thread.join()
+        self._raise()
+
+
+    ########## HELPERS ##########
+    def _run(self):
+        """ Background loop which writes queued snapshots. """
+        while True:
+            state, step, score = self._pending.get()
+            try:
+                if state is None and step is None:
+                    return
+                self._write(state, step, score)
+            except Exception as error:
+                self._error = error
+            finally:
+                self._pending.task_done()
+
+    def _write(self, state, step: int, score: float | None):
+        """ Writes a snapshot atomically, then deletes checkpoints no longer retained. """
+        path = os.path.join(self.directory, f'{self.prefix}_{step:08d}{self._extension}')
+        self._dump(state, path)
+
+        with self._lock:
+            checkpoints = [checkpoint for checkpoint in self._checkpoints if checkpoint['path'] != path]
+            checkpoints.append({'step': step, 'score': score, 'path': path})
+            checkpoints.sort(key=lambda checkpoint: checkpoint['step'])
+
+            # Retain the latest and best checkpoints
+            retained = {id(checkpoint) for checkpoint in checkpoints[-self.keep_last:]} if self.keep_last > 0 else set()
+            retained.update(id(checkpoint) for checkpoint in self._best(checkpoints, self.keep_best))
+            removed = [checkpoint['path'] for checkpoint in checkpoints if id(checkpoint) not in retained]
+            self._checkpoints = [checkpoint for checkpoint in checkpoints if id(checkpoint) in retained]
+            index = json.dumps(self._checkpoints)
+
+        # Index is replaced before deleting, so that it never lists deleted checkpoints
+        tmp_path = self._index_path+'.tmp'
+        with open(tmp_path, 'w') as file:
+            file.write(index)
+        os.replace(tmp_path, self._index_path)
+        for removed_path in removed:
+            try:
+                os.remove(removed_path)
+            except FileNotFoundError:
+                pass
+
+    def _dump(self, state, path: str):
+        """ Serializes a state to a temporary file, then atomically renames it to path. """
+        tmp_path = path+'.tmp'
+        with open(tmp_path, 'wb') as file:
+            if self._extension == '.pt':
+                import torch
+                torch.save(state, file)
+            else:
+                pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+    def _best(self, checkpoints: list[dict], n: int) -> list[dict]:
+        """ The n best scored checkpoints. """
+        if n <= 0:
+            return []
+        scored = [checkpoint for checkpoint in checkpoints if checkpoint['score'] is not None]
+        return sorted(scored, key=lambda checkpoint: checkpoint['score'], reverse=self.mode == 'max')[:n]
+
+    def _raise(self):
+        """ Raises the error of a failed write, once. """
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
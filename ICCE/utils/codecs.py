@@ -0,0 +1,139 @@
+from .enumerators import Compression
+
+import numpy as np
+import zlib
+
+class Codec:
+    """ Base class of a byte codec applied to a field of the wire format.
+
+    Codecs are stateful and instantiated once per field per ICCE, on both the Environment and the ICCE. Payloads must be
+    decoded in the same order as they were encoded. The Environment resets the codec whenever the ICCE did not decode the
+    previously encoded payload, e.g. as a response was lost, so that the next payload is decodable on its own.
+    """
+    def encode(self, payload: bytes) -> bytes:
+        """ Encodes the payload of a field. """
+        raise NotImplementedError('Functionality to encode a payload must be defined!')
+
+    def decode(self, payload: bytes) -> bytes:
+        """ Decodes the payload of a field. """
+        raise NotImplementedError('Functionality to decode a payload must be defined!')
+
+    def reset(self):
+        """ Discards the state of the codec, so that the next payload is encoded independently of previous payloads. """
+        pass
+
+
+class IdentityCodec(Codec):
+    """ Passes payloads through unchanged. """
+    def encode(self, payload: bytes) -> bytes:
+        return payload
+
+    def decode(self, payload: bytes) -> bytes:
+        return payload
+
+
+class ZlibCodec(Codec):
+    """ Compresses payloads with zlib.
+
+    Args:
+        level : The zlib compression level. Lower levels trade compression ratio for latency.
+    """
+    def __init__(self, level: int = 1):
+        self.level = level
+
+    def encode(self, payload: bytes) -> bytes:
+        return zlib.compress(payload, self.level)
+
+    def decode(self, payload: bytes) -> bytes:
+        return zlib.decompress(payload)
+
+
+class DeltaCodec(Codec):
+    """ Encodes payloads as the bytewise XOR against the payload of the previous tick.
+
+    Unchanged bytes are encoded as zeros, which are cheap to compress by an inner codec. Every payload is prefixed
+    with a one byte header marking it as a keyframe (raw payload) or a delta. Keyframes are sent for the first payload,
+    after a `reset()`, whenever the payload size changes, and every `keyframe_interval` payloads.
+
+    Args:
+        inner : The codec applied to the delta, e.g. `ZlibCodec`. Passes through if None.
+        keyframe_interval : The number of payloads between keyframes.
+    """
+    KEYFRAME = b'\x00'
+    DELTA = b'\x01'
+
+    def __init__(self, inner: Codec | None = None, keyframe_interval: int = 256):
+        self.inner = inner if inner is not None else IdentityCodec()
+        self.keyframe_interval = keyframe_interval
+        self._previous = None
+        self._n_since_keyframe = 0
+
+    def encode(self, payload: bytes) -> bytes:
+        previous = self._previous
+        self._previous = payload
+
+        # Keyframe
+        if previous is None or len(previous) != len(payload) or self._n_since_keyframe >= self.keyframe_interval:
+            self._n_since_keyframe = 0
+            return DeltaCodec.KEYFRAME + self.inner.encode(payload)
+
+        # Delta against previous payload
+        self._n_since_keyframe += 1
+        delta = np.bitwise_xor(np.frombuffer(payload, dtype=np.uint8), np.frombuffer(previous, dtype=np.uint8))
+        return DeltaCodec.DELTA + self.inner.encode(delta.tobytes())
+
+    def decode(self, payload: bytes) -> bytes:
+        header, body = payload[:1], self.inner.decode(payload[1:])
+
+        # Keyframe
+        if header == DeltaCodec.KEYFRAME:
+            self._previous = body
+            return body
+
+        # Delta against previous payload
+        if self._previous is None:
+            raise ValueError('Received a delta payload without a prior keyframe!')
+        self._previous = np.bitwise_xor(np.frombuffer(body, dtype=np.uint8), np.frombuffer(self._previous, dtype=np.uint8)).tobytes()
+        return self._previous
+
+    def reset(self):
+        self._previous = None
+
+
+# Registry of codec factories, keyed by the compression ID negotiated at handshake
+_CODECS = {
+    Compression.NONE: IdentityCodec,
+    Compression.ZLIB: ZlibCodec,
+    Compression.DELTA: DeltaCodec,
+    Compression.DELTA_ZLIB: lambda: DeltaCodec(inner=ZlibCodec()),
+}
+
+def register_codec(compression: int, factory):
+    """ Registers a codec factory under a compression ID.
+
+    Registered codecs can be negotiated by ICCEs during the handshake, allowing users to plug in their own codecs. The
+    same codec must be registered under the same ID on both the Environment and the ICCE.
+
+    Args:
+        compression : The compression ID of the codec.
+        factory : A callable taking no arguments which returns a new `Codec` instance.
+    """
+    _CODECS[compression] = factory
+
+def is_supported(compression: int) -> bool:
+    """ Checks if a codec is registered under the compression ID. """
+    return compression in _CODECS
+
+def create_codec(compression: int) -> Codec:
+    """ Instantiates the codec registered under the compression ID.
+
+    Args:
+        compression : The compression ID of the codec.
+
+    Returns:
+        A new instance of the codec.
+
+    Raises:
+        KeyError: If no codec is registered under the compression ID.
+    """
+    return _CODECS[compression]()
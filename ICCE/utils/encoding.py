@@ -0,0 +1,170 @@
+from .enumerators import DType
+
+import numpy as np
+import ast
+
+# Wire dtype -> NumPy dtype
+_NUMPY_DTYPES = {
+    DType.FLOAT64: np.dtype(np.float64),
+    DType.FLOAT32: np.dtype(np.float32),
+    DType.FLOAT16: np.dtype(np.float16),
+    DType.INT8: np.dtype(np.int8),
+}
+
+# Largest magnitude representable by a symmetric int8 quantization
+_INT8_MAX = 127.0
+
+def is_supported(dtype: int) -> bool:
+    """ Checks if a wire dtype is supported by the encoder.
+
+    Args:
+        dtype : The wire dtype, as sent in the handshake.
+
+    Returns:
+        True if the dtype can be encoded/decoded, False otherwise.
+    """
+    return dtype in _NUMPY_DTYPES
+
+def numpy_dtype(dtype: DType) -> np.dtype:
+    """ Retrieves the NumPy dtype used to decode a wire dtype.
+
+    Quantized dtypes are decoded into float32, every other dtype is decoded as-is.
+
+    Args:
+        dtype : The wire dtype.
+
+    Returns:
+        The NumPy dtype of the decoded array.
+    """
+    if dtype == DType.INT8:
+        return _NUMPY_DTYPES[DType.FLOAT32]
+    return _NUMPY_DTYPES[dtype]
+
+def encode(array: np.ndarray, dtype: DType) -> tuple[bytes, float]:
+    """ Encodes an array into bytes of the specified wire dtype.
+
+    Float dtypes are cast and serialized directly. INT8 is symmetrically quantized using the peak magnitude
+    of the array, NaNs are encoded as 0.
+
+    Args:
+        array : The array to encode.
+        dtype : The wire dtype to encode into.
+
+    Returns:
+        The encoded bytes and the quantization scale (1.0 for non-quantized dtypes).
+    """
+    if dtype == DType.INT8:
+        magnitude = np.abs(array)
+        peak = magnitude.max(initial=0.0)
+        # Exclude NaN/inf from the peak, only take the slow path if they are present
+        if not np.isfinite(peak):
+            peak = magnitude[np.isfinite(magnitude)].max(initial=0.0)
+        scale = float(peak) / _INT8_MAX if peak > 0 else 1.0
+
+        quantized = np.rint(array * (1.0 / scale))
+        np.clip(quantized, -_INT8_MAX, _INT8_MAX, out=quantized)
+        quantized[np.isnan(quantized)] = 0.0
+        return quantized.astype(np.int8).tobytes(), scale
+
+    return array.astype(_NUMPY_DTYPES[dtype], copy=False).tobytes(), 1.0
+
+def decode(buffer: bytes, dtype: DType, scale: float = 1.0, shape: tuple | None = None, out: np.ndarray | None = None) -> np.ndarray:
+    """ Decodes bytes of the specified wire dtype into an array.
+
+    Args:
+        buffer : The encoded bytes.
+        dtype : The wire dtype the bytes were encoded with.
+        scale : The quantization scale the bytes were encoded with.
+        shape : The shape of the decoded array. The array is left flat if None.
+        out : A preallocated array of the decoded dtype to decode into, instead of allocating a new array.
+
+    Returns:
+        The decoded array, `out` if specified.
+    """
+    array = np.frombuffer(buffer=buffer, dtype=_NUMPY_DTYPES[dtype])
+    if out is not None:
+        array = array.reshape(out.shape)
+        if dtype == DType.INT8:
+            np.multiply(array, np.float32(scale), out=out)
+        else:
+            np.copyto(out, array)
+        return out
+
+    if dtype == DType.INT8:
+        array = array.astype(np.float32) * np.float32(scale)
+    if shape is not None:
+        array = array.reshape(shape)
+    return array
+
+
+class Encoder:
+    """ Encodes arrays of a fixed shape into a wire dtype, reusing preallocated buffers.
+
+    Equivalent to `encode()`, but casts and quantizes into buffers allocated once, so that encoding on the per-tick path
+    only allocates the encoded bytes.
+
+    Args:
+        dtype : The wire dtype to encode into.
+        shape : The shape of the arrays to encode.
+    """
+    def __init__(self, dtype: DType, shape: tuple):
+        self.dtype = DType(dtype)
+        self._wire = np.empty(shape=shape, dtype=_NUMPY_DTYPES[self.dtype])
+        # Quantization is computed in float64, as in encode()
+        self._scratch = np.empty(shape=shape, dtype=np.float64) if self.dtype == DType.INT8 else None
+
+    def __call__(self, array: np.ndarray) -> tuple[bytes, float]:
+        """ Encodes an array into bytes of the wire dtype.
+
+        Args:
+            array : The array to encode. Arrays of another shape but the same size are reshaped.
+
+        Returns:
+            The encoded bytes and the quantization scale (1.0 for non-quantized dtypes).
+        """
+        if array.shape != self._wire.shape:
+            array = array.reshape(self._wire.shape)
+
+        if self.dtype == DType.INT8:
+            # Peak magnitude without an intermediate |array|, NaN/inf propagate to the slow path
+            peak = max(float(array.max(initial=0.0)), -float(array.min(initial=0.0)))
+            finite = np.isfinite(peak)
+            if not finite:
+                magnitude = np.abs(array)
+                peak = float(magnitude[np.isfinite(magnitude)].max(initial=0.0))
+            scale = peak / _INT8_MAX if peak > 0 else 1.0
+
+            np.multiply(array, 1.0 / scale, out=self._scratch)
+            np.rint(self._scratch, out=self._scratch)
+            np.clip(self._scratch, -_INT8_MAX, _INT8_MAX, out=self._scratch)
+            if not finite:
+                self._scratch[np.isnan(self._scratch)] = 0.0
+            np.copyto(self._wire, self._scratch, casting='unsafe')
+            return self._wire.tobytes(), scale
+
+        if array.dtype == self._wire.dtype:
+            return array.tobytes(), 1.0
+        np.copyto(self._wire, array, casting='same_kind')
+        return self._wire.tobytes(), 1.0
+
+def dtype_to_schema(dtype: np.dtype) -> str:
+    """ Serializes a (structured) NumPy dtype into a schema string.
+
+    Args:
+        dtype : The dtype to serialize.
+
+    Returns:
+        The schema string, which can be deserialized using `schema_to_dtype()`.
+    """
+    return repr(np.lib.format.dtype_to_descr(np.dtype(dtype)))
+
+def schema_to_dtype(schema: str) -> np.dtype:
+    """ Deserializes a schema string into a NumPy dtype.
+
+    Args:
+        schema : The schema string, as returned by `dtype_to_schema()`.
+
+    Returns:
+        The NumPy dtype described by the schema.
+    """
+    return np.lib.format.descr_to_dtype(ast.literal_eval(schema))
@@ -10,4 +10,27 @@ class Status(IntEnum):
     OBSERVATION_SIZE_ERROR = -1,
     ACTION_SIZE_ERROR = -2,
     ICCE_ID_ERROR = -3,
-    AGENT_ID_ERROR = -4
+    AGENT_ID_ERROR = -4,
+    DTYPE_ERROR = -5,
+    STALE_ACTION_ERROR = -6,
+    INFERENCE_ERROR = -7,
+    PROFILE_ERROR = -8,
+    PERMISSION_ERROR = -9
+
+class DType(IntEnum):
+    UNSPECIFIED = 0,
+    FLOAT64 = 1,
+    FLOAT32 = 2,
+    FLOAT16 = 3,
+    INT8 = 4
+
+class Compression(IntEnum):
+    NONE = 0,
+    ZLIB = 1,
+    DELTA = 2,
+    DELTA_ZLIB = 3
+
+class Matchmaking(IntEnum):
+    LATEST = 0,
+    HISTORICAL = 1,
+    ELO = 2
\ No newline at end of file
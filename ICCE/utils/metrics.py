@@ -0,0 +1,217 @@
+import bisect
+import json
+import os
+import threading
+import time
+
+# Default histogram buckets, in seconds
+LATENCY_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+# Default histogram buckets, in ticks
+LENGTH_BUCKETS = tuple(2**i for i in range(4, 21))
+
+class Counter:
+    """ Monotonically increasing metric. """
+    kind = 'counter'
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> float:
+        return self.value
+
+
+class Gauge:
+    """ Metric which can arbitrarily go up and down. """
+    kind = 'gauge'
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def snapshot(self) -> float:
+        return self.value
+
+
+class Histogram:
+    """ Metric counting observations into cumulative buckets.
+
+    Args:
+        buckets : The upper bounds of the buckets, in increasing order. An implicit `+Inf` bucket is appended.
+    """
+    kind = 'histogram'
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative, buckets = 0, {}
+        for bound, n in zip((*self.buckets, float('inf')), counts):
+            cumulative += n
+            buckets[repr(bound) if bound != float('inf') else '+Inf'] = cumulative
+        return {'buckets': buckets, 'sum': total, 'count': count}
+
+
+class MetricsRegistry:
+    """ Registry of the metrics of an Environment or ICCE.
+
+    Metrics are identified by name and optional labels, and created on first use. The registry can be scraped in the
+    Prometheus text format over HTTP using `serve()`, and periodically written as JSON snapshots using `start_snapshots()`.
+
+    Interfaces only instrument their hot paths if a registry is attached, so that metrics have no overhead when disabled.
+    """
+    def __init__(self):
+        # {name: (kind, help, {labels: metric})}
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._snapshot_thread = None
+        self._stop = threading.Event()
+
+    def counter(self, name: str, help: str = '', **labels) -> Counter:
+        """ Retrieves or creates a counter. """
+        return self._get(Counter.kind, Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str = '', **labels) -> Gauge:
+        """ Retrieves or creates a gauge. """
+        return self._get(Gauge.kind, Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str = '', buckets: tuple = LATENCY_BUCKETS, **labels) -> Histogram:
+        """ Retrieves or creates a histogram. """
+        return self._get(Histogram.kind, lambda: Histogram(buckets), name, help, labels)
+
+    def snapshot(self) -> dict:
+        """ Returns the current value of every metric, keyed by name and then by labels. """
+        with self._lock:
+            metrics = {name: (help, dict(series)) for name, (_, help, series) in self._metrics.items()}
+        return {
+            name: {_format_labels(labels): metric.snapshot() for labels, metric in series.items()}
+            for name, (_, series) in metrics.items()
+        }
+
+    def to_prometheus(self) -> str:
+        """ Renders every metric in the Prometheus text exposition format. """
+        with self._lock:
+            metrics = {name: (kind, help, dict(series)) for name, (kind, help, series) in self._metrics.items()}
+
+        lines = []
+        for name, (kind, help, series) in metrics.items():
+            if help:
+                lines.append(f'# HELP {name} {help}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, metric in series.items():
+                if kind != 'histogram':
+                    lines.append(f'{name}{_format_labels(labels)} {metric.snapshot()}')
+                    continue
+                snapshot = metric.snapshot()
+                for bound, count in snapshot['buckets'].items():
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", bound),))} {count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {snapshot["sum"]}')
+                lines.append(f'{name}_count{_format_labels(labels)} {snapshot["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int, ip_addr: str = 'localhost'):
+        """ Serves the metrics over HTTP on a background thread.
+
+        `/metrics` renders the Prometheus text format, and `/metrics.json` the JSON snapshot.
+
+        Args:
+            port : The port to listen on.
+            ip_addr : The IP address to listen on.
+        """
+        import http.server # Only imported by processes serving metrics
+        registry = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = registry.to_prometheus().encode(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = json.dumps(registry.snapshot()).encode(), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer((ip_addr, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def start_snapshots(self, path: str, interval_seconds: float = 10.0):
+        """ Periodically writes JSON snapshots of the metrics on a background thread.
+
+        Snapshots are written to a temporary file and atomically renamed, so that readers never see a partial snapshot.
+
+        Args:
+            path : The path of the snapshot file.
+            interval_seconds : The interval between snapshots.
+        """
+        def write():
+            while not self._stop.wait(timeout=interval_seconds):
+                self.write_snapshot(path)
+
+        self._snapshot_thread = threading.Thread(target=write, daemon=True)
+        self._snapshot_thread.start()
+
+    def write_snapshot(self, path: str):
+        """ Writes a JSON snapshot of the metrics, timestamped in seconds since the epoch. """
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'time': time.time(), 'metrics': self.snapshot()}, f)
+        os.replace(tmp_path, path)
+
+    def shutdown(self):
+        """ Stops serving the metrics and writing snapshots. """
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _get(self, kind: str, factory, name: str, help: str, labels: dict):
+        """ Helper func to retrieve or create the metric of a name and labels. """
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            _, _, series = self._metrics.setdefault(name, (kind, help, {}))
+            if key not in series:
+                series[key] = factory()
+            return series[key]
+
+def _format_labels(labels: tuple) -> str:
+    """ Helper func to format labels as `{key="value",...}`. """
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
@@ -0,0 +1,118 @@
+import collections
+import io
+import marshal
+import sys
+import threading
+import time
+
+class SamplingProfiler:
+    """ Low-overhead sampling profiler of all threads of a running process.
+
+    The stacks of every thread but the profiling thread are sampled at a fixed interval, so that a process can be profiled
+    without being restarted or interrupted. Samples are aggregated into pstats-compatible stats, where the time of a function
+    is estimated as the interval times the number of samples it was on the stack.
+
+    Args:
+        interval_seconds : The interval between samples.
+    """
+    def __init__(self, interval_seconds: float = 0.001):
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """ Whether a profile is being recorded. """
+        return self._lock.locked()
+
+    def profile(self, seconds: float, interval_seconds: float | None = None) -> dict | None:
+        """ Samples all other threads for the specified duration, blocking the calling thread.
+
+        Args:
+            seconds : The duration to profile for.
+            interval_seconds : The interval between samples. Defaults to the interval of the profiler.
+
+        Returns:
+            The stats in the pstats format, keyed by (filename, line, function), or None if a profile is already being recorded.
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            return self._profile(seconds, interval_seconds or self.interval_seconds)
+        finally:
+            self._lock.release()
+
+    def _profile(self, seconds: float, interval_seconds: float) -> dict:
+        """ Helper func to sample and aggregate the stacks of all other threads. """
+        self_time = collections.Counter()
+        cum_time = collections.Counter()
+        n_samples = collections.Counter()
+        callers = collections.defaultdict(collections.Counter)
+
+        own_thread = threading.get_ident()
+        end = time.perf_counter() + seconds
+        previous = time.perf_counter()
+        while True:
+            time.sleep(interval_seconds)
+            now = time.perf_counter()
+            elapsed, previous = now - previous, now
+
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                # Walk the stack from leaf to root
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                self_time[stack[0]] += elapsed
+                for func in set(stack):
+                    cum_time[func] += elapsed
+                    n_samples[func] += 1
+                for callee, caller in zip(stack, stack[1:]):
+                    callers[callee][caller] += elapsed
+
+            if now >= end:
+                break
+
+        return {
+            func: (n_samples[func], n_samples[func], self_time[func], cum_time[func],
+                   {caller: (1, 1, t, t) for caller, t in callers[func].items()})
+            for func in cum_time
+        }
+
+
+class _Stats:
+    """ Adapts a stats dict to the interface loaded by `pstats.Stats`. """
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def dumps(stats: dict) -> bytes:
+    """ Serializes stats in the pstats dump format, loadable with `pstats.Stats(path)` once written to a file. """
+    return marshal.dumps(stats)
+
+def loads(buffer: bytes) -> 'pstats.Stats':
+    """ Deserializes stats dumped by `dumps()` into a `pstats.Stats`. """
+    import pstats # Only imported by processes reading profiles
+    return pstats.Stats(_Stats(marshal.loads(buffer)))
+
+def format_stats(buffer: bytes, sort_by: str = 'cumulative', limit: int = 30) -> str:
+    """ Formats the hottest functions of dumped stats as a table.
+
+    Args:
+        buffer : The stats dumped by `dumps()`.
+        sort_by : The pstats sort key, e.g. 'cumulative' or 'tottime'.
+        limit : The number of functions to list.
+
+    Returns:
+        The formatted table.
+    """
+    stream = io.StringIO()
+    stats = loads(buffer)
+    stats.stream = stream
+    stats.sort_stats(sort_by).print_stats(limit)
+    return stream.getvalue()
@@ -0,0 +1,122 @@
+import collections
+import contextlib
+import json
+import os
+import threading
+import time
+
+# gRPC metadata key propagating the trace ID of a step from the ICCE to the Environment
+TRACE_METADATA_KEY = 'icce-trace-id'
+
+# Span which records nothing, used when tracing is disabled
+NULL_SPAN = contextlib.nullcontext()
+
+def trace_id(icce_id: int, tick: int) -> int:
+    """ Computes the trace ID of a step, correlating the spans of an ICCE and Environment for an ICCE and tick. """
+    return (icce_id & 0xFFFF) << 48 | (tick & 0xFFFFFFFFFFFF)
+
+
+class _Span:
+    """ Context manager recording a span into the ring buffer of a tracer. """
+    __slots__ = ('tracer', 'name', 'trace_id', 'flow_start', 'flow_end', 'start', 'previous')
+
+    def __init__(self, tracer, name, trace_id, flow_start, flow_end):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.flow_start = flow_start
+        self.flow_end = flow_end
+
+    def __enter__(self):
+        # Nested spans inherit the trace ID of the enclosing span
+        local = self.tracer._local
+        self.previous = getattr(local, 'trace_id', None)
+        if self.trace_id is None:
+            self.trace_id = self.previous
+        local.trace_id = self.trace_id
+        self.start = time.time_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.time_ns()
+        self.tracer._local.trace_id = self.previous
+        self.tracer._record(self, end)
+        return False
+
+
+class Tracer:
+    """ Records spans into a ring buffer, flushed as Chrome trace (Perfetto) JSON.
+
+    Spans are timestamped with the wall clock so that the traces of the ICCEs and Environment, flushed by each process,
+    can be merged into a single timeline using `merge_traces()`. Spans of a step are tagged with its trace ID, which the
+    ICCE propagates to the Environment through gRPC metadata, and RPCs are linked across processes by flow events.
+
+    Args:
+        process_name : The name of the process in the timeline.
+        capacity : The number of events retained. Older events are overwritten.
+    """
+    def __init__(self, process_name: str, capacity: int = 1 << 16):
+        self.process_name = process_name
+        self._pid = os.getpid()
+        self._events = collections.deque(maxlen=capacity)
+        self._local = threading.local()
+
+    def span(self, name: str, trace_id: int | None = None, flow_start: str | None = None, flow_end: str | None = None) -> _Span:
+        """ Creates a span, recorded when its context exits.
+
+        Args:
+            name : The name of the span.
+            trace_id : The trace ID of the step. Inherited from the enclosing span if None.
+            flow_start : Starts a flow of this category from the span, e.g. on the ICCE side of an RPC.
+            flow_end : Ends a flow of this category at the span, e.g. on the Environment side of an RPC.
+
+        Returns:
+            The span, to be used as a context manager.
+        """
+        return _Span(self, name, trace_id, flow_start, flow_end)
+
+    def flush(self, path: str):
+        """ Writes the buffered events as Chrome trace JSON.
+
+        The trace is written to a temporary file and atomically renamed. Events are retained, so that the trace can be
+        flushed again later.
+
+        Args:
+            path : The path of the trace file.
+        """
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'args': {'name': self.process_name}}]
+        events.extend(list(self._events))
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        os.replace(tmp_path, path)
+
+    def _record(self, span: _Span, end: int):
+        """ Helper func to append the events of a completed span to the ring buffer. """
+        ts = span.start / 1000.0
+        tid = threading.get_ident()
+        event = {'name': span.name, 'ph': 'X', 'ts': ts, 'dur': (end - span.start) / 1000.0, 'pid': self._pid, 'tid': tid}
+        if span.trace_id is not None:
+            event['args'] = {'trace_id': span.trace_id}
+        self._events.append(event)
+
+        # Flow events bind to the enclosing span, linking both sides of an RPC
+        if span.trace_id is not None and span.flow_start is not None:
+            self._events.append({'name': span.flow_start, 'cat': span.flow_start, 'ph': 's', 'id': span.trace_id, 'ts': ts, 'pid': self._pid, 'tid': tid})
+        if span.trace_id is not None and span.flow_end is not None:
+            self._events.append({'name': span.flow_end, 'cat': span.flow_end, 'ph': 'f', 'bp': 'e', 'id': span.trace_id, 'ts': ts, 'pid': self._pid, 'tid': tid})
+
+
+def merge_traces(paths: list[str], path: str):
+    """ Merges the Chrome trace JSON flushed by many processes into a single timeline.
+
+    Args:
+        paths : The paths of the traces to merge.
+        path : The path of the merged trace.
+    """
+    events = []
+    for trace_path in paths:
+        with open(trace_path) as f:
+            events.extend(json.load(f)['traceEvents'])
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
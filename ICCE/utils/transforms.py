@@ -0,0 +1,149 @@
+import numpy as np
+
+class Transform:
+    """ Base class of a vectorized observation transform applied by the Environment.
+
+    Transforms are applied once per tick to the observations of all agents, shaped `(n_agents, *observation_shape)`,
+    so that ICCEs receive ready-to-use observations. Transforms are chained in a pipeline, each writing into an output
+    buffer preallocated by the Environment, so that the observations sampled from the Simulation are left unmodified.
+    """
+    def output_shape(self, shape: tuple) -> tuple:
+        """ Returns the shape of an agent's observation after the transform, given the shape before it. """
+        return shape
+
+    def setup(self, n_agents: int, shape: tuple):
+        """ Allocates the state of the transform, given the number of agents and the shape of an agent's observation. """
+        pass
+
+    def reset(self):
+        """ Resets the per-episode state of the transform. """
+        pass
+
+    def __call__(self, observations: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """ Transforms the observations of all agents into out, shaped `(n_agents, *output_shape)`, without modifying observations.
+
+        Returns:
+            out
+        """
+        raise NotImplementedError('Functionality to transform observations must be defined!')
+
+
+class NanToNum(Transform):
+    """ Replaces NaN and infinite values.
+
+    Args:
+        nan : The value replacing NaN.
+        posinf : The value replacing positive infinity. Defaults to the largest finite value.
+        neginf : The value replacing negative infinity. Defaults to the smallest finite value.
+    """
+    def __init__(self, nan: float = 0.0, posinf: float | None = None, neginf: float | None = None):
+        self.nan = nan
+        self.posinf = posinf
+        self.neginf = neginf
+
+    def __call__(self, observations: np.ndarray, out: np.ndarray) -> np.ndarray:
+        np.copyto(out, observations)
+        return np.nan_to_num(out, copy=False, nan=self.nan, posinf=self.posinf, neginf=self.neginf)
+
+
+class Clip(Transform):
+    """ Clips observations to a range.
+
+    Args:
+        low : The lower bound.
+        high : The upper bound.
+    """
+    def __init__(self, low: float, high: float):
+        self.low = low
+        self.high = high
+
+    def __call__(self, observations: np.ndarray, out: np.ndarray) -> np.ndarray:
+        return np.clip(observations, self.low, self.high, out=out)
+
+
+class RunningNormalize(Transform):
+    """ Normalizes observations by the running mean and variance of each feature.
+
+    Statistics are updated in place with the observations of all agents every tick, and persist across episodes.
+
+    Args:
+        epsilon : Added to the variance for numerical stability.
+        update : Whether the statistics are updated. Disable to freeze the statistics, e.g. for evaluation.
+    """
+    def __init__(self, epsilon: float = 1e-8, update: bool = True):
+        self.epsilon = epsilon
+        self.update = update
+        self.count = 0
+        self.mean: np.ndarray
+        self.var: np.ndarray
+
+    def setup(self, n_agents: int, shape: tuple):
+        self.count = 0
+        self.mean = np.zeros(shape=shape, dtype=np.float64)
+        self.var = np.ones(shape=shape, dtype=np.float64)
+        self._std = np.ones(shape=shape, dtype=np.float64)
+        self._batch_mean = np.zeros(shape=shape, dtype=np.float64)
+        self._batch_var = np.zeros(shape=shape, dtype=np.float64)
+
+    def __call__(self, observations: np.ndarray, out: np.ndarray) -> np.ndarray:
+        if self.update:
+            # Batch statistics, using out as scratch for the squared deviations
+            n = observations.shape[0]
+            np.mean(observations, axis=0, out=self._batch_mean)
+            np.subtract(observations, self._batch_mean, out=out)
+            np.square(out, out=out)
+            np.mean(out, axis=0, out=self._batch_var)
+
+            # Merge batch statistics into running statistics (parallel variance algorithm)
+            total = self.count + n
+            delta = self._batch_mean
+            delta -= self.mean
+            self.var *= self.count / total
+            self._batch_var *= n / total
+            self.var += self._batch_var
+            np.square(delta, out=self._batch_var)
+            self._batch_var *= self.count * n / total**2
+            self.var += self._batch_var
+            delta *= n / total
+            self.mean += delta
+            self.count = total
+            np.add(self.var, self.epsilon, out=self._std)
+            np.sqrt(self._std, out=self._std)
+
+        np.subtract(observations, self.mean, out=out)
+        out /= self._std
+        return out
+
+
+class FrameStack(Transform):
+    """ Stacks the latest observations of each agent, oldest first, along a new leading axis.
+
+    Frames are stored in a ring buffer so that only the newest frame is copied every tick. On the first tick of an
+    episode, all frames are filled with the first observation.
+
+    Args:
+        n_frames : The number of stacked frames.
+    """
+    def __init__(self, n_frames: int):
+        self.n_frames = n_frames
+
+    def output_shape(self, shape: tuple) -> tuple:
+        return (self.n_frames, *shape)
+
+    def setup(self, n_agents: int, shape: tuple):
+        self._frames = np.zeros(shape=(n_agents, self.n_frames, *shape), dtype=np.float64)
+        # Order of ring buffer slots, oldest first, for each position of the newest frame
+        self._orders = [np.roll(np.arange(self.n_frames), -(newest + 1)) for newest in range(self.n_frames)]
+        self._newest = -1
+
+    def reset(self):
+        self._newest = -1
+
+    def __call__(self, observations: np.ndarray, out: np.ndarray) -> np.ndarray:
+        if self._newest < 0:
+            self._frames[:] = observations[:, None]
+            self._newest = 0
+        else:
+            self._newest = (self._newest + 1) % self.n_frames
+            self._frames[:, self._newest] = observations
+        return np.take(self._frames, self._orders[self._newest], axis=1, out=out)
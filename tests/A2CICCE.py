@@ -1,4 +1,6 @@
 from ICCE.interfaces import ICCEInterface
+from ICCE.utils import DType, CheckpointManager
+from ICCE.algorithms import discounted_returns, actor_critic_loss
 
 import numpy as np
 from collections import namedtuple
@@ -42,17 +44,18 @@ class Policy(nn.Module):
         return action_prob, state_values
 
 class A2CICCE(ICCEInterface):
-    def __init__(self):
-        super().__init__(frequency_hz=60)
+    def __init__(self, checkpoint='models/a2c_18_mar_24_E10k', frequency_hz=60, **kwargs):
+        super().__init__(frequency_hz=frequency_hz, **kwargs)
         self.n_observations = 30
         self.n_actions = 4
+        self.observation_dtype = DType.FLOAT32 # Policy runs in float32
 
         # Instantiate model and optimizer
         self.model = Policy(self.n_observations, 2**5, 128)
         self.optimizer = optim.Adam(self.model.parameters(), lr=3e-2)
         self.loss = None
         # Load from checkpoint
-        checkpoint = torch.load('models/a2c_18_mar_24_E10k')
+        checkpoint = torch.load(checkpoint)
         self.model.load_state_dict(checkpoint['model_state_dict'])
         self.optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
         self.loss = checkpoint['loss']
@@ -67,8 +70,11 @@ class A2CICCE(ICCEInterface):
         self.i_episode = 0
         self.all_returns = []
 
-        # Set as training mode
-        self.model.train()
+        # Checkpoints are written in the background, keeping the 3 latest and the best running reward
+        self.checkpoints = CheckpointManager('models/a2c', keep_last=3, keep_best=1) if not self.evaluate else None
+
+        # Set as training mode, or inference mode if evaluated
+        self.model.train(not self.evaluate)
 
     def post_sample(self, observation: np.ndarray, reward: float):
         self.model.rewards.append(reward)
@@ -83,11 +89,13 @@ class A2CICCE(ICCEInterface):
         print(f'Episode {self.i_episode}\tLast reward: {self.ep_reward}\tAverage reward: {self.running_reward}')
         
         if self.i_episode == 999:
-            torch.save({
-                'model_state_dict': self.model.state_dict(),
-                'optimizer_state_dict': self.optimizer.state_dict(),
-                'loss': self.loss,
-            }, 'a2c_22_mar_24_E1000')
+            # Evaluated ICCEs do not write checkpoints
+            if self.checkpoints is not None:
+                self.checkpoints.save({
+                    'model_state_dict': self.model.state_dict(),
+                    'optimizer_state_dict': self.optimizer.state_dict(),
+                    'loss': self.loss,
+                }, step=self.i_episode, score=self.running_reward)
 
             csv_file = "a2c_22_mar_24_returns_E1000.csv"
             with open(csv_file, 'w', newline='') as file:
@@ -99,10 +107,15 @@ class A2CICCE(ICCEInterface):
         self.i_episode += 1
         self.ep_reward = 10
 
+    def episode_score(self) -> float:
+        # The final reward of a dogfight is positive for the agent which downed its opponent, a timeout is a draw
+        if self.term:
+            return 1.0 if self.reward > 0 else 0.0
+        return 0.5
 
     def act(self, observation: np.ndarray) -> np.ndarray:
         # Use policy to select discrete action
-        discrete_action = self.select_action(observation.astype(dtype=np.float32))
+        discrete_action = self.select_action(observation)
 
         # output action
         action = np.zeros(shape=(4), dtype=np.float32)
@@ -134,43 +147,25 @@ class A2CICCE(ICCEInterface):
         # Sample it using the distribution
         action = m.sample()
 
-        # Save the chosen action to action buffer
-        self.model.saved_actions.append(SavedAction(m.log_prob(action), state_value))
+        # Save the chosen action to action buffer, to learn from at the end of the episode
+        if not self.evaluate:
+            self.model.saved_actions.append(SavedAction(m.log_prob(action), state_value))
 
         # The actual action to take (one of 32 combinations)
         return action.item()
     
     def finish_episode(self):
         """ Training code. Calculates actor and critic loss and performs backprop. """
-        R = 0
-        saved_actions = self.model.saved_actions
-        policy_losses = [] # list to save actor loss (policy)
-        value_losses = [] # list to save critic loss (value)
-        returns = [] # list to save the true values
-
         # Calculate the true value using rewards returned by the environment
-        for r in self.model.rewards[::-1]:
-            # Calculate discounted reward
-            R = r + self.GAMMA * R
-            returns.insert(0, R)
-
-        returns = torch.tensor(returns)
-        returns = (returns - returns.mean()) / (returns.std() + self.eps)
-
-        for (log_prob, value), R in zip(saved_actions, returns):
-            advantage = R - value.item()
-
-            # calculate actor loss
-            policy_losses.append(-log_prob * advantage)
+        returns = discounted_returns(self.model.rewards, self.GAMMA)
 
-            # calculate critic loss using L1 smooth loss
-            value_losses.append(F.smooth_l1_loss(value, torch.tensor([R])))
+        # Actor loss and critic loss (smooth L1) over the normalized returns, summed over the episode
+        log_probs, values = zip(*self.model.saved_actions)
 
         # reset gradients
         self.optimizer.zero_grad()
 
-        # sum all policy_losses and value_losses
-        self.loss = torch.stack(policy_losses).sum() + torch.stack(value_losses).sum()
+        self.loss, _, _ = actor_critic_loss(log_probs, values, returns, normalize=True, eps=self.eps)
 
         # backprop
         self.loss.backward()
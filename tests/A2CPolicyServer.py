@@ -0,0 +1,41 @@
+from ICCE.interfaces import PolicyServerInterface
+from A2CICCE import Policy
+
+import numpy as np
+import torch
+from torch.distributions import Categorical
+
+class A2CPolicyServer(PolicyServerInterface):
+    def __init__(self):
+        super().__init__(max_batch_size=32, batch_window_seconds=0.002)
+        self.n_observation = 30
+        self.n_action = 4
+
+        # Load ONE copy of the model, shared by all ICCE clients
+        self.model = Policy(self.n_observation, 2**5, 128)
+        checkpoint = torch.load('models/a2c_18_mar_24_E10k')
+        self.model.load_state_dict(checkpoint['model_state_dict'])
+        self.model.eval()
+
+        # Bits of the discrete action -> (action index, value)
+        self.action_map = [(0, -1.0), (0, 1.0), (1, 1.0), (1, -1.0), (3, 1.0)]
+
+    def infer(self, observations: np.ndarray) -> np.ndarray:
+        # Single batched forward pass
+        with torch.no_grad():
+            probs, _ = self.model(torch.from_numpy(observations))
+            discrete_actions = Categorical(probs).sample().numpy()
+
+        # Map discrete actions to continuous actions
+        actions = np.zeros(shape=(len(observations), self.n_action), dtype=np.float32)
+        for bit, (index, value) in enumerate(self.action_map):
+            actions[(discrete_actions & (1 << bit)) != 0, index] = value
+        return actions
+
+
+def main():
+    server = A2CPolicyServer()
+    server.run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+from ICCE.algorithms import discounted_returns, gae, n_step_targets
+
+import numpy as np
+import timeit
+
+N_STEPS = 10000
+N_ITERATIONS = 10
+GAMMA = 0.99
+LMBDA = 0.95
+N = 5
+
+def loop_returns(rewards: list[float]) -> list[float]:
+    """ Discounted returns as built in A2CICCE.finish_episode(). """
+    R = 0
+    returns = []
+    for r in rewards[::-1]:
+        R = r + GAMMA * R
+        returns.insert(0, R)
+    return returns
+
+def loop_gae(rewards: list[float], values: list[float]) -> list[float]:
+    """ GAE computed one step at a time. """
+    advantages = [0.0] * len(rewards)
+    advantage = 0.0
+    for t in reversed(range(len(rewards))):
+        next_value = values[t + 1] if t + 1 < len(rewards) else 0.0
+        delta = rewards[t] + GAMMA * next_value - values[t]
+        advantage = delta + GAMMA * LMBDA * advantage
+        advantages[t] = advantage
+    return advantages
+
+def loop_n_step_targets(rewards: list[float], values: list[float]) -> list[float]:
+    """ n-step targets computed one step at a time. """
+    T = len(rewards)
+    targets = []
+    for t in range(T):
+        G = sum(GAMMA**k * rewards[t + k] for k in range(min(N, T - t)))
+        if t + N < T:
+            G += GAMMA**N * values[t + N]
+        targets.append(G)
+    return targets
+
+def benchmark(name: str, loop, vectorized):
+    """ Measures the time of a loop and vectorized kernel, and checks they agree. """
+    assert np.allclose(loop(), vectorized())
+    loop_ms = timeit.timeit(loop, number=N_ITERATIONS) / N_ITERATIONS * 1e3
+    vectorized_ms = timeit.timeit(vectorized, number=N_ITERATIONS) / N_ITERATIONS * 1e3
+    print(f'{name:<18}{loop_ms:>12.2f}{vectorized_ms:>16.3f}{loop_ms / vectorized_ms:>10.0f}x')
+
+def main():
+    rng = np.random.default_rng(seed=0)
+    rewards = rng.normal(size=N_STEPS)
+    values = rng.normal(size=N_STEPS)
+    rewards_list, values_list = rewards.tolist(), values.tolist()
+
+    print(f'{N_STEPS} step episode')
+    print(f'{"kernel":<18}{"loop (ms)":>12}{"vectorized (ms)":>16}{"speedup":>11}')
+    benchmark('discounted return', lambda: loop_returns(rewards_list), lambda: discounted_returns(rewards, GAMMA))
+    benchmark('GAE', lambda: loop_gae(rewards_list, values_list), lambda: gae(rewards, values, GAMMA, LMBDA)[0])
+    benchmark(f'{N}-step target', lambda: loop_n_step_targets(rewards_list, values_list), lambda: n_step_targets(rewards, values, GAMMA, N))
+
+if __name__ == '__main__':
+    main()
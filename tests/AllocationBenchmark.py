@@ -0,0 +1,157 @@
+from ICCE.interfaces import EnvironmentInterface, ICCEInterface
+from ICCE.utils import DType
+from ICCE.grpc_interfaces import Environment_pb2
+
+import numpy as np
+import gc
+import threading
+import time
+import tracemalloc
+
+OBSERVATION_SIZES = (30, 4096)
+N_ACTIONS = 4
+N_WARMUP_STEPS = 1000
+N_STEPS = 5000
+PORT = 50071
+
+# Blocks allocated per step which are never freed. Objects in flight when measuring are bounded, so amortize to ~0
+MAX_NET_BLOCKS_PER_STEP = 0.05 # Allocated by ICCE
+MAX_TOTAL_NET_BLOCKS_PER_STEP = 0.1 # Allocated by ICCE, gRPC and protobuf
+
+class BenchmarkEnvironment(EnvironmentInterface):
+    """ Environment whose simulation is free, so that only the per-tick path of the framework is measured. """
+    def __init__(self, n_observation: int, port: int):
+        super().__init__(frequency_hz=1000, max_episodes=1, port=port, heartbeat_timeout_seconds=None)
+        self.n_observation = n_observation
+        self.n_action = N_ACTIONS
+        self.info_dtype = [('hits', np.int32), ('fuel', np.float32)]
+        self.done = False
+        self._observation = np.linspace(-1.0, 1.0, n_observation)
+
+    def reset(self):
+        return True
+
+    def sample(self, agent_id):
+        return self._observation, 1.0, self.done, False, (1, 0.5)
+
+    def act(self, agent_id, action):
+        pass
+
+    def _wait(self, time_seconds, description=None):
+        pass
+
+
+class BenchmarkICCE(ICCEInterface):
+    def __init__(self, n_observation: int, observation_dtype: DType, port: int):
+        super().__init__(port=port, heartbeat_seconds=None)
+        self.n_observations = n_observation
+        self.n_actions = N_ACTIONS
+        self.observation_dtype = observation_dtype
+        self._action = np.zeros(shape=N_ACTIONS, dtype=np.float32)
+
+    def act(self, observation):
+        return self._action
+
+    def post_sample(self, observation, reward):
+        pass
+
+    def post_episode(self):
+        pass
+
+    def step(self):
+        """ The per-tick path of the control loop: act, then sample. """
+        self._act()
+        self._sample()
+
+
+class LoopbackEndpoint:
+    """ Invokes the servicer of the Environment in-process, so that the per-tick path of ICCE is measured without gRPC. """
+    def __init__(self, servicer):
+        self._servicer = servicer
+        self._request = Environment_pb2.SampleRequest()
+
+    def sample(self, id: int, base_tick: int = 0, session: int = 0, metadata=None):
+        self._request.id = id
+        self._request.base_tick = base_tick
+        self._request.session = session
+        return Environment_pb2.SampleResponse.FromString(self._servicer.sample(self._request, None))
+
+    def act(self, id: int, action: bytes, action_scale: float = 1.0, tick: int = 0, session: int = 0, metadata=None):
+        request = Environment_pb2.ActionRequest(id=id, action=action, action_scale=action_scale, tick=tick, session=session)
+        return self._servicer.act(request, None)
+
+    def close(self):
+        pass
+
+
+def benchmark(icce: BenchmarkICCE):
+    """ Measures the time, allocations and garbage collections of the per-tick path of an ICCE and the Environment.
+
+    Returns:
+        The time per step (us), the peak memory allocated within a step and freed by its end (bytes), the blocks allocated by
+        ICCE and in total which are never freed (per step), and the number of garbage collections.
+    """
+    for _ in range(N_WARMUP_STEPS):
+        icce.step()
+
+    collections = [0]
+    def count_collections(phase, info):
+        if phase == 'start':
+            collections[0] += 1
+    gc.callbacks.append(count_collections)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+
+    elapsed, transient = 0.0, 0
+    for _ in range(N_STEPS):
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        icce.step()
+        elapsed += time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        transient += peak - current
+
+    # Let the server threads finish serving the last RPCs, so that objects in flight are not counted
+    time.sleep(0.1)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    gc.callbacks.remove(count_collections)
+
+    total = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    icce_filter = [tracemalloc.Filter(inclusive=True, filename_pattern='*/ICCE/*')]
+    framework = sum(stat.count_diff for stat in after.filter_traces(icce_filter).compare_to(before.filter_traces(icce_filter), 'filename'))
+    return elapsed / N_STEPS * 1e6, transient / N_STEPS, framework / N_STEPS, total / N_STEPS, collections[0]
+
+def main():
+    print(f'{N_STEPS} steps, {N_ACTIONS} actions')
+    print(f'{"size":>6}  {"transport":<10}{"dtype":<9}{"us/step":>9}{"transient B/step":>18}{"ICCE net blocks/step":>22}'
+          f'{"total net blocks/step":>23}{"GCs":>5}')
+    for i, n_observation in enumerate(OBSERVATION_SIZES):
+        environment = BenchmarkEnvironment(n_observation=n_observation, port=PORT + i)
+        environment.register(0)
+        thread = threading.Thread(target=environment.run)
+        thread.start()
+
+        for transport in ('gRPC', 'loopback'):
+            for dtype in (DType.FLOAT64, DType.FLOAT32, DType.INT8):
+                icce = BenchmarkICCE(n_observation=n_observation, observation_dtype=dtype, port=PORT + i)
+                icce._connect()
+                if transport == 'loopback':
+                    icce._endpoint.close()
+                    icce._endpoint = LoopbackEndpoint(environment._endpoint._servicer)
+
+                step_us, transient, framework, total, collections = benchmark(icce)
+                print(f'{n_observation:>6}  {transport:<10}{dtype.name:<9}{step_us:>9.1f}{transient:>18.0f}{framework:>22.4f}{total:>23.4f}{collections:>5}')
+                assert framework <= MAX_NET_BLOCKS_PER_STEP, f'ICCE retains {framework:.4f} blocks per step'
+                assert total <= MAX_TOTAL_NET_BLOCKS_PER_STEP, f'{total:.4f} blocks retained per step'
+                icce._endpoint.close()
+
+                # Free the agent for the next ICCE
+                environment._remove_icce(icce.id)
+
+        # End the episode to shut the environment down
+        environment.done = True
+        thread.join()
+
+if __name__ == '__main__':
+    main()
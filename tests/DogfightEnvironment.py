@@ -1,37 +1,33 @@
 import numpy as np
 from ICCE.interfaces import EnvironmentInterface
-from pyflyt_dogfight import SimulationListener
+from ICCE.simulation import SimulationBridge
 
 class Environment(EnvironmentInterface):
-    def __init__(self):
-        super().__init__(max_episodes=10000)
+    def __init__(self, simulation_name='dogfight', max_episodes=10000, **kwargs):
+        super().__init__(max_episodes=max_episodes, **kwargs)
 
         # Set input/output sizes
         self.n_observation = 30
         self.n_action = 4
 
-        # Simulation listener API
-        self._sim_listener = SimulationListener()
+        # Simulation state table, copied once per tick for all agents
+        self.simulation = SimulationBridge(simulation_name)
         self.i = 0
     
     def start(self) -> int:
         print('start() called')
 
     def sample(self, agent_id: int) -> tuple[np.ndarray, float, bool, bool, dict]:
-        response = self._sim_listener.sample(agent_id)
-        obs = np.frombuffer(buffer=response.observation, dtype=np.float64)
-        reward = response.reward
-        term = response.terminated
-        trunc = response.truncated
+        obs, reward, term, trunc = self.simulation.sample(agent_id)
         return obs, reward, term, trunc, {'test':True}
     
     def reset(self):
-        response = self._sim_listener.reset(iterations=1)
+        status = self.simulation.reset()
         self.i+=1
-        return response.status
+        return status
     
     def act(self, agent_id, action):
-        self._sim_listener.act(agent_id, action.tobytes())
+        self.simulation.act(agent_id, action)
 
 
 def main():
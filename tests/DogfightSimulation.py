@@ -1,13 +1,13 @@
+import argparse
 import numpy as np
 
-from pyflyt_dogfight import DogfightEnv, SimulationPublisher
-import threading
-import time
+from pyflyt_dogfight import DogfightEnv
+from ICCE.simulation import SimulationPublisher
 
 class Simulation:
-    def __init__(self):
+    def __init__(self, name='dogfight', render=True):
         # Simulation
-        self.env = DogfightEnv(render=True)
+        self.env = DogfightEnv(render=render)
 
         # Simulation data
         self.observation = np.zeros(shape=(2, 30), dtype=np.float64)
@@ -20,21 +20,20 @@ class Simulation:
         # Workaround of reward setting to 0 on terminate
         self.done = False
 
-        # API
-        self._sim_publisher = SimulationPublisher(sample_cb=self.on_sample, act_cb=self.on_act, reset_cb=self.on_reset)
+        # API, actions and resets are dispatched on the simulation thread by poll()
+        self._sim_publisher = SimulationPublisher(name, n_agents=2, n_observation=30, n_action=4,
+                                                  act_cb=self.on_act, reset_cb=self.on_reset)
         self.reset_flag = True
 
-        # Mutex Lock
-        self._lock = threading.Lock()
-
         # Initial reset
         self.reset()
 
     def start(self):
-        # Start API
-        self._sim_publisher.start()
         # Iterate though simulation
         while True:
+            # Apply actions and resets requested by the environment
+            self._sim_publisher.poll()
+
             # Reset if flag set
             if self.reset_flag:
                 self.reset()
@@ -52,46 +51,40 @@ class Simulation:
             if any(terminated) or any(truncated):
                 self.done = True
 
-            with self._lock:
-                self.observation = obs.copy()
-                self.rewards = rewards.copy()
-                self.terminated = terminated.copy()
-                self.truncated = truncated.copy()
-                self.info = info.copy()
+            # Publish the state of all agents at once
+            self.observation, self.rewards, self.terminated, self.truncated, self.info = obs, rewards, terminated, truncated, info
+            self._sim_publisher.publish(self.observation, self.rewards, self.terminated, self.truncated)
 
     def reset(self):
         # Reset env
-        with self._lock:
-            obs, info = self.env.reset()
-
-            # Set initial simulation data
-            self.observation = obs
-            self.info = info
-            self.truncated = np.full(shape=(2), fill_value=False, dtype=bool)
-            self.terminated = np.full(shape=(2), fill_value=False, dtype=bool)
-            self.reset_flag = False
-            self.done = False
-            return True
-    
-    def on_sample(self, agent_id):
-        # Get data
-        with self._lock:
-            obs_bytes = self.observation[agent_id].copy().tobytes()
-            reward = self.rewards[agent_id]
-            term = self.terminated[agent_id]
-            trunc = self.truncated[agent_id]
-        return obs_bytes, reward, term, trunc
-
-    def on_act(self, agent_id, action_bytes):
-        self.action[agent_id] = np.frombuffer(buffer=action_bytes, dtype=np.float32)
+        obs, info = self.env.reset()
+
+        # Set initial simulation data
+        self.observation = obs
+        self.info = info
+        self.truncated = np.full(shape=(2), fill_value=False, dtype=bool)
+        self.terminated = np.full(shape=(2), fill_value=False, dtype=bool)
+        self.reset_flag = False
+        self.done = False
+
+        # Publish the initial state, which completes the environment's reset
+        self._sim_publisher.publish(self.observation, self.rewards, self.terminated, self.truncated)
+        return True
+
+    def on_act(self, agent_id, action):
+        self.action[agent_id] = action
 
     def on_reset(self):
-        with self._lock:
-            self.reset_flag = True
+        self.reset_flag = True
             
 def main():
-    sim = Simulation()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--name', default='dogfight', help='Name of the shared-memory state table')
+    parser.add_argument('--headless', action='store_true', help='Run without rendering, e.g. for evaluation')
+    args = parser.parse_args()
+
+    sim = Simulation(name=args.name, render=not args.headless)
     sim.start()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import glob
+import os
+import subprocess
+import sys
+
+from ICCE.league import Evaluator, run_evaluation
+
+from A2CICCE import A2CICCE
+from DogfightEnvironment import Environment
+
+BASELINE = 'models/a2c_18_mar_24_E10k' # Opponent of every evaluated checkpoint
+
+def run_episodes(checkpoint: str, n_episodes: int, port: int) -> list[tuple[float, float | None]]:
+    """ Evaluates a checkpoint against the baseline for n_episodes, in a headless dogfight listening on port. """
+    # Each rollout has its own headless simulation, whose state table is named after the port
+    name = f'dogfight_{port}'
+    simulation = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(__file__), 'DogfightSimulation.py'),
+                                   '--name', name, '--headless'])
+    try:
+        environment = Environment(simulation_name=name, max_episodes=n_episodes, time_between_episodes=1,
+                                  time_before_shutdown=1, port=port)
+        environment.register(0) # Baseline
+        environment.register(1) # Evaluated checkpoint
+
+        # ICCEs are paced by the environment rather than a rendering frame rate
+        icce = A2CICCE(checkpoint=checkpoint, agent_hint=1, port=port, subscribe=True, evaluate=True)
+        baseline = A2CICCE(checkpoint=BASELINE, agent_hint=0, port=port, subscribe=True, evaluate=True)
+        return run_evaluation(environment, icce, opponents=[baseline])
+    finally:
+        simulation.kill()
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluates A2C checkpoints against the baseline in headless dogfights.')
+    parser.add_argument('checkpoints', nargs='*', default=sorted(glob.glob('models/a2c/*.pt')))
+    parser.add_argument('--episodes', type=int, default=100, help='Episode budget of each checkpoint')
+    parser.add_argument('--concurrent', type=int, default=None, help='Concurrent rollouts, defaults to the number of cores')
+    args = parser.parse_args()
+
+    evaluator = Evaluator(run_episodes, max_concurrent=args.concurrent)
+    for checkpoint in args.checkpoints:
+        evaluator.add_checkpoint(os.path.basename(checkpoint), checkpoint)
+    for evaluation in evaluator.run(n_episodes=args.episodes):
+        print(evaluation)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import time
+import torch
+
+from ICCE.inference import WeightStore, export_mlp, flatten_mlp
+from ICCE.utils import CheckpointManager
+from A2CICCE import Policy
+
+def policy_layers(state: dict) -> dict:
+    """ The layers of the policy of an A2C checkpoint, as arguments of export_mlp() and flatten_mlp(). """
+    model = Policy(30, 2**5, 128)
+    model.load_state_dict(state['model_state_dict'])
+    return {'layers': [model.fc1], 'heads': {'actor': model.actor_layer, 'critic': model.critic_layer},
+            'head_activations': {'actor': 'softmax'}}
+
+def main():
+    parser = argparse.ArgumentParser(description='Exports the policy of an A2C checkpoint, run by MLPICCE without torch.')
+    parser.add_argument('checkpoint', nargs='?', default='models/a2c_18_mar_24_E10k')
+    parser.add_argument('weights', nargs='?', default='models/a2c.mlp')
+    parser.add_argument('--store', default=None, help='Publish to the host-local weight store of this name instead, '
+                                                      'republishing the latest checkpoint saved by A2CICCE')
+    parser.add_argument('--checkpoints', default='models/a2c', help='Directory of the checkpoints saved by A2CICCE')
+    parser.add_argument('--interval', type=float, default=1.0, help='Interval at which checkpoints are checked, in seconds')
+    args = parser.parse_args()
+
+    if args.store is None:
+        export_mlp(args.weights, **policy_layers(torch.load(args.checkpoint)))
+        print(f'Exported {args.checkpoint} to {args.weights}')
+        return
+
+    # Single writer of the store, which ICCEs of this host attach to with MLPICCE(store=...). Publishes the latest
+    # checkpoint saved by A2CICCE, or the given checkpoint until A2CICCE saves one
+    checkpoints = CheckpointManager(args.checkpoints)
+    checkpoints.close()
+    published = checkpoints.latest or args.checkpoint
+    header, parameters = flatten_mlp(**policy_layers(torch.load(published)))
+    store = WeightStore.create(args.store, header, parameters.size)
+    print(f'Published {published} to {args.store}, version {store.publish(parameters)}')
+    try:
+        while True:
+            time.sleep(args.interval)
+            checkpoints.reload()
+            latest = checkpoints.latest
+            if latest is None or latest == published:
+                continue
+            # Readers keep the published version if the checkpoint cannot be read, e.g. was rotated out since the index
+            try:
+                _, parameters = flatten_mlp(**policy_layers(checkpoints.load(latest)))
+            except Exception as e:
+                print(f'Failed to load {latest}: {e}')
+                continue
+            published = latest
+            print(f'Published {published} to {args.store}, version {store.publish(parameters)}')
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+
+if __name__ == '__main__':
+    main()
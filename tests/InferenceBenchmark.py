@@ -0,0 +1,62 @@
+from ICCE.inference import MLP, export_mlp
+
+import numpy as np
+import subprocess
+import sys
+import timeit
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+CHECKPOINT = 'models/a2c_18_mar_24_E10k'
+WEIGHTS = 'models/a2c_18_mar_24_E10k.mlp'
+N_ITERATIONS = 10000
+
+class Policy(nn.Module):
+    """ Actor-critic policy of A2CICCE. """
+    def __init__(self, n_observations, n_actions, n_hidden):
+        super().__init__()
+        self.fc1 = nn.Linear(n_observations, n_hidden)
+        self.actor_layer = nn.Linear(n_hidden, n_actions)
+        self.critic_layer = nn.Linear(n_hidden, 1)
+
+    def forward(self, x):
+        x = F.relu(self.fc1(x))
+        return F.softmax(self.actor_layer(x), dim=-1), self.critic_layer(x)
+
+def startup(code: str) -> tuple[float, float]:
+    """ The time to run code in a fresh interpreter, in seconds, and the peak resident memory of the interpreter, in MB. """
+    # Peak resident memory is read from /proc, as getrusage() reports the peak of the parent for forked processes (Linux only)
+    code = (f'import time; start = time.perf_counter(); {code}; seconds = time.perf_counter() - start; '
+            f'print(seconds, next(line.split()[1] for line in open("/proc/self/status") if line.startswith("VmHWM")))')
+    seconds, kilobytes = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split()
+    return float(seconds), int(kilobytes) / 1024
+
+def main():
+    policy = Policy(30, 2**5, 128)
+    policy.load_state_dict(torch.load(CHECKPOINT)['model_state_dict'])
+    policy.eval()
+    export_mlp(WEIGHTS, layers=[policy.fc1], heads={'actor': policy.actor_layer, 'critic': policy.critic_layer},
+               head_activations={'actor': 'softmax'})
+
+    observation = np.random.default_rng(seed=0).normal(size=30).astype(np.float32)
+    def torch_act():
+        with torch.inference_mode():
+            return policy(torch.from_numpy(observation))
+    mlps = {backend: MLP.load(WEIGHTS, backend=backend) for backend in ('numpy', 'numba')}
+    for mlp in mlps.values():
+        assert all(np.allclose(output, expected.numpy(), atol=1e-5) for output, expected in zip(mlp(observation), torch_act()))
+
+    print('A2C policy forward pass, batch size 1')
+    print(f'{"backend":<10}{"latency (us)":>14}{"start up (ms)":>15}{"memory (MB)":>13}')
+    torch_us = timeit.timeit(torch_act, number=N_ITERATIONS) / N_ITERATIONS * 1e6
+    seconds, megabytes = startup(f'import torch; torch.load("{CHECKPOINT}")')
+    print(f'{"torch":<10}{torch_us:>14.1f}{seconds*1e3:>15.0f}{megabytes:>13.0f}')
+    for backend, mlp in mlps.items():
+        us = timeit.timeit(lambda: mlp(observation), number=N_ITERATIONS) / N_ITERATIONS * 1e6
+        seconds, megabytes = startup(f'from ICCE.inference import MLP; MLP.load("{WEIGHTS}", backend="{backend}")(__import__("numpy").zeros(30))')
+        print(f'{backend:<10}{us:>14.1f}{seconds*1e3:>15.0f}{megabytes:>13.0f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import numpy as np
+import threading
+import time
+
+from ICCE.interfaces import EnvironmentInterface, ICCEInterface, Registry
+
+REGISTRY_PORT = 50060
+BASE_PORT = 50061
+N_AGENTS = 2 # Per environment
+
+class Environment(EnvironmentInterface):
+    """ Toy environment whose episode lasts a few seconds, so that every ICCE handshakes within the episode. """
+    def __init__(self, port: int):
+        super().__init__(frequency_hz=30, max_episodes=1, time_between_episodes=1, time_before_shutdown=1, port=port,
+                         registry_ip_addr='localhost', registry_port=REGISTRY_PORT, advertise_seconds=0.5)
+        self.n_observation = 4
+        self.n_action = 2
+        self._observation = np.zeros(shape=4)
+
+    def reset(self):
+        self.ticks = 0
+        return True
+
+    def sample(self, agent_id):
+        self.ticks += 1
+        return self._observation, 0.0, self.ticks > 30 * 5 * N_AGENTS, False, {}
+
+    def act(self, agent_id, action):
+        pass
+
+class ICCE(ICCEInterface):
+    """ ICCE assigned to an environment by the registry, recording the environment and agent it was mapped to. """
+    def __init__(self):
+        super().__init__(registry_ip_addr='localhost', registry_port=REGISTRY_PORT, subscribe=True, evaluate=True)
+        self.n_observations = 4
+        self.n_actions = 2
+
+    def act(self, observation):
+        return np.zeros(2)
+
+def main(n_environments: int):
+    registry = Registry(port=REGISTRY_PORT)
+    threading.Thread(target=registry.run, daemon=True).start()
+    environments = [Environment(port=BASE_PORT + i) for i in range(n_environments)]
+    threads = []
+    for environment in environments:
+        for agent_id in range(N_AGENTS):
+            environment.register(agent_id)
+        threads.append(threading.Thread(target=environment.run))
+        threads[-1].start()
+    while len(registry.servers) < n_environments:
+        time.sleep(0.1)
+
+    # Every agent of every environment is requested at once, so that the ICCEs race for the free slots
+    icces = [ICCE() for _ in range(n_environments * N_AGENTS)]
+    threads += [threading.Thread(target=icce.run) for icce in icces]
+    for thread in threads[n_environments:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    registry.shutdown()
+
+    # Each ICCE must have been mapped to a distinct agent
+    assignments = [(icce.address, icce.agent_id) for icce in icces]
+    for address, agent_id in sorted(assignments):
+        print(f'{address} agent {agent_id}')
+    assert len(set(assignments)) == len(assignments), 'Agents were assigned to more than one ICCE!'
+    print(f'{len(icces)} ICCEs assigned to distinct agents of {n_environments} environments')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Routes ICCEs across environments listening on local ports, using a registry.')
+    parser.add_argument('--environments', type=int, default=3)
+    args = parser.parse_args()
+    main(args.environments)
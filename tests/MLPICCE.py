@@ -0,0 +1,56 @@
+from ICCE.interfaces import ICCEInterface
+from ICCE.inference import MLP
+from ICCE.utils import DType
+
+import numpy as np
+
+class MLPICCE(ICCEInterface):
+    """ Inference-only A2C ICCE, running the policy exported by ExportPolicy.py without torch.
+
+    The policy is loaded from a weight file, or attached to a host-local weight store if store is set, so that the ICCEs of
+    a host share a single copy of the weights and act on every version published by ExportPolicy.py --store.
+    """
+    def __init__(self, weights='models/a2c.mlp', store=None, backend='numba', frequency_hz=120, **kwargs):
+        super().__init__(frequency_hz=frequency_hz, **kwargs)
+        self.n_observations = 30
+        self.n_actions = 4
+        self.observation_dtype = DType.FLOAT32 # Policy runs in float32
+
+        self.model = MLP.attach(store, backend=backend) if store is not None else MLP.load(weights, backend=backend)
+        self.rng = np.random.default_rng()
+        self.action = np.zeros(shape=(4), dtype=np.float32)
+        self._cdf = np.zeros(shape=(2**5), dtype=np.float32)
+
+    def post_sample(self, observation: np.ndarray, reward: float):
+        pass
+
+    def post_episode(self):
+        pass
+
+    def act(self, observation: np.ndarray) -> np.ndarray:
+        # Sample a discrete action from the actor's probabilities
+        probs, _ = self.model(observation)
+        np.cumsum(probs, out=self._cdf)
+        discrete_action = min(int(self._cdf.searchsorted(self.rng.random() * self._cdf[-1])), self._cdf.size - 1)
+
+        # Map key to action
+        self.action[:] = 0.0
+        if discrete_action & (1 << 0): # Left
+            self.action[0] = -1.0
+        if discrete_action & (1 << 1): # Right
+            self.action[0] = 1.0
+        if discrete_action & (1 << 2): # Up
+            self.action[1] = 1.0
+        if discrete_action & (1 << 3): # Down
+            self.action[1] = -1.0
+        if discrete_action & (1 << 4): # Space
+            self.action[3] = 1.0
+        return self.action
+
+
+def main():
+    icce = MLPICCE()
+    icce.run()
+
+if __name__ == '__main__':
+    main()
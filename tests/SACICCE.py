@@ -1,4 +1,6 @@
 from ICCE.interfaces import ICCEInterface
+from ICCE.algorithms import td_loss
+from ICCE.utils import CheckpointManager
 
 import numpy as np
 import torch
@@ -76,27 +78,8 @@ class SACAgent:
         states[torch.isnan(states)] = 0
         next_states[torch.isnan(next_states)] = 0
 
-        # Critic Loss 
-        # Initialize critic_loss
-        critic_loss = torch.tensor(0.0)
-        # Iterate over each timestep
-        for i in range(len(states)):
-            state = states[i]
-            reward = rewards[i]
-            next_state = next_states[i]
-            done = dones[i]
-
-            # Compute target value using the soft update of the target critic network
-            target_value = reward + (1 - done) * 0.99 * self.target_critic(next_state)
-
-            # Compute predicted value using the current critic network
-            predicted_value = self.critic(state)    
-
-            # Accumulate squared errors
-            critic_loss += F.mse_loss(predicted_value, target_value) 
-
-        # Take the mean over all timesteps
-        critic_loss = critic_loss / len(states) 
+        # Critic Loss - Mean squared TD error over all timesteps, using the target critic network for the target values
+        critic_loss = td_loss(self.critic(states), rewards, self.target_critic(next_states), dones, gamma=0.99)
         self.critic_loss = critic_loss
 
         # Actor Loss
@@ -147,9 +130,12 @@ class SACEICCE(ICCEInterface):
         self.done_list=[]
 
         self.entropy=[]
+
+        # Checkpoints are written in the background, keeping the 3 latest and the best scored
+        self.checkpoints = CheckpointManager('models/sac', keep_last=3, keep_best=1)
         
     def post_sample(self, observation:np.ndarray, reward:float):
-        self.next_obs_list.append(observation)
+        self.next_obs_list.append(observation.copy()) # Observation is overwritten in place every tick
         self.cumulative_rewards_list.append(reward)
         self.done_list.append(False)
         
@@ -167,7 +153,7 @@ class SACEICCE(ICCEInterface):
         self.rewards_per_epi.append(total_sum)  
 
         # if self.my_epi % 500 == 0:
-        #     self.save_model() 
+        #     self.save_model(total_sum) 
         #     self.save_list_to_file(self.rewards_per_epi, 'rewards_list_'+str(self.my_epi)+'.csv',"Rewards")
         #     self.save_list_to_file(self.entropy, 'entropy_list_'+str(self.my_epi)+'.csv', "Entropy") 
 
@@ -182,31 +168,31 @@ class SACEICCE(ICCEInterface):
             self.agent =SACAgent(len(observation), self.n_actions) 
             #self.load_models()
         action = self.agent.select_action(observation) 
-        self.current_obs_list.append(observation)
+        self.current_obs_list.append(observation.copy())
         self.action_list.append(action)
         
         return action
     
-    def save_model(self):
+    def save_model(self, score):
+        # Scored, so that load_models() restores the best checkpoint
         print("Saving Model")
-        torch.save({"model_state_dict":self.agent.actor.state_dict(),
-                    "optim_state_dict": self.agent.actor_optim.state_dict(),
-                    "loss": self.agent.actor_loss},
-                    'actor_model_'+str(self.my_epi)+'.pth') 
-        
-        torch.save({"model_state_dict":self.agent.critic.state_dict(),
-                    "optim_state_dict": self.agent.critic_optim.state_dict(),
-                    "loss": self.agent.critic_loss},
-                    'critic_model_'+str(self.my_epi)+'.pth') 
+        self.checkpoints.save({"actor": {"model_state_dict": self.agent.actor.state_dict(),
+                                         "optim_state_dict": self.agent.actor_optim.state_dict(),
+                                         "loss": self.agent.actor_loss},
+                               "critic": {"model_state_dict": self.agent.critic.state_dict(),
+                                          "optim_state_dict": self.agent.critic_optim.state_dict(),
+                                          "loss": self.agent.critic_loss}},
+                              step=self.my_epi, score=score)
 
     def load_models(self):
         print("Loading Model")
-        self.agent.actor.load_state_dict(torch.load("actor_model_2500.pth")["model_state_dict"])
-        self.agent.actor_optim.load_state_dict(torch.load("actor_model_2500.pth")["optim_state_dict"])
-        self.agent.actor_loss = torch.load("actor_model_2500.pth")["loss"]
-        self.agent.critic.load_state_dict(torch.load("critic_model_2500.pth")["model_state_dict"])
-        self.agent.critic_optim.load_state_dict(torch.load("critic_model_2500.pth")["optim_state_dict"])
-        self.agent.critic_loss = torch.load("critic_model_2500.pth")["loss"] 
+        checkpoint = self.checkpoints.load('best')
+        self.agent.actor.load_state_dict(checkpoint["actor"]["model_state_dict"])
+        self.agent.actor_optim.load_state_dict(checkpoint["actor"]["optim_state_dict"])
+        self.agent.actor_loss = checkpoint["actor"]["loss"]
+        self.agent.critic.load_state_dict(checkpoint["critic"]["model_state_dict"])
+        self.agent.critic_optim.load_state_dict(checkpoint["critic"]["optim_state_dict"])
+        self.agent.critic_loss = checkpoint["critic"]["loss"] 
         # print(self.agent.actor_loss)
         # print(self.agent.critic_loss)
 
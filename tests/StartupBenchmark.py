@@ -0,0 +1,92 @@
+import argparse
+import numpy as np
+import statistics
+import subprocess
+import sys
+import time
+
+N_ENVIRONMENTS = 20
+N_AGENTS = 4 # Per environment, each driven by an ICCE process
+N_IMPORT_RUNS = 5
+BASE_PORT = 50200
+RESET_SECONDS = 1.0 # Duration of the simulation's initial reset, during which ICCEs must wait
+
+def environment(port: int):
+    from ICCE.interfaces import EnvironmentInterface
+
+    class Environment(EnvironmentInterface):
+        def __init__(self):
+            super().__init__(frequency_hz=30, max_episodes=1, port=port)
+            self.n_observation = 30
+            self.n_action = 4
+            self._observation = np.zeros(shape=30)
+            self._reset_seconds = RESET_SECONDS
+
+        def reset(self):
+            time.sleep(self._reset_seconds)
+            self._reset_seconds = 0.0
+            return True
+
+        def sample(self, agent_id):
+            return self._observation, 0.0, False, False, {}
+
+        def act(self, agent_id, action):
+            pass
+
+    env = Environment()
+    for agent_id in range(N_AGENTS):
+        env.register(agent_id)
+    env.run()
+
+def icce(port: int, start: float):
+    from ICCE.interfaces import ICCEInterface
+
+    class ICCE(ICCEInterface):
+        def __init__(self):
+            super().__init__(port=port)
+            self.n_observations = 30
+            self.n_actions = 4
+
+    # Report the time the ICCE handshaked and pulled its initial data, relative to the start of the topology
+    ICCE()._connect()
+    print(f'READY {time.time() - start}', flush=True)
+
+def import_seconds(name: str) -> float:
+    """ The median time to import an interface in a fresh interpreter, in seconds. """
+    code = f'import time; start = time.perf_counter(); from ICCE.interfaces import {name}; print(time.perf_counter() - start)'
+    runs = [float(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout) for _ in range(N_IMPORT_RUNS)]
+    return statistics.median(runs)
+
+def main(n_environments: int):
+    print(f'Import: ICCEInterface {import_seconds("ICCEInterface")*1e3:.0f} ms, '
+          f'EnvironmentInterface {import_seconds("EnvironmentInterface")*1e3:.0f} ms')
+
+    # ICCEs are started before their environments, which are started in reverse order
+    start = time.time()
+    icces = [subprocess.Popen([sys.executable, __file__, 'icce', str(BASE_PORT + i), str(start)], stdout=subprocess.PIPE, text=True)
+             for i in range(n_environments) for _ in range(N_AGENTS)]
+    environments = [subprocess.Popen([sys.executable, __file__, 'environment', str(BASE_PORT + i)],
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    for i in reversed(range(n_environments))]
+
+    ready = []
+    for process in icces:
+        output, _ = process.communicate()
+        ready += [float(line.split()[1]) for line in output.splitlines() if line.startswith('READY')]
+    elapsed = time.time() - start
+    for process in environments:
+        process.kill()
+
+    print(f'{len(environments) + len(icces)} processes ({n_environments} environments, {len(icces)} ICCEs): '
+          f'{len(ready)}/{len(icces)} ICCEs ready, all within {elapsed:.2f} s (median {statistics.median(ready):.2f} s)')
+    assert len(ready) == len(icces), 'Not every ICCE handshaked'
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'environment':
+        environment(port=int(sys.argv[2]))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'icce':
+        icce(port=int(sys.argv[2]), start=float(sys.argv[3]))
+    else:
+        parser = argparse.ArgumentParser(description='Measures the time to bring up a topology started in any order.')
+        parser.add_argument('--environments', type=int, default=N_ENVIRONMENTS)
+        main(n_environments=parser.parse_args().environments)
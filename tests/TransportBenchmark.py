@@ -0,0 +1,62 @@
+from ICCE.utils import DType, Compression, encode, decode
+from ICCE.utils.codecs import create_codec
+
+import numpy as np
+import time
+import timeit
+
+N_OBSERVATIONS = 30
+N_ITERATIONS = 100000
+IMAGE_SHAPE = (128, 128, 3)
+N_TICKS = 200
+
+def benchmark_dtypes(observation: np.ndarray):
+    """ Measures the payload size and encode/decode time of an observation for every wire dtype. """
+    print(f'{"dtype":<10}{"bytes":>8}{"ratio":>8}{"encode (us)":>14}{"decode (us)":>14}')
+    baseline = len(encode(observation, DType.FLOAT64)[0])
+    for dtype in DType:
+        payload, scale = encode(observation, dtype)
+        encode_us = timeit.timeit(lambda: encode(observation, dtype), number=N_ITERATIONS) / N_ITERATIONS * 1e6
+        decode_us = timeit.timeit(lambda: decode(payload, dtype, scale), number=N_ITERATIONS) / N_ITERATIONS * 1e6
+        print(f'{dtype.name:<10}{len(payload):>8}{baseline / len(payload):>8.1f}{encode_us:>14.2f}{decode_us:>14.2f}')
+
+def benchmark_codecs(ticks: list[np.ndarray], dtype: DType):
+    """ Measures the mean payload size and encode/decode time of a sequence of observations for every codec. """
+    payloads = [encode(observation, dtype)[0] for observation in ticks]
+    raw = sum(len(payload) for payload in payloads) / len(payloads)
+
+    print(f'{"codec":<12}{"bytes":>10}{"ratio":>8}{"encode (us)":>14}{"decode (us)":>14}')
+    for compression in Compression:
+        encoder, decoder = create_codec(compression), create_codec(compression)
+
+        start = time.perf_counter()
+        encoded = [encoder.encode(payload) for payload in payloads]
+        encode_us = (time.perf_counter() - start) / len(payloads) * 1e6
+
+        start = time.perf_counter()
+        decoded = [decoder.decode(payload) for payload in encoded]
+        decode_us = (time.perf_counter() - start) / len(payloads) * 1e6
+
+        assert decoded == payloads
+        size = sum(len(payload) for payload in encoded) / len(encoded)
+        print(f'{compression.name:<12}{size:>10.0f}{raw / size:>8.1f}{encode_us:>14.1f}{decode_us:>14.1f}')
+
+def main():
+    rng = np.random.default_rng(seed=0)
+    observation = rng.uniform(low=-1.0, high=1.0, size=N_OBSERVATIONS)
+    benchmark_dtypes(observation)
+
+    # Image-like observation where a small region changes every tick
+    image = rng.uniform(low=0.0, high=1.0, size=IMAGE_SHAPE)
+    ticks = []
+    for i in range(N_TICKS):
+        image = image.copy()
+        image[i % IMAGE_SHAPE[0], :, :] = rng.uniform(low=0.0, high=1.0, size=IMAGE_SHAPE[1:])
+        ticks.append(image)
+
+    for dtype in (DType.FLOAT32, DType.INT8):
+        print(f'\n{IMAGE_SHAPE} observation, {dtype.name}')
+        benchmark_codecs(ticks, dtype)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import itertools
+import numpy as np
+import threading
+
+from ICCE.interfaces import EnvironmentInterface, ICCEInterface, BatchClient
+from ICCE.utils import DType, Compression, codecs, encoding
+
+BASE_PORT = 50200
+N_OBSERVATION = 256
+N_TICKS = 300
+CUSTOM_CODEC = 10 # Registered with codecs.register_codec(), not a Compression
+MODES = ('sample', 'subscribe', 'stream', 'batch')
+DTYPES = (DType.FLOAT64, DType.FLOAT32, DType.FLOAT16, DType.INT8)
+
+codecs.register_codec(CUSTOM_CODEC, lambda: codecs.DeltaCodec(inner=codecs.ZlibCodec(level=6), keyframe_interval=16))
+
+class Environment(EnvironmentInterface):
+    """ Environment whose observations partly change every tick, recording the observation published at each tick. """
+    def __init__(self, port: int, max_chunk_bytes: int):
+        super().__init__(frequency_hz=300, max_episodes=1, time_between_episodes=1, time_before_shutdown=1, port=port,
+                         max_chunk_bytes=max_chunk_bytes)
+        self.n_observation = N_OBSERVATION
+        self.n_action = 1
+        self.rng = np.random.default_rng(seed=port)
+        self.observation = np.zeros(shape=N_OBSERVATION)
+        self.published = {} # {tick: observation}
+
+    def reset(self):
+        self.ticks = 0
+        return True
+
+    def sample(self, agent_id):
+        # Sampled while holding the lock, the tick is incremented once every agent is sampled
+        self.ticks += 1
+        changed = self.rng.random(N_OBSERVATION) < 0.2
+        self.observation[changed] = self.rng.normal(size=changed.sum()) * 100.0
+        self.published[self.tick + 1] = self.observation.copy()
+        return self.observation, 0.0, self.ticks > N_TICKS, False, {}
+
+    def act(self, agent_id, action):
+        pass
+
+    def expected(self, tick: int, dtype: DType) -> np.ndarray:
+        """ The observation of a tick, as decoded by an ICCE. """
+        buffer, scale = encoding.encode(self.published[tick], dtype)
+        return encoding.decode(buffer, dtype, scale=scale, out=np.zeros(N_OBSERVATION, dtype=encoding.numpy_dtype(dtype)))
+
+class ICCE(ICCEInterface):
+    """ ICCE polling faster than the environment ticks, comparing every decoded observation to the published one. """
+    def __init__(self, environment: Environment, port: int, dtype: DType, codec: int, subscribe: bool):
+        super().__init__(frequency_hz=1000, port=port, subscribe=subscribe, evaluate=True)
+        self.n_observations = N_OBSERVATION
+        self.n_actions = 1
+        self.observation_dtype = dtype
+        self.observation_codec = codec
+        self.environment = environment
+        self.n_checked = 0
+        self.n_corrupted = 0
+
+    def act(self, observation):
+        self.n_checked += 1
+        if not np.array_equal(observation, self.environment.expected(self.tick, self.observation_dtype)):
+            self.n_corrupted += 1
+        return np.zeros(1)
+
+def check_batch(environment: Environment, port: int, dtype: DType, codec: int) -> tuple[int, int]:
+    """ Samples the environment with a `BatchClient` until the end of the episode, comparing every decoded observation. """
+    client = BatchClient(n_agents=1, n_observations=N_OBSERVATION, n_actions=1, observation_dtype=dtype, observation_codec=codec,
+                         port=port)
+    client.connect()
+    n_checked = n_corrupted = 0
+    while not (client.terminated[0] or client.truncated[0]):
+        client.sample(wait=False)
+        n_checked += 1
+        if not np.array_equal(client.observations[0], environment.expected(int(client.ticks[0]), dtype)):
+            n_corrupted += 1
+    client.close()
+    return n_checked, n_corrupted
+
+def check(mode: str, dtype: DType, codec: int, port: int) -> tuple[int, int]:
+    """ Runs an episode, returning the number of decoded observations and the number which differ from the published ones. """
+    # Streamed responses are chunked, as observations are larger than a chunk
+    environment = Environment(port, max_chunk_bytes=64 if mode == 'stream' else 1 << 20)
+    environment.register(0)
+    thread = threading.Thread(target=environment.run)
+    thread.start()
+    if mode == 'batch':
+        result = check_batch(environment, port, dtype, codec)
+    else:
+        icce = ICCE(environment, port, dtype, codec, subscribe=mode == 'subscribe')
+        icce.run()
+        result = icce.n_checked, icce.n_corrupted
+    thread.join()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Checks that ICCEs decode the observations published by the environment, '
+                                                 'for every mode, wire dtype and codec.')
+    parser.add_argument('--concurrency', type=int, default=8, help='Number of episodes run at once')
+    args = parser.parse_args()
+
+    combinations = list(itertools.product(MODES, DTYPES, list(Compression) + [CUSTOM_CODEC]))
+    results = [(0, 0)] * len(combinations) # Combinations which raised decode no observation
+    def worker(i):
+        mode, dtype, codec = combinations[i]
+        results[i] = check(mode, dtype, codec, BASE_PORT + i % args.concurrency)
+    for start in range(0, len(combinations), args.concurrency):
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(start, min(start + args.concurrency, len(combinations)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    print(f'{"mode":<10}{"dtype":<10}{"codec":<12}{"decoded":>9}{"corrupted":>11}')
+    for (mode, dtype, codec), (n_checked, n_corrupted) in zip(combinations, results):
+        name = Compression(codec).name if codec in list(Compression) else str(codec)
+        print(f'{mode:<10}{dtype.name:<10}{name:<12}{n_checked:>9}{n_corrupted:>11}')
+    failed = [combination for combination, (n_checked, n_corrupted) in zip(combinations, results) if n_corrupted or not n_checked]
+    assert not failed, f'{len(failed)} combinations decoded corrupted observations, or none!'
+    print(f'All {len(combinations)} combinations decoded the published observations')
+
+if __name__ == '__main__':
+    main()
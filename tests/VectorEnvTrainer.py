@@ -0,0 +1,39 @@
+from ICCE.adapters import ICCEVectorEnv
+from ICCE.utils import DType
+
+import gymnasium as gym
+import numpy as np
+import time
+
+N_STEPS = 2000
+
+def main():
+    # Drive both agents of each of two environment servers (e.g. tests/DogfightEnvironment.py on ports 50051 and 50052)
+    envs = ICCEVectorEnv(
+        n_observations=30,
+        n_actions=4,
+        environments=[('localhost', 50051, 2), ('localhost', 50052, 2)],
+        observation_dtype=DType.FLOAT32,
+        action_space=gym.spaces.Box(low=-1.0, high=1.0, shape=(4,), dtype=np.float32)
+    )
+    print(f'{envs.num_envs} agents, observation space {envs.single_observation_space}')
+
+    observations, infos = envs.reset()
+    returns = np.zeros(shape=envs.num_envs)
+    start = time.perf_counter()
+    for _ in range(N_STEPS):
+        # One batched step per tick for every agent of every environment
+        actions = envs.action_space.sample()
+        observations, rewards, terminated, truncated, infos = envs.step(actions)
+        returns += rewards
+
+        done = terminated | truncated
+        for i in np.flatnonzero(done):
+            print(f'Agent {i} episode return: {returns[i]:.2f}')
+        returns[done] = 0.0
+
+    print(f'{N_STEPS / (time.perf_counter() - start):.1f} steps/s')
+    envs.close()
+
+if __name__ == '__main__':
+    main()
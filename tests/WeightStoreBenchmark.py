@@ -0,0 +1,77 @@
+from ICCE.inference import MLP, WeightStore, flatten_mlp, export_mlp
+
+import numpy as np
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+
+N_PROCESSES = 8
+N_INPUTS = 30
+N_HIDDEN = 1024
+N_LAYERS = 4
+N_ITERATIONS = 100
+STORE = 'weight_store_benchmark'
+
+# Reader process: loads the MLP from a weight file or attaches it to the store, then waits to be measured
+READER = '''
+import sys
+import numpy as np
+from ICCE.inference import MLP
+mlp = MLP.load(sys.argv[2]) if sys.argv[1] == 'file' else MLP.attach(sys.argv[2])
+mlp(np.zeros(mlp.n_inputs))
+print('READY', flush=True)
+sys.stdin.read()
+'''
+
+def proportional_set_size(pid: int) -> float:
+    """ The resident memory of a process, with pages shared by n processes counted 1/n, in MB (Linux only). """
+    with open(f'/proc/{pid}/smaps_rollup') as file:
+        return next(int(line.split()[1]) for line in file if line.startswith('Pss:')) / 1024
+
+def readers(mode: str, source: str) -> float:
+    """ The total memory of N_PROCESSES concurrent readers, in MB. """
+    processes = [subprocess.Popen([sys.executable, '-c', READER, mode, source], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                 for _ in range(N_PROCESSES)]
+    for process in processes:
+        assert process.stdout.readline().strip() == 'READY'
+    total = sum(proportional_set_size(process.pid) for process in processes)
+    for process in processes:
+        process.communicate()
+    return total
+
+def main():
+    rng = np.random.default_rng(seed=0)
+    sizes = [N_INPUTS] + [N_HIDDEN] * N_LAYERS
+    layers = [(rng.normal(size=(n_out, n_in)) / np.sqrt(n_in), np.zeros(n_out)) for n_in, n_out in zip(sizes[:-1], sizes[1:])]
+    heads = {'action': (rng.normal(size=(4, N_HIDDEN)) / np.sqrt(N_HIDDEN), np.zeros(4))}
+    header, parameters = flatten_mlp(layers, heads=heads)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'policy.mlp')
+        export_mlp(path, layers, heads=heads)
+        store = WeightStore.create(STORE, header, parameters.size)
+        store.publish(parameters)
+        try:
+            print(f'{parameters.size} parameters ({parameters.nbytes / 2**20:.1f} MB), {N_PROCESSES} reader processes')
+            print(f'{"weights":<14}{"memory (MB)":>12}{"refresh (ms)":>14}')
+
+            # Refresh: write and load a new file, or publish to the store and swap the reader's view
+            file_ms = timeit.timeit(lambda: (export_mlp(path, layers, heads=heads), MLP.load(path)), number=N_ITERATIONS) / N_ITERATIONS * 1e3
+            print(f'{"file":<14}{readers("file", path):>12.0f}{file_ms:>14.2f}')
+
+            reader = MLP.attach(STORE)
+            observation = np.zeros(N_INPUTS)
+            def refresh():
+                store.publish(parameters)
+                reader(observation)
+            inference_ms = timeit.timeit(lambda: reader(observation), number=N_ITERATIONS) / N_ITERATIONS * 1e3
+            store_ms = timeit.timeit(refresh, number=N_ITERATIONS) / N_ITERATIONS * 1e3 - inference_ms
+            print(f'{"weight store":<14}{readers("store", STORE):>12.0f}{store_ms:>14.2f}')
+            reader.store.close()
+        finally:
+            store.close()
+
+if __name__ == '__main__':
+    main()